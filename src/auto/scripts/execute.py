@@ -1,6 +1,7 @@
 """Modulo para establecer un estado de ejecucion de los scripts"""
 
 from typing import Callable
+from asyncio import Lock
 from apscheduler.job import Job
 from app.logging import get_logger
 from service.types import ServiceOperation, ServiceNotFound, ServiceError
@@ -11,6 +12,10 @@ from utils.schedule import scheduler_scripts
 
 logger = get_logger("auto", "scripts")
 
+# Los scripts comparten el contexto, una ejecucion no empieza hasta que termine la anterior
+# aunque las operaciones cedan el bucle de eventos mientras esperan al FTP.
+LOCK_RUN_SCRIPTS = Lock()
+
 class ScriptErrorExecution(Exception):
     """Error en la ejecucion de un script."""
 
@@ -51,13 +56,20 @@ def runner_script(script_line: ScriptLine, context: dict[str, object]):
         name = script_line["name"]
         parameters = script_line["parameters"]
         parameterskv = script_line["parameterskv"]
-        try:
-            logger.info("corriendo la tarea con nombre '%s'", name)
-            await service.run(*parameters, **parameterskv, context=context)
-            logger.info("la tarea con nombre '%s' finalizo con exito", name)
-        except ServiceError as err:
-            msg = "en la ejecucion de la tarea con nombre '%s' ocurrio un error: %s"
-            logger.error(msg, name, str(err))
+        async with LOCK_RUN_SCRIPTS:
+            context["script_id"] = script_line["id"]    # Estado de sincronizacion del script.
+            try:
+                logger.info("corriendo la tarea con nombre '%s'", name)
+                await service.run(*parameters, **parameterskv, context=context)
+                logger.info("la tarea con nombre '%s' finalizo con exito", name)
+            except ServiceError as err:
+                msg = "en la ejecucion de la tarea con nombre '%s' ocurrio un error: %s"
+                logger.error(msg, name, str(err))
+            finally:
+                # El estado de sincronizacion es solo de esta ejecucion, no del contexto compartido.
+                for key in ("script_id", "sync_files", "sync_expire_before", "files_integrated",
+                            "files_in_flow"):
+                    context.pop(key, None)
 
     return run_script
 
@@ -14,7 +14,8 @@ from auto import scripts
 DS_SCRIPTS: DataStore[Scripts] = DataStore(
     max_length=10,                         # 10 sitios disponibles para crear data scripts.
     max_size=10 * 1e6,                     # 10 Megabytes.
-    max_duration=timedelta(minutes=100)    # 10 minutos por script
+    max_duration=timedelta(minutes=100),   # 10 minutos por script
+    name="scripts"
 )
 
 def ds_scripts_calc_size(instance: Scripts):
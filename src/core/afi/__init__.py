@@ -10,6 +10,7 @@ __all__ = [
     "AFI",
     "AFI_PARAMETERS",
     "AFI_PARAMETERS_UNIQUE",
+    "AFI_PARAMETERS_KEYS",
     "FILENAME_AFI_PARAMETERS",
     "FILEPATH_AFI_PARAMETERS",
     "refresh_afi_paramters",
@@ -21,6 +22,7 @@ from .afi import AFI
 from .paramters import (
     AFI_PARAMETERS,
     AFI_PARAMETERS_UNIQUE,
+    AFI_PARAMETERS_KEYS,
     FILENAME_AFI_PARAMETERS,
     FILEPATH_AFI_PARAMETERS,
     refresh_afi_paramters
@@ -3,12 +3,16 @@ Modulo para la lectura, analisis y correccion de interfaz contable (Accounting F
 """
 
 from __future__ import annotations
-from datetime import datetime
-from pandas import Series, Index, MultiIndex
+from numpy import ndarray
+from pandas import DataFrame, Series, Index, MultiIndex
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
-from .paramters import AFI_PARAMETERS_UNIQUE
+from data.keys import KeyIndex, hash_keys
+from data.snapshot import snapshot, fill_frame, update_frame, select_fields
+from data.dates import valid_dates
+from data.reference import REFERENCES
+from .paramters import AFI_PARAMETERS_KEYS
 from .transfers import AFITransfers
-from .fields import AFIField, AFIParameterField, AFITransferField
+from .fields import AFIField, AFIParameterField
 from .exceptions import (
     AFIException,
     AFIWarning,
@@ -18,6 +22,16 @@ from .exceptions import (
 
 class AFI(BaseDataIO):
     """Clase para la gestion de datos de la interfaz contable."""
+    field_type = AFIField
+    # Campos que identifican un movimiento ya procesado.
+    fields_no_duplicates = [
+        AFIField.CODIGO_DOCUMENTO,
+        AFIField.FECHA_ELABORACION,
+        AFIField.CUENTA_CONTABLE,
+        AFIField.CODIGO_CENTRO_COSTOS,
+        AFIField.OBSERVACION_DETALLE,
+        AFIField.OBSERVACIONES_MOVIMIENTO,
+    ]
 
     def __init__(self,
                  *,
@@ -34,8 +48,8 @@ class AFI(BaseDataIO):
             kwargs["names"] = list(AFIField)
 
         self.load(dtype=str, **kwargs)
-        self.data.fillna("", inplace=True)
-        self.data_src = self.data.copy()
+        fill_frame(self.data, "")
+        self.data_src = snapshot(self.data)   # Comparte las columnas hasta que cambien.
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -52,36 +66,24 @@ class AFI(BaseDataIO):
         if not fields:
             fields = list(AFIField)
         fields = list(dict.fromkeys(fields)) # Campos unicos y ordenados
-        self.data = self.data[fields]
+        self.data = select_fields(self.data, fields)
 
     def fix(self, data: dict[AFIField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def set_parameters(self):
         """Agrega los parámetros IC a los datos, retorna las columnas antiguas"""
         old_columns = self.data.columns.copy()
 
-        fields_afi_parameters = [f for f in AFIParameterField if f in AFI_PARAMETERS_UNIQUE.data]
-        df_parameters = AFI_PARAMETERS_UNIQUE.data[fields_afi_parameters].copy()
-
         id_merge_left_on = [
             AFIField.CODIGO_DOCUMENTO,
             AFIField.CUENTA_CONTABLE,
             AFIField.CODIGO_CENTRO_COSTOS
         ]
-        id_merge_right_on = [
-            AFIParameterField.COMPROBANTE,
-            AFIParameterField.CUENTA,
-            AFIParameterField.CECO
-        ]
 
-        self.data = self.data.merge(
-            df_parameters,
-            how="left",
-            left_on=id_merge_left_on,
-            right_on=id_merge_right_on
-        )
+        # Igual a un merge left con los parametros, sobre el indice de claves ya construido.
+        self.data = AFI_PARAMETERS_KEYS.get().join(self.data, id_merge_left_on)
 
         return old_columns
 
@@ -89,14 +91,18 @@ class AFI(BaseDataIO):
         """Comprueba que existen los parametros en los datos IC"""
         return not all(f not in self.data for f in AFIParameterField)
 
+    def integers(self, field: AFIField) -> Series:
+        """Valores enteros del campo, los vacios son cero."""
+        return self.data[field].replace("", "0").astype(int)
+
     def total(self):
         """Obtiene la suma de los debitos y creditos."""
-        debitos = self.data[AFIField.DEBITOS].replace("", "0").astype(int).sum()
-        creditos = self.data[AFIField.CREDITOS].replace("", "0").astype(int).sum()
+        debitos = self.integers(AFIField.DEBITOS).sum()
+        creditos = self.integers(AFIField.CREDITOS).sum()
         return debitos - creditos
 
-    def groupby(self):
-        """Agrupa todos los movimientos."""
+    def groupby(self, data: DataFrame = None):
+        """Agrupa todos los movimientos, o los movimientos de `data`."""
 
         fields_group = [
             AFIField.CODIGO_DOCUMENTO,
@@ -105,50 +111,63 @@ class AFI(BaseDataIO):
             AFIField.CODIGO_CENTRO_COSTOS,
         ]
 
-        return self.data.groupby(fields_group)
+        if data is None:
+            data = self.data
 
-    def total_groupby(self):
-        """Verifica cuales son los movimientos tienen diferencias en debitos y creditos."""
-        groups = self.groupby()
-        list_diferences: list[tuple[tuple, Index]] = []
+        return data.groupby(fields_group, observed=True)
+
+    def group_codes(self) -> Series:
+        """Numero del movimiento de cada fila, -1 para las filas sin movimiento (campos nulos)."""
+        return self.groupby().ngroup()
 
-        for values, df_group in groups:
-            debitos = df_group[AFIField.DEBITOS].replace("", "0").astype(int).sum()
-            creditos = df_group[AFIField.CREDITOS].replace("", "0").astype(int).sum()
-            diference = debitos - creditos
+    def mask_diferences(self, codes: Series = None) -> Series:
+        """Mascara de las filas de los movimientos que tienen diferencias en debitos y creditos."""
+        if codes is None:
+            codes = self.group_codes()
 
-            if not diference:
-                continue
+        diferences = self.integers(AFIField.DEBITOS) - self.integers(AFIField.CREDITOS)
+        diferences = diferences.groupby(codes).transform("sum")
+        return diferences.ne(0) & codes.ge(0)
 
-            list_diferences.append((values, df_group.index))
+    def mask_with_ceros(self, codes: Series = None) -> Series:
+        """Mascara de las filas de los movimientos que tienen debitos o creditos con un valor cero."""
+        if codes is None:
+            codes = self.group_codes()
 
-        return list_diferences
+        debitos = self.data[AFIField.DEBITOS].astype(str).str.strip() == "0"
+        creditos = self.data[AFIField.CREDITOS].astype(str).str.strip() == "0"
+        ceros = (debitos | creditos).groupby(codes).transform("any")
+        return ceros & codes.ge(0)
+
+    def total_groupby(self):
+        """Verifica cuales son los movimientos tienen diferencias en debitos y creditos."""
+        groups = self.groupby(self.data[self.mask_diferences()])
+        return [(values, df_group.index) for values, df_group in groups]
 
     def list_with_ceros(self):
         """Verifica cuales son los movimientos que tienen debitos y creditos con un valor cero."""
-        groups = self.groupby()
-        list_values_cero: list[tuple[tuple, Index]] = []
-
-        for values, df_group in groups:
-            debitos = df_group[AFIField.DEBITOS]
-            debitos = debitos[debitos.str.strip() == "0"]
-            creditos = df_group[AFIField.CREDITOS]
-            creditos = creditos[creditos.str.strip() == "0"]
+        groups = self.groupby(self.data[self.mask_with_ceros()])
+        return [(values, df_group.index) for values, df_group in groups]
 
-            if debitos.empty and creditos.empty:
-                continue
-            list_values_cero.append((values, df_group.index))
+    def keys_duplicates(self) -> ndarray:
+        """Clave hash de cada movimiento segun los campos que identifican los duplicados."""
+        return hash_keys(self.data, self.fields_no_duplicates)
 
-        return list_values_cero
+    def index_duplicates(self) -> KeyIndex:
+        """Repara los datos y devuelve el indice de claves de los movimientos para otros AFI."""
+        self.fullfix()
+        return KeyIndex(self.keys_duplicates())
 
-    def normalize(self, transfers: AFITransfers = None, valid_duplicates: "AFI" = None):
+    def normalize(self,
+                  transfers: AFITransfers = None,
+                  valid_duplicates: AFI | KeyIndex = None):
         """
         Aplica en los datos los siguientes puntos:
             - Corrige los valores en cero.
             - Elimina las transferencias que no deben ir, solo las de devolucion zf.
             - Ordena los datos por el codigo documento, fecha elaboracion, numero.
             - Elimina los movimientos duplicados.
-            - Verifica movimientos que ya existen `valid_duplicates`.
+            - Verifica movimientos que ya existen `valid_duplicates`, otro AFI o su indice.
             - Elimina los movimientos sin numero.
             - Elimina los movimientos que causan diferencias en debitos y creditos.
             - Elimina los movimientos quee tengan debitos y creditos en ceros.
@@ -160,76 +179,59 @@ class AFI(BaseDataIO):
         # Elimina los movimientos sin numero
 
         numero = self.data[AFIField.NUMERO]
-        numero = numero[~numero.str.strip().str.isdigit()]
-        self.data.drop(index=numero.index, inplace=True)
+        mask = ~numero.str.strip().str.isdigit()
 
         # Corregir los valores en cero, solo para ajustes y transferencias
 
         movimiento = self.data[AFIParameterField.MOVIMIENTO]
         mov_borrado_cero = ["Ajuste de Entrada", "Ajuste de Salida", "Transferencia"]
-        mov_borrado_cero = self.data[movimiento.isin(mov_borrado_cero)]
-
-        deb_mov_borrado_cero = mov_borrado_cero[AFIField.DEBITOS]
-        deb_mov_borrado_cero = deb_mov_borrado_cero[deb_mov_borrado_cero == "0"]
-        self.data.drop(index=deb_mov_borrado_cero.index, inplace=True)
+        mov_borrado_cero = movimiento.isin(mov_borrado_cero)
 
-        cre_mov_borrado_cero = mov_borrado_cero[AFIField.CREDITOS]
-        cre_mov_borrado_cero = cre_mov_borrado_cero[cre_mov_borrado_cero == "0"]
-        self.data.drop(index=cre_mov_borrado_cero.index, inplace=True)
+        mask |= mov_borrado_cero & (self.data[AFIField.DEBITOS] == "0")
+        mask |= mov_borrado_cero & (self.data[AFIField.CREDITOS] == "0")
 
         # Elimina las transferencias innecesarias
 
-        mov_borrar_transfer = ["Transferencia"]
-        movimiento = self.data[AFIParameterField.MOVIMIENTO]
-        mov_borrar_transfer = self.data[movimiento.isin(mov_borrar_transfer)]
+        mov_borrar_transfer = movimiento.isin(["Transferencia"])
 
         if not transfers is None:
-            transfers.fullfix()
-            id_mov_borrar_transfer = mov_borrar_transfer[AFIParameterField.CODIGO_TIENDA].copy()
-            id_mov_borrar_transfer += "|" + mov_borrar_transfer[AFIField.NUMERO]
-            id_mov_borrar_transfer += "|" + mov_borrar_transfer[AFIField.FECHA_ELABORACION]
-
-            id_transfer = transfers.data[AFITransferField.ESTABLECIMIENTO_EMISOR]
-            id_transfer += "|" + transfers.data[AFITransferField.NUMERO]
-            id_transfer += "|" + transfers.data[AFITransferField.FECHA_TRANSFERENCIA]
-
-            filter_transfer = id_mov_borrar_transfer.isin(id_transfer)
-            mov_borrar_transfer = mov_borrar_transfer[~filter_transfer]
-
-        self.data.drop(index=mov_borrar_transfer.index, inplace=True)
-
-        fields_no_duplicates = [
-            AFIField.CODIGO_DOCUMENTO,
-            AFIField.FECHA_ELABORACION,
-            AFIField.CUENTA_CONTABLE,
-            AFIField.CODIGO_CENTRO_COSTOS,
-            AFIField.OBSERVACION_DETALLE,
-            AFIField.OBSERVACIONES_MOVIMIENTO,
-        ]
+            fields_transfer = [
+                AFIParameterField.CODIGO_TIENDA,
+                AFIField.NUMERO,
+                AFIField.FECHA_ELABORACION
+            ]
+            keys_transfer = hash_keys(self.data[mov_borrar_transfer], fields_transfer)
+            filter_transfer = transfers.index_keys().contains(keys_transfer)
+            mov_borrar_transfer[mov_borrar_transfer] = ~filter_transfer
+
+        # Todas las filas anteriores se eliminan en un solo filtro.
+
+        mask |= mov_borrar_transfer
+        if mask.any():
+            self.data = self.data[~mask]
 
         self.data.drop_duplicates(inplace=True, ignore_index=True)
-        # self.data.drop_duplicates(fields_no_duplicates, inplace=True, ignore_index=True)
+        # self.data.drop_duplicates(self.fields_no_duplicates, inplace=True, ignore_index=True)
 
-        # verifica los duplicados desde otro set de datos AFI
+        # verifica los duplicados desde otro set de datos AFI o su indice de claves
 
         if not valid_duplicates is None:
-            valid_duplicates.fullfix()
+            if isinstance(valid_duplicates, AFI):
+                valid_duplicates = valid_duplicates.index_duplicates()
 
-            mask = self.data[fields_no_duplicates].apply(tuple, axis=1)
-            mask = mask.isin(valid_duplicates.data[fields_no_duplicates].apply(tuple, axis=1))
-            self.data = self.data[~mask]
+            mask = valid_duplicates.contains(self.keys_duplicates())
+            if mask.any():
+                self.data = self.data[~mask]
 
         # Elimina los movimientos que causan diferencias en debitos y creditos
 
-        list_diferences = self.total_groupby()
-        for _, index in list_diferences:
-            self.data.drop(index=index, inplace=True)
+        # y los que tengan debitos y creditos en ceros, todos en un solo filtro.
 
-        # Elimina los movimientos que tengan debitos y creditos en ceros
+        codes = self.group_codes()
+        mask = self.mask_diferences(codes) | self.mask_with_ceros(codes)
 
-        list_with_ceros = self.list_with_ceros()
-        for _, index in list_with_ceros:
-            self.data.drop(index=index, inplace=True)
+        if mask.any():
+            self.data = self.data[~mask]
 
         # Ordena los datos
 
@@ -239,15 +241,13 @@ class AFI(BaseDataIO):
     def analyze(self):
         """Analiza los datos y devuelve los errores encontrados."""
 
-        id_valid_parameters = self.data[AFIField.CODIGO_DOCUMENTO].copy()
-        id_valid_parameters += "|" + self.data[AFIField.CUENTA_CONTABLE]
-        id_valid_parameters += "|" + self.data[AFIField.CODIGO_CENTRO_COSTOS]
-
-        id_parameters = AFI_PARAMETERS_UNIQUE.data[AFIParameterField.COMPROBANTE].copy()
-        id_parameters += "|" + AFI_PARAMETERS_UNIQUE.data[AFIParameterField.CUENTA]
-        id_parameters += "|" + AFI_PARAMETERS_UNIQUE.data[AFIParameterField.CECO]
-
-        no_valid_parameters = id_valid_parameters[~id_valid_parameters.isin(id_parameters)]
+        fields_valid_parameters = [
+            AFIField.CODIGO_DOCUMENTO,
+            AFIField.CUENTA_CONTABLE,
+            AFIField.CODIGO_CENTRO_COSTOS
+        ]
+        valid_parameters = AFI_PARAMETERS_KEYS.get().contains(self.data, fields_valid_parameters)
+        no_valid_parameters = self.data.index[~valid_parameters]
 
         tercero_principal = self.data[AFIField.TERCERO_PRINCIPAL]
         tercero_principal = tercero_principal[tercero_principal == ""]
@@ -255,15 +255,8 @@ class AFI(BaseDataIO):
         numero = self.data[AFIField.NUMERO]
         numero = numero[~numero.str.strip().str.isdigit()]
 
-        def is_date(value: str):
-            try:
-                datetime.strptime(value, "%Y/%m/%d")
-                return True
-            except ValueError:
-                return False
-
         fecha_elaboracion = self.data[AFIField.FECHA_ELABORACION]
-        fecha_elaboracion = fecha_elaboracion[~fecha_elaboracion.apply(is_date)]
+        fecha_elaboracion = fecha_elaboracion[~valid_dates(fecha_elaboracion, ["%Y/%m/%d"])]
 
         debitos = self.data[AFIField.DEBITOS].replace("", "0")
         debitos = debitos[~debitos.str.isdigit()]
@@ -278,9 +271,9 @@ class AFI(BaseDataIO):
         observaciones_movimiento = observaciones_movimiento[observaciones_movimiento == ""]
 
         return {
-            AFIField.CODIGO_DOCUMENTO: no_valid_parameters.index,
-            AFIField.CUENTA_CONTABLE: no_valid_parameters.index,
-            AFIField.CODIGO_CENTRO_COSTOS: no_valid_parameters.index,
+            AFIField.CODIGO_DOCUMENTO: no_valid_parameters,
+            AFIField.CUENTA_CONTABLE: no_valid_parameters,
+            AFIField.CODIGO_CENTRO_COSTOS: no_valid_parameters,
             AFIField.TERCERO_PRINCIPAL: tercero_principal.index,
             AFIField.NUMERO: numero.index,
             AFIField.FECHA_ELABORACION: fecha_elaboracion.index,
@@ -290,12 +283,14 @@ class AFI(BaseDataIO):
             AFIField.OBSERVACIONES_MOVIMIENTO: observaciones_movimiento.index
         }
 
-    def fullfix(self, transfers: AFITransfers = None, valid_duplicates: "AFI" = None):
+    def fullfix(self, transfers: AFITransfers = None, valid_duplicates: AFI | KeyIndex = None):
         """Ejecuta la auto reparacion de los datos de la interfaz contable."""
-        old_columns = self.set_parameters()
-        self.normalize(transfers, valid_duplicates)
-        analysis = self.analyze()
-        self.data = self.data[old_columns.to_list()]
+        # Unir, normalizar y validar con la misma version de los parametros.
+        with REFERENCES.pin():
+            old_columns = self.set_parameters()
+            self.normalize(transfers, valid_duplicates)
+            analysis = self.analyze()
+        self.data = select_fields(self.data, old_columns.to_list())
         self.sort_fields()
         return analysis
 
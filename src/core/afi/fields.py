@@ -2,20 +2,21 @@
 
 from typing import TypedDict, TypeGuard, Literal
 from enum import StrEnum
+from data.fields import DataField
 
-class AFIField(StrEnum):
+class AFIField(DataField):
     """Nombre de las columnas de la interfaz contable."""
-    CODIGO_DOCUMENTO = "Codigo Documento"
+    CODIGO_DOCUMENTO = "Codigo Documento", True
     TERCERO_PRINCIPAL = "Tercero Principal"
-    PREFIJO = "Prefijo"
+    PREFIJO = "Prefijo", True
     NUMERO = "Numero"
-    SUFIJO = "Sufijo"
+    SUFIJO = "Sufijo", True
     FECHA_ELABORACION = "Fecha Elaboracion"
-    CODIGO_MONEDA = "Codigo Moneda"
-    TASA_DE_CAMBIO = "Tasa de Cambio"
-    CUENTA_CONTABLE = "Cuenta Contable"
+    CODIGO_MONEDA = "Codigo Moneda", True
+    TASA_DE_CAMBIO = "Tasa de Cambio", True
+    CUENTA_CONTABLE = "Cuenta Contable", True
     NIT_TERCERO_PRINCIPAL = "Nit Codigo Tercero"
-    CODIGO_CENTRO_COSTOS = "Codigo Centro Costos"
+    CODIGO_CENTRO_COSTOS = "Codigo Centro Costos", True
     BASE_DE_IMPUESTOS = "Base de Impuestos"
     DEBITOS = "Debitos"
     CREDITOS = "Creditos"
@@ -1,15 +1,13 @@
 """Modulo para obtener los datos de los parametros de la interfaz contable."""
 
-from pandas import read_excel
-from data.io import BaseDataIO
-from utils.constants import PATH_STATIC_DATA, PATH_DATA
+from pandas import DataFrame
+from data.reference import REFERENCES, Reference, ReferenceDataIO
+from data.keys import KeyTable
+from utils.constants import PATH_STATIC_DATA
 from .fields import AFIParameterField
 
 FILENAME_AFI_PARAMETERS = "Interfaz_Contable_Parametros_CEGID_Y2_Retail.xlsx"
 FILEPATH_AFI_PARAMETERS = PATH_STATIC_DATA / FILENAME_AFI_PARAMETERS
-AFI_PARAMETERS = BaseDataIO(FILEPATH_AFI_PARAMETERS, support="excel", mode="path")
-AFI_PARAMETERS.load(dtype=str)
-AFI_PARAMETERS.data.fillna("", inplace=True)
 
 AFIParameterUniqueField = [
     AFIParameterField.MOVIMIENTO,
@@ -22,22 +20,43 @@ AFIParameterUniqueField = [
     AFIParameterField.CECO
 ]
 
-AFI_PARAMETERS_UNIQUE = BaseDataIO(AFI_PARAMETERS.data[AFIParameterUniqueField].copy())
-AFI_PARAMETERS_UNIQUE.load(dtype=str)
-AFI_PARAMETERS_UNIQUE.data.fillna("", inplace=True)
-AFI_PARAMETERS_UNIQUE.data.drop_duplicates(inplace=True)
+def _parameters_unique(data: DataFrame):
+    """Parametros unicos segun los campos con los que se reparan los movimientos."""
+    return data[AFIParameterUniqueField].drop_duplicates()
 
-def refresh_afi_paramters():
-    """Actualiza la informacion de los parametros de interfaz contable"""
-    filepath = PATH_DATA / FILENAME_AFI_PARAMETERS
-
-    if not filepath.is_file():
-        filepath = FILEPATH_AFI_PARAMETERS
+# Clave de los parametros con la que se unen y validan los movimientos de la interfaz contable.
+AFIParameterKeyField = [
+    AFIParameterField.COMPROBANTE,
+    AFIParameterField.CUENTA,
+    AFIParameterField.CECO
+]
 
-    try:
-        data = read_excel(filepath, dtype=str).fillna("")
-    except Exception:
-        data = read_excel(FILEPATH_AFI_PARAMETERS, dtype=str).fillna("")
+def _parameters_derive(data: DataFrame):
+    """Parametros unicos y la tabla de claves para unir y validar los movimientos."""
+    unique = _parameters_unique(data)
+    keys_data = unique[[field for field in AFIParameterField if field in unique]]
+    return {
+        "afi_parameters_unique": unique,
+        "afi_parameters_keys": KeyTable(keys_data, AFIParameterKeyField)
+    }
+
+REFERENCES.register(
+    "afi_parameters",
+    FILENAME_AFI_PARAMETERS,
+    FILEPATH_AFI_PARAMETERS,
+    derive=_parameters_derive,
+    derived=["afi_parameters_unique", "afi_parameters_keys"]
+)
+
+AFI_PARAMETERS = ReferenceDataIO(
+    Reference(REFERENCES, "afi_parameters"),
+    FILEPATH_AFI_PARAMETERS,
+    support="excel",
+    mode="path"
+)
+AFI_PARAMETERS_UNIQUE = ReferenceDataIO(Reference(REFERENCES, "afi_parameters_unique"))
+AFI_PARAMETERS_KEYS: Reference[KeyTable] = Reference(REFERENCES, "afi_parameters_keys")
 
-    AFI_PARAMETERS.data = data
-    AFI_PARAMETERS_UNIQUE.data = AFI_PARAMETERS.data[AFIParameterUniqueField].copy()
+def refresh_afi_paramters():
+    """Actualiza la informacion de los parametros de interfaz contable"""
+    REFERENCES.reload(["afi_parameters"])
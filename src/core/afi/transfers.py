@@ -1,13 +1,23 @@
 """Modulo para la lectura, de las transferencias en interfaz contable"""
 
-from datetime import datetime
-from pandas import Series
+from numpy import ndarray
+from pandas import Series, DataFrame
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import fill_frame, update_frame
+from data.dates import FORMAT_ISO, format_dates
+from data.keys import KeyIndex, hash_keys
 from core.stores import STORES_REFUND_ZF, StoreField
 from .fields import AFITransferField
 
 class AFITransfers(BaseDataIO):
     """Clase para la gestion de datos de las transferencias de interfaz contable."""
+    fields_keys = [
+        AFITransferField.ESTABLECIMIENTO_EMISOR,
+        AFITransferField.NUMERO,
+        AFITransferField.FECHA_TRANSFERENCIA
+    ]
+    __index: KeyIndex = None
+    __index_data: DataFrame = None
 
     def __init__(self,
                  *,
@@ -19,7 +29,7 @@ class AFITransfers(BaseDataIO):
         """Crea un dataframe manipulable para la informacion de las transferencias."""
         super().__init__(source, destination, support, mode)
         self.load(dtype=str, **kwargs)
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -40,7 +50,7 @@ class AFITransfers(BaseDataIO):
 
     def fix(self, data: dict[AFITransferField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def normalize(self):
         """
@@ -49,22 +59,14 @@ class AFITransfers(BaseDataIO):
             - Corrige el formato de fecha 'dd/mm/yyyy' -> 'yyyy/mm/dd'
             - Ordena los datos por la fecha de transferencia.
         """
-        stores_refund_codigos = STORES_REFUND_ZF[StoreField.CODIGO_TIENDA]
+        stores_refund_codigos = STORES_REFUND_ZF.data[StoreField.CODIGO_TIENDA]
         establecimiento_dst = self.data[AFITransferField.ESTABLECIMIENTO_DESTINATARIO]
         self.data = self.data[establecimiento_dst.isin(stores_refund_codigos)]
 
-        def format_date(value: str):
-            try:
-                date = datetime.strptime(value, "%d/%m/%Y")
-            except ValueError:
-                try:
-                    date = datetime.fromisoformat(value)
-                except ValueError:
-                    return value
-            return date.strftime("%Y/%m/%d")
-
         fecha_transferencia = self.data[AFITransferField.FECHA_TRANSFERENCIA]
-        fecha_transferencia = fecha_transferencia.apply(format_date)
+        fecha_transferencia, _ = format_dates(
+            fecha_transferencia, ["%d/%m/%Y", FORMAT_ISO], "%Y/%m/%d"
+        )
         self.data[AFITransferField.FECHA_TRANSFERENCIA] = fecha_transferencia
 
         self.data = self.data.sort_values(by=AFITransferField.FECHA_TRANSFERENCIA)
@@ -73,4 +75,19 @@ class AFITransfers(BaseDataIO):
         """Ejecuta la auto reparacion de los datos de las transferencias."""
         self.normalize()
         self.sort_fields()
+        self.__index = KeyIndex(self.keys())
+        self.__index_data = self.data
         return {}
+
+    def keys(self) -> ndarray:
+        """Clave hash de cada transferencia segun el establecimiento emisor, numero y fecha."""
+        return hash_keys(self.data, self.fields_keys)
+
+    def index_keys(self) -> KeyIndex:
+        """
+        Indice de claves de las transferencias reparadas, la reparacion se ejecuta una sola vez
+        y se vuelve a ejecutar solo si los datos se reemplazan.
+        """
+        if self.__index is None or self.__index_data is not self.data:
+            self.fullfix()
+        return self.__index
@@ -1,8 +1,10 @@
 """Modulo para la lectura, analisis y correccion de las facturas de compra."""
 
-from datetime import datetime
 from pandas import Series, Index, MultiIndex
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import fill_frame, update_frame
+from data.dates import FORMAT_ISO, format_dates, valid_dates
+from data.uniques import apply_uniques
 from core.stores import STORES, StoreField
 from core.providers import PROVIDERS, ProviderField
 from .fields import BillField
@@ -31,7 +33,7 @@ class Bills(BaseDataIO):
             kwargs["names"] = list(BillField)
 
         self.load(dtype=str, **kwargs)
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -52,7 +54,7 @@ class Bills(BaseDataIO):
 
     def fix(self, data: dict[BillField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def normalize(self):
         """
@@ -68,18 +70,8 @@ class Bills(BaseDataIO):
         id_integracion = id_integracion.str.replace(r"(\s|I|R)$", "", regex=True) + " "
         self.data[BillField.ID_INTEGRACION] = id_integracion
 
-        def format_date(value: str):
-            try:
-                date = datetime.strptime(value, "%m/%d/%Y")
-            except ValueError:
-                try:
-                    date = datetime.fromisoformat(value)
-                except ValueError:
-                    return value
-            return date.strftime("%Y-%m-%d")
-
         fecha_factura = self.data[BillField.FECHA_FACTURA]
-        fecha_factura = fecha_factura.apply(format_date)
+        fecha_factura, _ = format_dates(fecha_factura, ["%m/%d/%Y", FORMAT_ISO], "%Y-%m-%d")
         self.data[BillField.FECHA_FACTURA] = fecha_factura
 
         cantidad = self.data[BillField.CANTIDAD]
@@ -88,7 +80,7 @@ class Bills(BaseDataIO):
 
         costo_compra = self.data[BillField.COSTO_COMPRA]
         costo_compra = costo_compra.str.replace(",", "", regex=False)
-        costo_compra = costo_compra.astype(float).apply(lambda num: f"{num:.2f}").astype(str)
+        costo_compra = apply_uniques(costo_compra, lambda num: f"{float(num):.2f}").astype(str)
         self.data[BillField.COSTO_COMPRA] = costo_compra
 
         numero_factura = self.data[BillField.NUMERO_FACTURA]
@@ -106,15 +98,8 @@ class Bills(BaseDataIO):
         df_numero_factura = self.data[BillField.NUMERO_FACTURA]
         numero_factura = df_numero_factura[~df_numero_factura.str.startswith("FEV")]
 
-        def is_date(value: str):
-            try:
-                datetime.strptime(value, "%Y-%m-%d")
-                return True
-            except ValueError:
-                return False
-
         fecha_factura = self.data[BillField.FECHA_FACTURA]
-        fecha_factura = fecha_factura[~fecha_factura.apply(is_date)]
+        fecha_factura = fecha_factura[~valid_dates(fecha_factura, ["%Y-%m-%d"])]
 
         tienda = self.data[BillField.TIENDA]
         tienda = tienda[~tienda.isin(STORES.data[StoreField.CODIGO_TIENDA])]
@@ -1,15 +1,22 @@
 """Modulo para la lectura, analisis y correccion de clientes."""
 
-from datetime import datetime
+from os import PathLike
+from io import IOBase, BytesIO
+from quart.datastructures import FileStorage
 from pandas import (
-    DataFrame,
     Index,
     MultiIndex,
+    RangeIndex,
     Series,
-    concat as pandas_concat
+    read_csv
 )
-from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
-from core.dane import DANE_MUNICIPIOS, DaneMunicipiosField
+from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO, transform_dataio
+from data.snapshot import fill_frame, update_frame, select_fields, concat_fields
+from data.dates import FORMAT_ISO, format_dates, valid_dates
+from data.rules import Rule, RuleSet, RuleState
+from data.uniques import apply_uniques
+from data.reference import REFERENCES
+from core.dane import DANE_MUNICIPIOS_INDEX
 from .fields import ClientField
 from .exceptions import (
     ClientsException,
@@ -20,8 +27,79 @@ from .exceptions import (
     WARNING_MAX_CLIENTS
 )
 
+CHUNK_SIZE_CLIENTS = 50_000    # Clientes por cada parte en la reparacion por partes.
+
+def _rule_default(value: str):
+    """Regla de un campo con valor por defecto, si el valor es vacio el campo no puede ser vacio."""
+    if value:
+        return lambda values: values != value   # filas con otro valor al por defecto
+    return lambda values: values == value       # filas vacias
+
+def _rule_date(values: Series):
+    """Regla de las fechas, validas en '%d/%m/%Y', ISO o la fecha por defecto."""
+    values = values.astype(str)
+    return ~(values.eq("00/00/1900") | valid_dates(values, ["%d/%m/%Y", FORMAT_ISO]))
+
+TIPOS_IDENTIFICACION = ["CC", "PA", "CE", "IE", "NI", "SI", "TE", "TI", "TEL"]
+
+# Reglas del analisis de los clientes, se evaluan juntas en un solo recorrido de los datos.
+RULES_CLIENTS = RuleSet({
+    ClientField.TIPOIDENTIFICACION: Rule(
+        (ClientField.TIPOIDENTIFICACION,),
+        lambda values: ~values.isin(TIPOS_IDENTIFICACION)
+    ),
+    ClientField.NUMERODOCUMENTO: Rule((ClientField.NUMERODOCUMENTO,), _rule_default("")),
+    ClientField.CODIGOPOSTAL: Rule(
+        (ClientField.CODIGOPOSTAL,),
+        lambda values: ~DANE_MUNICIPIOS_INDEX.valid(values),
+        lambda: DANE_MUNICIPIOS_INDEX.lookup
+    ),
+    ClientField.NOMBRERAZONSOCIAL: Rule((ClientField.NOMBRERAZONSOCIAL,), _rule_default("")),
+    ClientField.NOMBRE2: Rule((ClientField.NOMBRE2,), _rule_default("")),
+    ClientField.APELLIDO1: Rule((ClientField.APELLIDO1,), _rule_default("")),
+    ClientField.APELLIDO2: Rule((ClientField.APELLIDO2,), _rule_default("")),
+    ClientField.SEXO: Rule((ClientField.SEXO,), lambda values: ~values.isin(["F", "M"])),
+    ClientField.PROVEEDOR: Rule((ClientField.PROVEEDOR,), lambda values: values != ""),
+    ClientField.CLIENTE: Rule((ClientField.CLIENTE,), _rule_default("X")),
+    ClientField.FORMULADIRECCION: Rule((ClientField.FORMULADIRECCION,), _rule_default("")),
+    ClientField.FORMULADIRECCIONMM: Rule((ClientField.FORMULADIRECCIONMM,), _rule_default("")),
+    ClientField.TELEFONO1: Rule((ClientField.TELEFONO1,), _rule_default("")),
+    ClientField.TELEFONOMOVIL: Rule((ClientField.TELEFONOMOVIL,), _rule_default("")),
+    ClientField.CORREOCONTACTO: Rule((ClientField.CORREOCONTACTO,), _rule_default("")),
+    ClientField.FECHADENACIMIENTO: Rule((ClientField.FECHADENACIMIENTO,), _rule_date),
+    ClientField.FECHADECREACION: Rule((ClientField.FECHADECREACION,), _rule_date),
+    ClientField.ESTADO: Rule((ClientField.ESTADO,), _rule_default("ACTIVO")),
+    ClientField.REGIMENVENTAS: Rule((ClientField.REGIMENVENTAS,), _rule_default("SIMPLIFICADO")),
+    ClientField.CODIGONATURALEZAJURIDICA: Rule(
+        (ClientField.CODIGONATURALEZAJURIDICA,), _rule_default("2")
+    ),
+    ClientField.CODIGOACTIVIDADECONOMICA: Rule(
+        (ClientField.CODIGOACTIVIDADECONOMICA,), _rule_default("0010")
+    ),
+    ClientField.CODIGOCLASIFICACIONRENTA: Rule(
+        (ClientField.CODIGOCLASIFICACIONRENTA,), _rule_default("PND")
+    ),
+    ClientField.NOMBRECONTACTO: Rule((ClientField.NOMBRECONTACTO,), _rule_default("")),
+    ClientField.CARGOCONTACTO: Rule((ClientField.CARGOCONTACTO,), _rule_default("CLIENTE")),
+    ClientField.FACTURACIONELECTRONICACONTACTO: Rule(
+        (ClientField.FACTURACIONELECTRONICACONTACTO,), _rule_default("X")
+    ),
+    ClientField.PAIS: Rule((ClientField.PAIS,), _rule_default("169")),
+    ClientField.DEPARTAMENTO: Rule(
+        (ClientField.DEPARTAMENTO, ClientField.CODIGOPOSTAL),
+        lambda departamento, codigo_postal: departamento.astype(str).ne(
+            codigo_postal.astype(str).str[:2]
+        )
+    ),
+    ClientField.DIVISA: Rule((ClientField.DIVISA,), _rule_default("COP"))
+})
+
 class Clients(BaseDataIO):
     """Clase para la gestion de datos de los clientes."""
+    field_type = ClientField
+    # Campos que autofix valida sobre todos los clientes y no solo por cada fila.
+    fields_autofix_global = [ClientField.NUMERODOCUMENTO, ClientField.TIPOIDENTIFICACION]
+    __analysis_state: RuleState | None
 
     def __init__(self,
                  *,
@@ -34,7 +112,14 @@ class Clients(BaseDataIO):
 
         super().__init__(source, destination, support, mode)
         self.load(dtype=str, **kwargs)          # Lectura de datos siempre en String
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
+        self.__analysis_state = None
+
+    def __getstate__(self):
+        """Las copias, como las que se guardan en disco, no conservan el estado del analisis."""
+        state = super().__getstate__().copy()
+        state["_Clients__analysis_state"] = None
+        return state
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -51,11 +136,11 @@ class Clients(BaseDataIO):
         if not fields:
             fields = list(ClientField)
         fields = list(dict.fromkeys(fields)) # Campos unicos y ordenados
-        self.data = self.data[fields]
+        self.data = select_fields(self.data, fields)
 
     def fix(self, data: dict[ClientField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def normalize(self):
         """
@@ -78,31 +163,24 @@ class Clients(BaseDataIO):
             ClientField.FECHADECREACION
         }
 
-        # Añadir columnas faltantes con valores vacios usando pandas.concat
+        # Añadir columnas faltantes con valores vacios sin copiar las existentes.
         missing_fields = {
             field: Series("", index=self.data.index, dtype=str)
             for field in ClientField
             if field not in self.data
         }
         if missing_fields:
-            self.data = pandas_concat([self.data, DataFrame(missing_fields)], axis=1)
+            self.data = concat_fields(self.data, missing_fields)
 
         # Procesar campos en grupos:
         #  - todo en mayusculas, excepto algunos campos.
         #  - elimina los espacios en blancos.
         #  - da formato a fechas.
 
-        def format_date(value: str):
-            try:
-                datetime.strptime(value, "%d/%m/%Y")
-                return value
-            except ValueError:
-                pass
-            try:
-                return datetime.fromisoformat(value).strftime("%d/%m/%Y")
-            except ValueError:
-                pass
-            return value
+        def format_date(values: Series):
+            # Las fechas '%d/%m/%Y' se mantienen, las ISO se pasan a '%d/%m/%Y'.
+            dates, _ = format_dates(values, [FORMAT_ISO], "%d/%m/%Y")
+            return values.where(valid_dates(values, ["%d/%m/%Y"]), dates)
 
         updates: dict[ClientField, Series] = {}
         for field in ClientField:
@@ -116,10 +194,10 @@ class Clients(BaseDataIO):
             updates[field] = series.str.strip()
 
             if field in fields_dates and field in updates:
-                updates[field] = updates[field].astype(str).apply(format_date)
+                updates[field] = format_date(updates[field].astype(str))
 
-        # Todos los cambios en una sola aplicacion al dataframe.
-        self.data.update(updates)
+        # Todos los cambios en una sola aplicacion al dataframe, solo columnas modificadas.
+        update_frame(self.data, updates)
 
         # Filtrar los clientes excluidos, ej 222222222
 
@@ -127,96 +205,17 @@ class Clients(BaseDataIO):
         numero_documento = self.data[ClientField.NUMERODOCUMENTO]
         numero_documento = numero_documento.isin(excluded_numero_documento)
         numero_documento = numero_documento[numero_documento]
-        self.data.drop(index=numero_documento.index, inplace=True)
-
-    def analyze(self):
-        """Analiza los datos y devuelve los erroes encontrados."""
-
-        def idx(field: ClientField, value: str):
-            """Verifica si el campo tiene un valor por defecto o si es vacio regresa los indices."""
-            df_field = self.data[field]
-            if value:
-                return df_field[df_field != value].index # filas con valor por defecto
-            return df_field[df_field == value].index # filas vacias
-
-        df_field = self.data[ClientField.TIPOIDENTIFICACION]
-        list_tipos_identificacion = ["CC", "PA", "CE", "IE", "NI", "SI", "TE", "TI", "TEL"]
-        tipos_identificacion = df_field.isin(list_tipos_identificacion)
-        tipos_identificacion = tipos_identificacion[~tipos_identificacion].index
-
-        df_codigo_postal = self.data[ClientField.CODIGOPOSTAL].astype(str)
-        codigo_postal = df_codigo_postal.isin(DANE_MUNICIPIOS.data[DaneMunicipiosField.CODIGO_POSTAL])
-        codigo_postal = codigo_postal[~codigo_postal].index
-
-        df_field = self.data[ClientField.SEXO]
-        cliente_sexo = df_field.isin(["F", "M"])
-        cliente_sexo = cliente_sexo[~cliente_sexo | (df_field == "")].index
-
-        df_field = self.data[ClientField.PROVEEDOR]
-        proveedor = df_field[~(df_field == "")].index
-
-        df_field = self.data[ClientField.CLIENTE]
-        cliente = df_field.isin(["X"])
-        cliente = cliente[~cliente].index
-
-        df_field = self.data[ClientField.DEPARTAMENTO].astype(str)
-        departamento = df_field.eq(df_codigo_postal.apply(lambda x: x[:2]))
-        departamento = departamento[~departamento].index
-
-        def valid_date(value: str):
-            if value == "00/00/1900":
-                return True
-            try:
-                datetime.strptime(value, "%d/%m/%Y")
-                return True
-            except ValueError:
-                pass
-            try:
-                datetime.fromisoformat(value)
-                return True
-            except ValueError:
-                return False
-
-        df_field = self.data[ClientField.FECHADECREACION].astype(str)
-        fecha_creacion = df_field.apply(valid_date)
-        fecha_creacion = df_field[~fecha_creacion].index
-
-        df_field = self.data[ClientField.FECHADENACIMIENTO].astype(str)
-        fecha_nacimiento = df_field.apply(valid_date)
-        fecha_nacimiento = df_field[~fecha_nacimiento].index
-
-        facturacion_elec_contacto = idx(ClientField.FACTURACIONELECTRONICACONTACTO, "X")
+        if len(numero_documento) > 0:     # drop siempre copia las columnas.
+            self.data.drop(index=numero_documento.index, inplace=True)
 
-        return {
-            ClientField.TIPOIDENTIFICACION: tipos_identificacion,
-            ClientField.NUMERODOCUMENTO: idx(ClientField.NUMERODOCUMENTO, ""),
-            ClientField.CODIGOPOSTAL: codigo_postal,
-            ClientField.NOMBRERAZONSOCIAL: idx(ClientField.NOMBRERAZONSOCIAL, ""),
-            ClientField.NOMBRE2: idx(ClientField.NOMBRE2, ""),
-            ClientField.APELLIDO1: idx(ClientField.APELLIDO1, ""),
-            ClientField.APELLIDO2: idx(ClientField.APELLIDO2, ""),
-            ClientField.SEXO: cliente_sexo,
-            ClientField.PROVEEDOR: proveedor,
-            ClientField.CLIENTE: cliente,
-            ClientField.FORMULADIRECCION: idx(ClientField.FORMULADIRECCION, ""),
-            ClientField.FORMULADIRECCIONMM: idx(ClientField.FORMULADIRECCIONMM, ""),
-            ClientField.TELEFONO1: idx(ClientField.TELEFONO1, ""),
-            ClientField.TELEFONOMOVIL: idx(ClientField.TELEFONOMOVIL, ""),
-            ClientField.CORREOCONTACTO: idx(ClientField.CORREOCONTACTO, ""),
-            ClientField.FECHADENACIMIENTO: fecha_nacimiento,
-            ClientField.FECHADECREACION: fecha_creacion,
-            ClientField.ESTADO: idx(ClientField.ESTADO, "ACTIVO"),
-            ClientField.REGIMENVENTAS: idx(ClientField.REGIMENVENTAS, "SIMPLIFICADO"),
-            ClientField.CODIGONATURALEZAJURIDICA: idx(ClientField.CODIGONATURALEZAJURIDICA, "2"),
-            ClientField.CODIGOACTIVIDADECONOMICA: idx(ClientField.CODIGOACTIVIDADECONOMICA, "0010"),
-            ClientField.CODIGOCLASIFICACIONRENTA: idx(ClientField.CODIGOCLASIFICACIONRENTA, "PND"),
-            ClientField.NOMBRECONTACTO: idx(ClientField.NOMBRECONTACTO, ""),
-            ClientField.CARGOCONTACTO: idx(ClientField.CARGOCONTACTO, "CLIENTE"),
-            ClientField.FACTURACIONELECTRONICACONTACTO: facturacion_elec_contacto,
-            ClientField.PAIS: idx(ClientField.PAIS, "169"),
-            ClientField.DEPARTAMENTO: departamento,
-            ClientField.DIVISA: idx(ClientField.DIVISA, "COP")
-        }
+    def analyze(self, incremental: bool = False):
+        """
+        Analiza los datos y devuelve los erroes encontrados.
+        Con `incremental` solo se revisan las filas que cambiaron desde el ultimo analisis.
+        """
+        state = self.__analysis_state if incremental else None
+        analysis, self.__analysis_state = RULES_CLIENTS.evaluate(self.data, state)
+        return analysis
 
     def autofix_default(self,
                         analysis: dict[ClientField, Index | MultiIndex],
@@ -252,7 +251,8 @@ class Clients(BaseDataIO):
                     return ""
                 return value[0]
 
-            fchr_num_documento = self.data[ClientField.NUMERODOCUMENTO].astype(str).apply(first_chr)
+            num_documento = self.data[ClientField.NUMERODOCUMENTO].astype(str)
+            fchr_num_documento = apply_uniques(num_documento, first_chr)
 
             all_updates.update({
                 ClientField.CODIGOALTERNO1: self.data[ClientField.NUMERODOCUMENTO],
@@ -301,16 +301,21 @@ class Clients(BaseDataIO):
         """Corrige los campos respecto a las direcciones de los clientes."""
         idx_direccion = analysis[ClientField.FORMULADIRECCIONMM]
         if len(idx_direccion) > 0:
-            map_municipios = DANE_MUNICIPIOS.data.set_index(DaneMunicipiosField.CODIGO_POSTAL)
-            map_municipios = map_municipios[DaneMunicipiosField.MUNICIPIO].to_dict()
-            municipios = self.data.loc[idx_direccion, ClientField.CODIGOPOSTAL].map(
-                lambda x: map_municipios.get(x, "CALLE")
-            )
+            codigo_postal = self.data.loc[idx_direccion, ClientField.CODIGOPOSTAL]
+            municipios = DANE_MUNICIPIOS_INDEX.municipio(codigo_postal, default="CALLE")
             all_updates[ClientField.FORMULADIRECCIONMM] = municipios
             all_updates[ClientField.FORMULADIRECCION] = municipios
 
-    def autofix(self, analysis: dict[ClientField, Index | MultiIndex]):
-        """Modifica los datos de los clientes, corrige los valores y establece por defecto."""
+    def autofix(self,
+                analysis: dict[ClientField, Index | MultiIndex],
+                analysis_global: dict[ClientField, Index | MultiIndex] = None):
+        """
+        Modifica los datos de los clientes, corrige los valores y establece por defecto.
+        `analysis_global` reemplaza el analisis de los campos validados sobre todos los clientes.
+        """
+        if analysis_global:
+            analysis = {**analysis, **analysis_global}
+
         # Recoleta todas las actualizaciones en un solo diccionario.
         all_updates = {}
 
@@ -327,15 +332,102 @@ class Clients(BaseDataIO):
 
         # Aplicar todas las actualizaciones recopiladas a la vez si existe alguna.
         if all_updates:
-            self.data.update(all_updates)
+            update_frame(self.data, all_updates)
 
-    def fullfix(self):
+    def fullfix(self, analysis_global: dict[ClientField, Index | MultiIndex] = None):
         """Ejecuta la auto reparacion de los datos de los clientes."""
+        # Los analisis y la reparacion usan la misma version de las referencias.
+        with REFERENCES.pin():
+            self.normalize()
+            analysis = self.analyze()
+            self.autofix(analysis, analysis_global)
+            self.sort_fields()
+            return self.analyze(incremental=True)   # Solo las filas que modifico autofix.
+
+    def analyze_global(self) -> dict[ClientField, Index | MultiIndex]:
+        """Normaliza y analiza los campos que autofix valida sobre todos los clientes."""
         self.normalize()
-        analysis = self.analyze()
-        self.autofix(analysis)
-        self.sort_fields()
-        return self.analyze()
+        analysis = Clients.analyze(self)    # Siempre por ClientField, sin importar el POS.
+        return {field: analysis[field] for field in self.fields_autofix_global}
+
+    @classmethod
+    def fullfix_chunks(cls,
+                       *args: ...,
+                       source: DataIO,
+                       destination: DataIO,
+                       mode: ModeDataIO = "object",
+                       chunksize: int = CHUNK_SIZE_CLIENTS,
+                       compact: bool = False,
+                       kwargs_save: dict = None,
+                       **kwargs: ...):
+        """
+        Ejecuta la auto reparacion por partes de un CSV de clientes y escribe cada parte reparada
+        en el destino, la memoria depende del tamaño de cada parte y no del total de clientes.
+
+        Se lee el origen dos veces, primero para los campos que autofix valida sobre todos los
+        clientes y luego para reparar, asi el resultado es igual que reparar todo a la vez.
+        Devuelve el analisis con los indices globales de las filas y el total de clientes.
+        """
+        source = transform_dataio(source, "csv", mode, **kwargs)
+        kwargs_save = kwargs_save or {}
+        kwargs.update(dtype=str, index_col=False, chunksize=max(1, chunksize))
+
+        if isinstance(source, FileStorage):
+            source = source.stream
+        if isinstance(source, bytes):
+            source = BytesIO(source)
+        if isinstance(source, IOBase) and not source.seekable():
+            raise ValueError("el origen de los clientes debe permitir volver a leerse (seek)")
+
+        position = source.tell() if isinstance(source, IOBase) else 0
+
+        def chunks():
+            if isinstance(source, IOBase):
+                source.seek(position)
+            offset = 0
+            with read_csv(source, **kwargs) as reader:
+                for chunk in reader:
+                    chunk.index = RangeIndex(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    yield cls(*args, source=chunk.fillna(""), support="object", compact=compact)
+
+        # Las dos lecturas usan la misma version de las referencias (municipios).
+        with REFERENCES.pin():
+            # Primera lectura, analisis de los campos validados sobre todos los clientes.
+            analysis_global: dict[ClientField, Index | MultiIndex] = {}
+            for clients in chunks():
+                for field, index in clients.analyze_global().items():
+                    if field in analysis_global:
+                        index = analysis_global[field].append(index)
+                    analysis_global[field] = index
+                if all(len(index) > 0 for index in analysis_global.values()):
+                    break   # autofix solo valida si estan vacios, no hace falta seguir leyendo.
+
+            # Segunda lectura, repara y escribe cada parte en el destino.
+            if isinstance(destination, (str, PathLike)):
+                encoding = kwargs_save.pop("encoding", "utf-8")
+                file = open(destination, "w", encoding=encoding, newline="")
+            else:
+                file = destination
+
+            analysis = {}
+            total = 0
+            header_written = False  # Las primeras partes pueden quedar vacias al repararse.
+            try:
+                for clients in chunks():
+                    analysis_chunk = clients.fullfix(analysis_global)
+                    clients.data.to_csv(file, header=not header_written, **kwargs_save)
+                    header_written = True
+                    total += len(clients.data)
+                    for key, index in analysis_chunk.items():
+                        if key in analysis:
+                            index = analysis[key].append(index)
+                        analysis[key] = index
+            finally:
+                if file is not destination:
+                    file.close()
+
+        return analysis, total
 
     def exceptions(self, analysis: dict[ClientField, Index | MultiIndex]):
         """Obtiene todos los errores y los mensajes propios por cada campo de los clientes."""
@@ -1,11 +1,12 @@
 """Modulo para la definicion de los campos de la funcionalidad de clientes."""
 
 from enum import StrEnum
+from data.fields import DataField
 from dataclasses import dataclass, field as dataclass_field
 
-class ClientField(StrEnum):
+class ClientField(DataField):
     """Mapeo de campos o nombre de las columnas de los clientes."""
-    TIPOIDENTIFICACION = "TIPOIDENTIFICACION"
+    TIPOIDENTIFICACION = "TIPOIDENTIFICACION", True
     NUMERODOCUMENTO = "NUMERODOCUMENTO"
     DV = "DV"
     CODIGOALTERNO1 = "CODIGOALTERNO1"
@@ -18,9 +19,9 @@ class ClientField(StrEnum):
     APELLIDO2 = "APELLIDO2"
     RAZONSOCIALNOMBRES = "RAZONSOCIALNOMBRES"
     NOMBRECOMERCIALAPELLIDOS = "NOMBRECOMERCIALAPELLIDOS"
-    SEXO = "SEXO"
-    CLIENTE = "CLIENTE"
-    PROVEEDOR = "PROVEEDOR"
+    SEXO = "SEXO", True
+    CLIENTE = "CLIENTE", True
+    PROVEEDOR = "PROVEEDOR", True
     VENDEDOR = "VENDEDOR"
     TRANSPORTADOR = "TRANSPORTADOR"
     EMPLEADO = "EMPLEADO"
@@ -75,7 +76,7 @@ class ClientField(StrEnum):
     FECHADENACIMIENTO = "FECHADENACIMIENTO"
     FECHADECREACION = "FECHADECREACION"
     LONGITUDCODIGOSSCC = "LONGITUDCODIGOSSCC"
-    ESTADO = "ESTADO"
+    ESTADO = "ESTADO", True
     CODIGOLISTADEPRECIOS = "CODIGOLISTADEPRECIOS"
     CODIGODOCUMENTOVENDEDOR = "CODIGODOCUMENTOVENDEDOR"
     CODIGODOCUMENTOASOCIADO = "CODIGODOCUMENTOASOCIADO"
@@ -101,10 +102,10 @@ class ClientField(StrEnum):
     NORESPONSABLEIVA = "NORESPONSABLEIVA"
     PERTENECEALREGIMENSIMPLE = "PERTENECEALREGIMENSIMPLE"
     ACOGIDOLEYREORGANIZACION = "ACOGIDOLEYREORGANIZACION"
-    REGIMENVENTAS = "REGIMENVENTAS"
-    CODIGONATURALEZAJURIDICA = "CODIGONATURALEZAJURIDICA"
-    CODIGOACTIVIDADECONOMICA = "CODIGOACTIVIDADECONOMICA"
-    CODIGOCLASIFICACIONRENTA = "CODIGOCLASIFICACIONRENTA"
+    REGIMENVENTAS = "REGIMENVENTAS", True
+    CODIGONATURALEZAJURIDICA = "CODIGONATURALEZAJURIDICA", True
+    CODIGOACTIVIDADECONOMICA = "CODIGOACTIVIDADECONOMICA", True
+    CODIGOCLASIFICACIONRENTA = "CODIGOCLASIFICACIONRENTA", True
     CERTIFICADODELADIAN = "CERTIFICADODELADIAN"
     IVAPROVEEDOR = "IVAPROVEEDOR"
     IVACLIENTE = "IVACLIENTE"
@@ -129,7 +130,7 @@ class ClientField(StrEnum):
     NUMERODOCUMENTOCONTACTO = "NUMERODOCUMENTOCONTACTO"
     CODIGOALTERNOCONTACTO = "CODIGOALTERNOCONTACTO"
     NOMBRECONTACTO = "NOMBRECONTACTO"
-    CARGOCONTACTO = "CARGOCONTACTO"
+    CARGOCONTACTO = "CARGOCONTACTO", True
     TELEFONOCONTACTO = "TELEFONOCONTACTO"
     TELEFONOMOVILCONTACTO = "TELEFONOMOVILCONTACTO"
     CORREOCONTACTO = "CORREOCONTACTO"
@@ -140,13 +141,13 @@ class ClientField(StrEnum):
     CERTIFICADOPROVEEDORCONTACTO = "CERTIFICADOPROVEEDORCONTACTO"
     CONTRATOLABORALCONTACTO = "CONTRATOLABORALCONTACTO"
     CARTERACONTACTO = "CARTERACONTACTO"
-    FACTURACIONELECTRONICACONTACTO = "FACTURACIONELECTRONICACONTACTO"
+    FACTURACIONELECTRONICACONTACTO = "FACTURACIONELECTRONICACONTACTO", True
     CAMPOLIBRE = "CAMPOLIBRE"
     CAMPOLIBRE2 = "CAMPOLIBRE2"
     CAMPOLIBRE3 = "CAMPOLIBRE3"
-    PAIS = "PAIS"
-    DEPARTAMENTO = "DEPARTAMENTO"
-    DIVISA = "DIVISA"
+    PAIS = "PAIS", True
+    DEPARTAMENTO = "DEPARTAMENTO", True
+    DIVISA = "DIVISA", True
 
 class ClientFieldShopify(StrEnum):
     """Mapeo de campos o nombre de las columnas de los clientes de Shopify App Matrixify."""
@@ -4,6 +4,7 @@ from typing import TypeVar, Generic
 from pandas import DataFrame, Series, Index, MultiIndex
 from core.mapfields import MapFields
 from data.io import DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import snapshot, update_frame, select_fields
 from .fields import ClientField
 from .clients import Clients
 
@@ -32,7 +33,7 @@ class ClientsPOS(Generic[_K], Clients):
             **kwargs
         )
         self.__mapfields = mapfields
-        self.__data_pos = self.data.copy(True)
+        self.__data_pos = snapshot(self.data)   # Comparte las columnas hasta que cambien.
 
     @property
     def data_pos(self):
@@ -71,7 +72,7 @@ class ClientsPOS(Generic[_K], Clients):
     def sort_fields(self, fields: list[_K] = None):
         map_fields = fields if fields else self.mapfields.fields_1
         map_fields = list(dict.fromkeys(map_fields)) # Campos unicos y ordenados
-        self.data_pos = self.data_pos[map_fields]
+        self.data_pos = select_fields(self.data_pos, map_fields)
         super().sort_fields()
 
     def fix(self, data: dict[tuple[_K, ClientField], Series]):
@@ -80,17 +81,17 @@ class ClientsPOS(Generic[_K], Clients):
 
         for (field, mapfield), value in data.items():
             if (field, mapfield) in self.mapfields:
-                callback = self.mapfields[field, mapfield].lookup()
-                if callback:
-                    value = value.apply(callback)
+                mapper = self.mapfields[field, mapfield].compile()
+                if mapper:
+                    value = mapper(value)
 
             data_mapfields[mapfield] = value
 
-        self.data_pos.update(data_fields)
+        update_frame(self.data_pos, data_fields)
         super().fix(data_mapfields)
 
-    def analyze(self) -> dict[tuple[_K, ClientField], Index | MultiIndex]:
-        analysis = super().analyze()
+    def analyze(self, incremental: bool = False) -> dict[tuple[_K, ClientField], Index | MultiIndex]:
+        analysis = super().analyze(incremental)
         analysis_pos = {}
 
         for mapfield, value in analysis.items():
@@ -102,11 +103,13 @@ class ClientsPOS(Generic[_K], Clients):
 
         return analysis_pos
 
-    def autofix(self, analysis: dict[tuple[_K, ClientField], Index | MultiIndex]):
+    def autofix(self,
+                analysis: dict[tuple[_K, ClientField], Index | MultiIndex],
+                analysis_global: dict[ClientField, Index | MultiIndex] = None):
         # NO autofix client data pos
         # autofix client data
         super_analysis = {mapfield: v for (_, mapfield), v in analysis.items()}
-        super().autofix(super_analysis)
+        super().autofix(super_analysis, analysis_global)
 
     def mapdata(self, mapfields: set[tuple[_K, ClientField]]):
         """Toma los datos de los campos principales y los mapea en los campos que relaciona."""
@@ -118,10 +121,16 @@ class ClientsPOS(Generic[_K], Clients):
 
         self.fix(data)
 
-    def fullfix(self) -> dict[tuple[_K, ClientField], Index | MultiIndex]:
+    def fullfix(self, analysis_global: dict[ClientField, Index | MultiIndex] = None
+                ) -> dict[tuple[_K, ClientField], Index | MultiIndex]:
         self.normalize() # crea los campos que no existen para el mapeo.
         self.mapdata(self.mapfields)
-        return super().fullfix()
+        return super().fullfix(analysis_global)
+
+    def analyze_global(self) -> dict[ClientField, Index | MultiIndex]:
+        self.normalize() # crea los campos que no existen para el mapeo.
+        self.mapdata(self.mapfields)
+        return super().analyze_global()
 
     def exceptions(self, analysis: dict[tuple[_K, ClientField], Index | MultiIndex]):
         analysis_mapfields = {mapfields[1]: v for mapfields, v in analysis.items()}
@@ -1,7 +1,7 @@
 """Modulo para organizar la inforamcion de los clientes segun el Sistema POS de CEGID Y2 Retail."""
 
-from datetime import datetime
 from core.mapfields import MapFields
+from data.dates import FORMAT_ISO, format_dates
 from .fields import ClientField, ClientFieldShopify
 from .pos import ClientsPOS
 
@@ -50,15 +50,10 @@ class ClientsShopify(ClientsPOS[ClientFieldShopify]):
         # Formato de fechas
         fields_date = {ClientFieldShopify.CREATED_AT}
 
-        def format_date(value: str):
-            try:
-                return datetime.strptime(value, self.date_format).isoformat()
-            except ValueError:
-                return value
-
         for field_date in fields_date:
             if field_date in self.data_pos:
-                self.data_pos[field_date] = self.data_pos[field_date].apply(format_date)
+                dates, _ = format_dates(self.data_pos[field_date], [self.date_format], FORMAT_ISO)
+                self.data_pos[field_date] = dates
 
         # Nombres
         in_field_second_name = ClientFieldShopify.SECOND_NAME in self.data_pos
@@ -93,15 +88,9 @@ class ClientsShopify(ClientsPOS[ClientFieldShopify]):
         # Union Direcciones
         in_field_address_2 = ClientFieldShopify.ADDRESS_LINE_2 in self.data_pos
         if ClientFieldShopify.ADDRESS_LINE_1 in self.data_pos and in_field_address_2:
-            def join_address(row):
-                if row[ClientFieldShopify.ADDRESS_LINE_2].strip() == '':
-                    return row[ClientFieldShopify.ADDRESS_LINE_1]
-
-                address = row[ClientFieldShopify.ADDRESS_LINE_1]
-                address += ", " + row[ClientFieldShopify.ADDRESS_LINE_2]
-                return address
-
-            df_address = self.data_pos.apply(join_address, axis=1)
+            address_1 = self.data_pos[ClientFieldShopify.ADDRESS_LINE_1].astype(object)
+            address_2 = self.data_pos[ClientFieldShopify.ADDRESS_LINE_2].astype(object)
+            df_address = address_1.where(address_2.str.strip() == "", address_1 + ", " + address_2)
             self.data_pos[ClientFieldShopify.ADDRESS_LINE_1] = df_address
             self.data_pos = self.data_pos.drop(ClientFieldShopify.ADDRESS_LINE_2, axis=1)
 
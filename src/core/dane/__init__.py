@@ -4,6 +4,9 @@ __version__ = "1.0.0"
 
 __all__ = [
     "DANE_MUNICIPIOS",
+    "DANE_MUNICIPIOS_INDEX",
+    "DaneMunicipiosIndex",
+    "DaneMunicipiosLookup",
     "DaneMunicipiosField",
     "FILENAME_DANE_MUNICIPIOS",
     "FILEPATH_DANE_MUNICIPIOS",
@@ -12,6 +15,9 @@ __all__ = [
 
 from .municipios import (
     DANE_MUNICIPIOS,
+    DANE_MUNICIPIOS_INDEX,
+    DaneMunicipiosIndex,
+    DaneMunicipiosLookup,
     FILENAME_DANE_MUNICIPIOS,
     FILEPATH_DANE_MUNICIPIOS,
     refresh_dane_municipios
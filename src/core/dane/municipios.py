@@ -1,25 +1,84 @@
 """Modulo para la validacion de los municipios en Colombia."""
 
-from pandas import read_excel
-from data.io import BaseDataIO
-from utils.constants import PATH_STATIC_DATA, PATH_DATA
+from typing import NamedTuple
+from numpy import ndarray, append
+from pandas import DataFrame, Series, CategoricalIndex
+from data.reference import REFERENCES, Reference, ReferenceDataIO
+from data.uniques import transform_uniques
+from utils.constants import PATH_STATIC_DATA
+from .fields import DaneMunicipiosField
 
 FILENAME_DANE_MUNICIPIOS = "Dane_Municipios.xlsx"
 FILEPATH_DANE_MUNICIPIOS = PATH_STATIC_DATA / FILENAME_DANE_MUNICIPIOS
-DANE_MUNICIPIOS = BaseDataIO(FILEPATH_DANE_MUNICIPIOS, support="excel", mode="path")
-DANE_MUNICIPIOS.load(dtype=str)
-DANE_MUNICIPIOS.data.fillna("", inplace=True)
 
-def refresh_dane_municipios():
-    """Actualiza la informacion de los municipios"""
-    filepath = PATH_DATA / FILENAME_DANE_MUNICIPIOS
+class DaneMunicipiosLookup(NamedTuple):
+    """Codigos postales validos y el municipio de cada codigo postal, no se modifican."""
+    codigos_postales: frozenset[str]
+    municipios: Series
+
+    @classmethod
+    def build(cls, data: DataFrame):
+        """Construye el indice de busqueda de los datos de los municipios."""
+        codigo_postal = data[DaneMunicipiosField.CODIGO_POSTAL]
+
+        # Con codigos postales repetidos se toma el ultimo municipio.
+        unique = data.drop_duplicates(DaneMunicipiosField.CODIGO_POSTAL, keep="last")
+        municipios = Series(
+            unique[DaneMunicipiosField.MUNICIPIO].to_numpy(),
+            index=CategoricalIndex(unique[DaneMunicipiosField.CODIGO_POSTAL].to_numpy()),
+            dtype=object
+        )
+
+        return cls(frozenset(codigo_postal), municipios)
+
+REFERENCES.register(
+    "dane_municipios",
+    FILENAME_DANE_MUNICIPIOS,
+    FILEPATH_DANE_MUNICIPIOS,
+    derive=lambda data: {"dane_municipios_lookup": DaneMunicipiosLookup.build(data)},
+    derived=["dane_municipios_lookup"]
+)
+
+DANE_MUNICIPIOS = ReferenceDataIO(
+    Reference(REFERENCES, "dane_municipios"),
+    FILEPATH_DANE_MUNICIPIOS,
+    support="excel",
+    mode="path"
+)
+
+class DaneMunicipiosIndex:
+    """
+    Indice de busqueda de los municipios, se construye con cada version de las referencias y
+    quien lo usa siempre ve una version completa del indice.
+    """
+    __reference: Reference[DaneMunicipiosLookup]
 
-    if not filepath.is_file():
-        filepath = FILEPATH_DANE_MUNICIPIOS
+    def __init__(self, reference: Reference[DaneMunicipiosLookup]):
+        self.__reference = reference
 
-    try:
-        data = read_excel(filepath, dtype=str).fillna("")
-    except Exception:
-        data = read_excel(FILEPATH_DANE_MUNICIPIOS, dtype=str).fillna("")
+    @property
+    def lookup(self) -> DaneMunicipiosLookup:
+        """Indice de la version de las referencias en uso."""
+        return self.__reference.get()
 
-    DANE_MUNICIPIOS.data = data
+    def valid(self, codigos_postales: Series) -> Series:
+        """Mascara de los codigos postales que existen en la DANE."""
+        lookup = self.lookup
+        return codigos_postales.astype(str).isin(lookup.codigos_postales)
+
+    def municipio(self, codigos_postales: Series, default: str = "") -> Series:
+        """Municipio de cada codigo postal, los que no existen toman el valor por defecto."""
+        lookup = self.lookup
+
+        def func(uniques: Series) -> ndarray:
+            # La posicion -1 de los que no existen es el valor por defecto al final.
+            municipios = append(lookup.municipios.to_numpy(), default)
+            return municipios[lookup.municipios.index.get_indexer(uniques)]
+
+        return transform_uniques(codigos_postales, func)
+
+DANE_MUNICIPIOS_INDEX = DaneMunicipiosIndex(Reference(REFERENCES, "dane_municipios_lookup"))
+
+def refresh_dane_municipios():
+    """Actualiza la informacion de los municipios"""
+    REFERENCES.reload(["dane_municipios"])
@@ -1,7 +1,8 @@
 """Modulo para organizar los datos que se van a homologar."""
 
-from typing import TypeVar, Generic
+from typing import Callable, TypeVar, Generic
 from collections import UserDict
+from pandas import Series
 from utils.typing import is_dict_string
 from .mapfunc import MapFieldFunc
 
@@ -11,8 +12,10 @@ _KS = TypeVar("_KS", bound=str) # key segundary
 class MapData(UserDict):
     """Almacena los datos que se homologan y asignar la funcion aplicable de los mismos."""
     mapfunc: MapFieldFunc
+    __compiled: dict[str, Callable[[Series], Series]]
 
     def __init__(self, *args: str, func: MapFieldFunc, **kwargs: str):
+        self.__compiled = {}
         super().__init__(*args, **kwargs)
         if not is_dict_string(self.data):
             raise TypeError("MapData es de tipo 'dict[str, str]]'")
@@ -26,6 +29,20 @@ class MapData(UserDict):
         # FEAT: wrapper control errors to callback
         return self.mapfunc.cb(self.data, default)
 
+    def __setitem__(self, key: str, item: str):
+        self.__compiled.clear()
+        super().__setitem__(key, item)
+
+    def __delitem__(self, key: str):
+        self.__compiled.clear()
+        super().__delitem__(key)
+
+    def compile(self, *, default: str) -> Callable[[Series], Series]:
+        """Funcion que homologa una Serie completa, se reutiliza hasta que cambien los datos."""
+        if default not in self.__compiled:
+            self.__compiled[default] = self.mapfunc.compile(self.data, default)
+        return self.__compiled[default]
+
 class MapFieldData(Generic[_KP, _KS]):
     """Contiene los datos que se homologan en un MapField, dependiendo de la funcion."""
     __mapfield: tuple[_KP, _KS]
@@ -72,24 +89,19 @@ class MapFieldData(Generic[_KP, _KS]):
     def re(self):
         return self.__re
 
+    def first(self) -> MapData | None:
+        """Primera funcion MapFieldFunc que contenga datos."""
+        for mapdata in (self.eq, self.di, self.co, self.nc, self.pf, self.sf, self.re):
+            if mapdata:
+                return mapdata
+        return None
+
     def lookup(self, default=""):
         """Crea un callback que solo ejecuta la primera funcion MapFieldFunc que contenga datos."""
+        mapdata = self.first()
+        return mapdata(default=default) if mapdata is not None else None
 
-        if self.eq:
-            callback = self.eq(default=default)
-        elif self.di:
-            callback = self.di(default=default)
-        elif self.co:
-            callback = self.co(default=default)
-        elif self.nc:
-            callback = self.nc(default=default)
-        elif self.pf:
-            callback = self.pf(default=default)
-        elif self.sf:
-            callback = self.sf(default=default)
-        elif self.re:
-            callback = self.re(default=default)
-        else:
-            callback = None
-
-        return callback
+    def compile(self, default="") -> Callable[[Series], Series] | None:
+        """Como `MapFieldData.lookup`, pero homologa una Serie completa a la vez."""
+        mapdata = self.first()
+        return mapdata.compile(default=default) if mapdata is not None else None
@@ -1,8 +1,55 @@
 """Modulo para asignar una funcion que homologue los campos."""
 
-from typing import Callable
+from typing import Callable, Iterator
 from enum import StrEnum
-from re import compile as re_compile
+from re import compile as re_compile, error as RegexError
+from numpy import where
+from pandas import Series
+from data.uniques import transform_uniques
+
+def _lookup(mapping: dict[str, str], default: str) -> Callable[[Series], Series]:
+    """Homologa con una tabla de valores, los que no estan toman el valor por defecto."""
+    def func(uniques: Series) -> Series:
+        result = uniques.map(mapping)
+        return result.where(result.notna(), default)
+    return lambda values: transform_uniques(values, func)
+
+def _memoize(callback: Callable[[str], str]) -> Callable[[Series], Series]:
+    """Ejecuta el callback una sola vez por cada valor unico."""
+    def func(uniques: Series) -> Series:
+        return Series([callback(value) for value in uniques], dtype=object)
+    return lambda values: transform_uniques(values, func)
+
+def _prefixes(key: str) -> Iterator[str]:
+    return (key[:idx] for idx in range(len(key) + 1))
+
+def _suffixes(key: str) -> Iterator[str]:
+    return (key[idx:] for idx in range(len(key) + 1))
+
+def _regex(data: dict[str, str], default: str) -> Callable[[Series], Series] | None:
+    """
+    Une los patrones en una sola expresion, cada alternativa busca su patron en todo el valor y
+    se elige la primera que coincide, igual que probar los patrones en orden. Si algun patron
+    tiene grupos o banderas propias no se pueden unir y devuelve None.
+    """
+    if not data:
+        return None
+
+    try:
+        if any(re_compile(patter).groups for patter in data):
+            return None
+        alternatives = [f"(?=[\\s\\S]*?(?:{patter}))()" for patter in data]
+        patter = re_compile(r"\A(?:" + "|".join(alternatives) + ")")
+    except RegexError:
+        return None
+
+    values = Series(list(data.values()), dtype=object).to_numpy()
+
+    def func(uniques: Series) -> Series:
+        matched = uniques.str.extract(patter, expand=True).notna().to_numpy()
+        result = where(matched.any(axis=1), values[matched.argmax(axis=1)], default)
+        return Series(result, dtype=object)
+    return lambda values: transform_uniques(values, func)
 
 class MapFieldFunc(StrEnum):
     """Nombre clave de las funciones basicas como criterios de homologacion de datos."""
@@ -52,9 +99,9 @@ class MapFieldFunc(StrEnum):
                         return v
                 return default
         elif self == MapFieldFunc.RE:
+            patters = [(re_compile(k), v) for k, v in data.items()]
             def callback(value: str):
-                for k, v in data.items():
-                    patter = re_compile(k)
+                for patter, v in patters:
                     if patter.search(value):
                         return v
                 return default
@@ -63,3 +110,36 @@ class MapFieldFunc(StrEnum):
                 return default
 
         return callback
+
+    def compile(self, data: dict[str, str], default="") -> Callable[[Series], Series]:
+        """
+        Devuelve una funcion que homologa una Serie completa, con el mismo resultado que aplicar
+        `MapFieldFunc.cb` en cada fila. Los prefijos y sufijos se resuelven con una tabla de todos
+        los prefijos o sufijos de las llaves, la primera llave tiene prioridad.
+        """
+        data = dict(data)
+
+        if self == MapFieldFunc.EQ:
+            return _lookup(data, default)
+
+        if self == MapFieldFunc.DI:
+            keys = Series(list(data), dtype=object)
+            first = next(iter(data.values()), default)
+            def func(uniques: Series) -> Series:
+                return Series(where(uniques.isin(keys), default, first), dtype=object)
+            return lambda values: transform_uniques(values, func)
+
+        if self in (MapFieldFunc.PF, MapFieldFunc.SF):
+            affixes = _prefixes if self == MapFieldFunc.PF else _suffixes
+            mapping: dict[str, str] = {}
+            for k, v in data.items():
+                for affix in affixes(k):
+                    mapping.setdefault(affix, v)
+            return _lookup(mapping, default)
+
+        if self == MapFieldFunc.RE:
+            mapper = _regex(data, default)
+            if mapper is not None:
+                return mapper
+
+        return _memoize(self.cb(data, default))
@@ -1,12 +1,12 @@
 """Modulo para la definicion de los campos de la funcionalidad de precios."""
 
 from typing import TypedDict, TypeGuard
-from enum import StrEnum
+from data.fields import DataField
 
-class PriceField(StrEnum):
+class PriceField(DataField):
     """Nombre de las columnas de los precios de la api Dynamics 365."""
     ID_INTEGRACION = "id"
-    MONEDA = "moneda"
+    MONEDA = "moneda", True
     CODIGO = "codigo"
     EAN = "ean"
     PRECIO = "copRP"
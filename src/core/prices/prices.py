@@ -3,6 +3,9 @@
 from datetime import datetime
 from pandas import Series, Index, MultiIndex, to_datetime
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import fill_frame, update_frame
+from data.dates import FORMAT_ISO, format_dates, valid_dates
+from data.uniques import apply_uniques
 from utils.constants import TZ_LOCAL
 from .fields import PriceField
 from .exceptions import (
@@ -14,6 +17,7 @@ from .exceptions import (
 
 class Prices(BaseDataIO):
     """Clase para la gestion de datos de los precios."""
+    field_type = PriceField
 
     def __init__(self,
                  *,
@@ -30,7 +34,7 @@ class Prices(BaseDataIO):
             kwargs["names"] = list(PriceField)
 
         self.load(dtype=str, **kwargs)
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -51,7 +55,7 @@ class Prices(BaseDataIO):
 
     def fix(self, data: dict[PriceField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def normalize(self):
         """
@@ -65,23 +69,15 @@ class Prices(BaseDataIO):
         id_integracion = id_integracion.str.replace(r"(\s|I|R)$", "", regex=True) + " "
         self.data[PriceField.ID_INTEGRACION] = id_integracion
 
-        def format_date(value: str):
-            try:
-                date = datetime.strptime(value, "%m/%d/%Y %I:%M:%S %p")
-            except ValueError:
-                try:
-                    date = datetime.fromisoformat(value)
-                except ValueError:
-                    return value
-            return date.astimezone(TZ_LOCAL).isoformat()
-
         fecha_modificacion = self.data[PriceField.FECHA_MODIFICACION]
-        fecha_modificacion = fecha_modificacion.apply(format_date)
+        fecha_modificacion, _ = format_dates(
+            fecha_modificacion, ["%m/%d/%Y %I:%M:%S %p", FORMAT_ISO], FORMAT_ISO, TZ_LOCAL
+        )
         self.data[PriceField.FECHA_MODIFICACION] = fecha_modificacion
 
         precio = self.data[PriceField.PRECIO]
         precio = precio.str.replace(",", "", regex=False)
-        precio = precio.astype(float).apply(lambda num: f"{num:.2f}").astype(str)
+        precio = apply_uniques(precio, lambda num: f"{float(num):.2f}").astype(str)
         self.data[PriceField.PRECIO] = precio
 
         self.data = self.data.sort_values(by=PriceField.FECHA_MODIFICACION)
@@ -104,16 +100,9 @@ class Prices(BaseDataIO):
         precio = self.data[PriceField.PRECIO]
         precio = precio[precio.isin(["", "0", "0.", "0.0", "0.00"])]
 
-        def is_date(value: str):
-            try:
-                datetime.fromisoformat(value)
-                return True
-            except ValueError:
-                return False
-
         if PriceField.FECHA_MODIFICACION in self.data:
             fecha_modificacion = self.data[PriceField.FECHA_MODIFICACION]
-            fecha_modificacion = fecha_modificacion[~fecha_modificacion.apply(is_date)]
+            fecha_modificacion = fecha_modificacion[~valid_dates(fecha_modificacion, [FORMAT_ISO])]
             fecha_modificacion_index = fecha_modificacion.index
         else:
             fecha_modificacion_index = []
@@ -1,8 +1,9 @@
 """Modulo para la lectura, analisis y correccion de los productos."""
 
-from datetime import datetime
 from pandas import Series, Index, MultiIndex
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import fill_frame, update_frame
+from data.dates import FORMAT_ISO, format_dates, valid_dates
 from core.providers import PROVIDERS, ProviderField
 from .fields import ProductField
 from .exceptions import (
@@ -30,7 +31,7 @@ class Products(BaseDataIO):
             kwargs["names"] = list(ProductField)
 
         self.load(dtype=str, **kwargs)
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -51,7 +52,7 @@ class Products(BaseDataIO):
 
     def fix(self, data: dict[ProductField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def normalize(self):
         """
@@ -69,22 +70,16 @@ class Products(BaseDataIO):
         ean = ean.str.replace(r"^0", "", regex=True)
         self.data[ProductField.EAN] = ean
 
-        def format_date(value: str):
-            try:
-                date = datetime.strptime(value, "%m/%d/%Y")
-            except ValueError:
-                try:
-                    date = datetime.fromisoformat(value)
-                except ValueError:
-                    return value
-            return date.strftime("%Y-%m-%d")
+        def format_date(values: Series):
+            dates, _ = format_dates(values, ["%m/%d/%Y", FORMAT_ISO], "%Y-%m-%d")
+            return dates
 
         fecha_creacion_producto = self.data[ProductField.FECHA_CREACION_PRODUCTO]
-        fecha_creacion_producto = fecha_creacion_producto.apply(format_date)
+        fecha_creacion_producto = format_date(fecha_creacion_producto)
         self.data[ProductField.FECHA_CREACION_PRODUCTO] = fecha_creacion_producto
 
         fecha_creacion = self.data[ProductField.FECHA_CREACION]
-        fecha_creacion = fecha_creacion.apply(format_date)
+        fecha_creacion = format_date(fecha_creacion)
         self.data[ProductField.FECHA_CREACION] = fecha_creacion
 
         self.data = self.data.sort_values(by=ProductField.SKU)
@@ -106,18 +101,14 @@ class Products(BaseDataIO):
 
         proveedor = self.data[ProductField.PROVEEDOR]
         proveedor = proveedor[~proveedor.isin(PROVIDERS.data[ProviderField.CODIGO])]
-        def is_date(value: str):
-            try:
-                datetime.strptime(value, "%Y-%m-%d")
-                return True
-            except ValueError:
-                return False
+        def is_date(values: Series):
+            return valid_dates(values, ["%Y-%m-%d"])
 
         fecha_creacion_producto = self.data[ProductField.FECHA_CREACION_PRODUCTO]
-        fecha_creacion_producto = fecha_creacion_producto[~fecha_creacion_producto.apply(is_date)]
+        fecha_creacion_producto = fecha_creacion_producto[~is_date(fecha_creacion_producto)]
 
         fecha_creacion = self.data[ProductField.FECHA_CREACION]
-        fecha_creacion = fecha_creacion[~fecha_creacion.apply(is_date)]
+        fecha_creacion = fecha_creacion[~is_date(fecha_creacion)]
 
         return {
             ProductField.ID_INTEGRACION: id_integracion.index,
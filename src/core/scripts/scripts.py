@@ -2,6 +2,8 @@
 
 from pandas import Series, Index, MultiIndex
 from data.io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from data.snapshot import fill_frame, update_frame
+from data.uniques import apply_uniques
 from utils.schedule import schedulejob_status, is_schedulejob_params
 from scripts import SERVICES_GROUPS
 from .fields import ScriptField
@@ -30,7 +32,7 @@ class Scripts(BaseDataIO):
             kwargs["names"] = list(ScriptField)
 
         self.load(**kwargs)
-        self.data.fillna("", inplace=True)
+        fill_frame(self.data, "")
 
     def no_match_fields(self):
         """Comprueba los campos que NO existen en el DataFrame."""
@@ -51,7 +53,7 @@ class Scripts(BaseDataIO):
 
     def fix(self, data: dict[ScriptField, Series]):
         """Actualiza los datos segun los campos."""
-        self.data.update(data)
+        update_frame(self.data, data)
 
     def analyze(self):
         """Analiza los datos y devuelve los erroes encontrados."""
@@ -73,7 +75,7 @@ class Scripts(BaseDataIO):
             return not service_obj is None
 
         script = self.data[ScriptField.SCRIPT].str.split(".")
-        script = script[~script.apply(is_service)]
+        script = script[~apply_uniques(script, is_service)]
 
         def is_parameters(value):
             return isinstance(value, (list, tuple))
@@ -85,16 +87,16 @@ class Scripts(BaseDataIO):
             return is_schedulejob_params(value)
 
         parameters = self.data[ScriptField.PARAMETERS]
-        parameters = parameters[~parameters.apply(is_parameters)]
+        parameters = parameters[~apply_uniques(parameters, is_parameters)]
 
         parameterskv = self.data[ScriptField.PARAMETERSKV]
-        parameterskv = parameterskv[~parameterskv.apply(is_dict)]
+        parameterskv = parameterskv[~apply_uniques(parameterskv, is_dict)]
 
         context = self.data[ScriptField.CONTEXT]
-        context = context[~context.apply(is_dict)]
+        context = context[~apply_uniques(context, is_dict)]
 
         schedule = self.data[ScriptField.SCHEDULE]
-        schedule = schedule[~schedule.apply(is_schedule)]
+        schedule = schedule[~apply_uniques(schedule, is_schedule)]
 
         schedule_status = self.data[ScriptField.SCHEDULE_STATUS].astype(str)
         schedule_status = schedule_status[~schedule_status.isin(schedulejob_status)]
@@ -2,6 +2,9 @@
 
 __version__ = "1.0.0"
 
-__all__ = ["io", "store"]
+__all__ = [
+    "dates", "fields", "io", "keys", "reference", "rules",
+    "snapshot", "spill", "store", "sync", "uniques"
+]
 
-from . import io, store
+from . import dates, fields, io, keys, reference, rules, snapshot, spill, store, sync, uniques
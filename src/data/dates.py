@@ -0,0 +1,168 @@
+"""
+Modulo para validar y dar formato a las fechas de texto de una Serie completa a la vez.
+
+Cada formato se lee con `pandas.to_datetime(format=..., errors="coerce")` en orden de prioridad
+sobre los valores unicos de la Serie. Los valores que ningun formato vectorizado reconoce se
+validan con `datetime.strptime`/`datetime.fromisoformat`, asi el resultado es el mismo que
+validar fila por fila pero sin recorrer en Python los valores que si son validos.
+"""
+
+from typing import Sequence
+from datetime import datetime, tzinfo
+from numpy import ndarray, zeros, full, nan, timedelta64
+from pandas import Series, Index, DataFrame, to_datetime, to_timedelta, factorize
+
+FORMAT_ISO = "isoformat"    # datetime.fromisoformat para leer y datetime.isoformat para escribir.
+
+# Subconjunto estricto del ISO 8601 que acepta datetime.fromisoformat, lo demas se valida en Python.
+REGEX_ISO = (
+    r"^(?P<date>\d{4}-\d{2}-\d{2})"
+    r"(?:[T ](?P<time>(?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d{1,6})?)?)"
+    r"(?P<offset>Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?)?\Z"
+)
+
+def _parse_format(values: Index, date_format: str) -> tuple[ndarray, ndarray]:
+    """Lee los valores con un formato, devuelve las fechas (hora del texto) y el desfase UTC."""
+    offsets = full(len(values), nan)
+
+    if "%z" in date_format or "%Z" in date_format:
+        # Con zona horaria en el formato cada valor puede tener otro desfase, se lee en Python.
+        return full(len(values), "NaT", dtype="datetime64[ns]"), offsets
+
+    if date_format != FORMAT_ISO:
+        dates = to_datetime(values, format=date_format, errors="coerce")
+        return dates.to_numpy(), offsets
+
+    parts: DataFrame = values.str.extract(REGEX_ISO)
+    matched = parts["date"].notna().to_numpy()
+    text = parts["date"].where(parts["time"].isna(), parts["date"] + "T" + parts["time"])
+    dates = to_datetime(text.where(matched), format="ISO8601", errors="coerce")
+
+    offset = parts["offset"].fillna("").to_numpy(dtype=str)
+    with_offset = matched & (offset != "")
+    if with_offset.any():
+        sign = Series(offset[with_offset]).str[0].map({"Z": 0, "+": 1, "-": -1}).to_numpy()
+        hours = Series(offset[with_offset]).str[1:3].replace("", "0").astype(int).to_numpy()
+        minutes = Series(offset[with_offset]).str[4:6].replace("", "0").astype(int).to_numpy()
+        offsets[with_offset] = sign * (hours * 60 + minutes)
+
+    return dates.to_numpy(), offsets
+
+def _parse_python(value: str, formats: Sequence[str]) -> datetime | None:
+    """Lee un valor como lo hace Python, con el primer formato valido."""
+    for date_format in formats:
+        try:
+            if date_format == FORMAT_ISO:
+                return datetime.fromisoformat(value)
+            return datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+    return None
+
+def _format_python(date: datetime, format_out: str, tz: tzinfo | None) -> str:
+    """Da formato a una fecha como lo hace Python."""
+    if tz is not None:
+        date = date.astimezone(tz)
+    if format_out == FORMAT_ISO:
+        return date.isoformat()
+    return date.strftime(format_out)
+
+def _format_vector(dates: Series, offsets: ndarray, format_out: str, tz: tzinfo | None) -> Series:
+    """Da formato a las fechas leidas, con `tz` primero se convierten a esa zona horaria."""
+    if tz is not None:
+        # Sin zona horaria se toma como hora local, con desfase se convierte a la zona `tz`.
+        has_offset = ~Series(offsets).isna().to_numpy()
+        if has_offset.any():
+            local = dates.to_numpy().copy()
+            shift = to_timedelta(offsets[has_offset], unit="m").to_numpy()
+            local[has_offset] += timedelta64(tz.utcoffset(None)) - shift
+            dates = Series(local)
+
+    if format_out != FORMAT_ISO:
+        return dates.dt.strftime(format_out)
+
+    text = dates.dt.strftime("%Y-%m-%dT%H:%M:%S")
+    microsecond = dates.dt.microsecond
+    text = text.where(microsecond == 0, text + "." + microsecond.astype(str).str.zfill(6))
+
+    if tz is not None:
+        text = text + datetime(2000, 1, 1, tzinfo=tz).isoformat()[19:]  # Desfase '+HH:MM'.
+    else:
+        # Se mantiene el desfase del texto original con el formato '+HH:MM'.
+        offsets = Series(offsets, index=text.index)
+        has_offset = offsets.notna()
+        minutes = offsets[has_offset].abs().astype(int)
+        sign = offsets[has_offset].map(lambda offset: "-" if offset < 0 else "+")
+        hours = (minutes // 60).astype(str).str.zfill(2)
+        text[has_offset] += sign + hours + ":" + (minutes % 60).astype(str).str.zfill(2)
+
+    return text
+
+def _factorize(values: Series) -> tuple[ndarray, Index]:
+    """Codigos de cada fila (-1 si es nulo) y los valores unicos como texto."""
+    codes, uniques = factorize(values.astype(object), use_na_sentinel=True)
+    return codes, Index(uniques, dtype=object).astype(str)
+
+def parse_dates(values: Series, formats: Sequence[str]) -> tuple[ndarray, ndarray, Index]:
+    """
+    Lee los valores unicos con los formatos en orden de prioridad.
+    Devuelve los codigos de cada fila, si cada valor unico es valido y los valores unicos.
+    """
+    codes, uniques = _factorize(values)
+    valid = zeros(len(uniques), dtype=bool)
+
+    for date_format in formats:
+        pending = ~valid
+        if not pending.any():
+            break
+        dates, _ = _parse_format(uniques[pending], date_format)
+        valid[pending] = ~Series(dates).isna().to_numpy()
+
+    # Los que no se reconocen se leen en Python, una sola vez por valor unico.
+    for idx in (~valid).nonzero()[0]:
+        if _parse_python(uniques[idx], formats) is not None:
+            valid[idx] = True
+
+    return codes, valid, uniques
+
+def valid_dates(values: Series, formats: Sequence[str]) -> Series:
+    """Mascara de las fechas validas segun alguno de los formatos, igual a un `is_date` por fila."""
+    codes, valid, _ = parse_dates(values, formats)
+    return Series(valid[codes] & (codes >= 0), index=values.index)
+
+def format_dates(values: Series,
+                 formats: Sequence[str],
+                 format_out: str,
+                 tz: tzinfo = None) -> tuple[Series, Series]:
+    """
+    Da formato a las fechas segun el primer formato valido, los valores invalidos no cambian.
+    Devuelve las fechas con el nuevo formato y la mascara de las fechas invalidas.
+    Con `tz` las fechas se convierten a esa zona horaria, sin zona se toman como hora local.
+    """
+    codes, uniques = _factorize(values)
+    formatted = Series(uniques, dtype=object)
+    valid = zeros(len(uniques), dtype=bool)
+
+    for date_format in formats:
+        pending = ~valid
+        if not pending.any():
+            break
+        dates, offsets = _parse_format(uniques[pending], date_format)
+        parsed = ~Series(dates).isna().to_numpy()
+        if parsed.any():
+            text = _format_vector(Series(dates[parsed]), offsets[parsed], format_out, tz)
+            index_pending = pending.nonzero()[0]
+            formatted.iloc[index_pending[parsed]] = text.to_numpy()
+            valid[index_pending[parsed]] = True
+
+    # Los que no se reconocen (fuera de rango de pandas, otras variantes ISO) se leen en Python.
+    for idx in (~valid).nonzero()[0]:
+        date = _parse_python(uniques[idx], formats)
+        if date is not None:
+            formatted.iloc[idx] = _format_python(date, format_out, tz)
+            valid[idx] = True
+
+    result = Series(formatted.to_numpy()[codes], index=values.index, dtype=object)
+    result = result.where(codes >= 0, values.astype(object))
+    invalid = Series(~(valid[codes] & (codes >= 0)), index=values.index)
+    return result, invalid
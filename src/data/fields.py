@@ -0,0 +1,21 @@
+"""Modulo para definir los campos de los datos con su metadata por campo."""
+
+from enum import StrEnum
+
+class DataField(StrEnum):
+    """
+    Campo de los datos, el valor es el nombre de la columna. Los campos de pocos valores distintos
+    se declaran como `CAMPO = "nombre", True` y se guardan como categoricos en el modo compacto.
+    """
+    category: bool
+
+    def __new__(cls, value: str, category: bool = False):
+        member = str.__new__(cls, value)
+        member._value_ = value
+        member.category = category
+        return member
+
+    @classmethod
+    def categories(cls) -> list["DataField"]:
+        """Campos categoricos en el modo compacto, ver `data.io.compact_dataio`."""
+        return [field for field in cls if field.category]
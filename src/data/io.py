@@ -6,9 +6,12 @@ Modulo para manejar los datos IO de forma general para toda la aplicacion.
 """
 
 from pathlib import Path
-from typing import Literal, TypeGuard
-from os import PathLike
+from typing import Literal, TypeGuard, ClassVar, Iterable
+from os import PathLike, fspath
 from io import IOBase, BytesIO
+from hashlib import blake2b
+from uuid import UUID
+from datetime import timedelta
 from quart.datastructures import FileStorage
 from pandas import (
     DataFrame,
@@ -18,7 +21,11 @@ from pandas import (
     read_json,
     read_clipboard
 )
+from pandas.api.types import infer_dtype
 from pandas.io.clipboard import clipboard_get, clipboard_set
+from .fields import DataField
+from .snapshot import snapshot
+from .store import DataStore
 
 DataIO = str | bytes | PathLike | IOBase | ExcelFile | FileStorage
 SupportDataIO = Literal["object", "csv", "excel", "json", "clipboard"]
@@ -29,6 +36,23 @@ ModeDataIO = Literal["object", "raw", "path", "ftp", "buffer", "request"]
 ListModeDataIO: list[ModeDataIO] = ["object", "raw", "path", "ftp", "buffer", "request"]
 REPR_MODE_DATAIO = "'" + "'|'".join(ListModeDataIO) + "'"
 
+ListCacheSupportDataIO: list[SupportDataIO] = ["csv", "excel", "json"]
+DTYPE_STRING_DATAIO = "string[pyarrow]"   # Texto en memoria contigua de Arrow.
+CHUNK_SIZE_HASH_DATAIO = 1 << 20    # 1 Megabyte por lectura.
+
+DS_DATAIO: DataStore[DataFrame] = DataStore(
+    max_length=16,                        # 16 sitios para los DataFrames leidos.
+    max_size=35 * 1e6,                    # 35 Megabytes.
+    max_duration=timedelta(minutes=70),   # 70 minutos cada item
+    name="data.io"
+)
+
+def ds_dataio_calc_size(data: DataFrame):
+    """Callback para calcular el tamaño de los DataFrames leidos."""
+    return int(data.memory_usage(deep=True).sum())
+
+DS_DATAIO.calc_size = ds_dataio_calc_size
+
 def is_dataio(dataio) -> TypeGuard[DataIO]:
     """Comprobar de que el valor sea uno soportado para ser gestionado por la clase BaseDataIO."""
     dataio_types = (str, bytes, PathLike, IOBase, ExcelFile, FileStorage, DataFrame)
@@ -62,8 +86,63 @@ def transform_dataio(dataio: DataIO | None,
 
     return dataio
 
+def hash_dataio(dataio: DataIO, support: SupportDataIO, **kwargs: ...) -> UUID | None:
+    """
+    Calcula el hash del contenido del DataIO junto al soporte y los parametros de lectura,
+    devuelve None si el contenido no se puede leer sin consumirlo.
+    """
+    hasher = blake2b(digest_size=16)
+    hasher.update(support.encode())
+    hasher.update(repr(sorted(kwargs.items(), key=lambda item: item[0])).encode())
+
+    if isinstance(dataio, FileStorage):
+        dataio = dataio.stream
+
+    if isinstance(dataio, bytes):
+        hasher.update(dataio)
+    elif isinstance(dataio, (str, PathLike)):
+        path = Path(fspath(dataio))
+        if not path.is_file():
+            return None
+        with open(path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE_HASH_DATAIO):
+                hasher.update(chunk)
+    elif isinstance(dataio, IOBase) and dataio.seekable():
+        position = dataio.tell()
+        while chunk := dataio.read(CHUNK_SIZE_HASH_DATAIO):
+            hasher.update(chunk.encode() if isinstance(chunk, str) else chunk)
+        dataio.seek(position)
+    else:
+        return None
+
+    return UUID(bytes=hasher.digest())
+
+def compact_dataio(data: DataFrame, fields_category: Iterable[str] = None) -> DataFrame:
+    """
+    Convierte las columnas de texto a tipos compactos, categoricos para los campos de pocos
+    valores y texto con Arrow para los demas. Los categoricos siempre admiten "" para `fillna`.
+    """
+    fields_category = set(fields_category or [])
+    data = data.copy(deep=False)
+
+    for idx, (field, column) in enumerate(data.items()):
+        if column.dtype != object or infer_dtype(column, skipna=True) not in ("string", "empty"):
+            continue
+
+        if field in fields_category:
+            column = column.astype("category")
+            if "" not in column.cat.categories:
+                column = column.cat.add_categories("")
+        else:
+            column = column.astype(DTYPE_STRING_DATAIO)
+
+        data.isetitem(idx, column)
+
+    return data
+
 class BaseDataIO:
     """Clase para la gestion de datos con soporte a diferentes fuentes de entradas."""
+    field_type: ClassVar[type[DataField] | None] = None   # Campos y su metadata por campo.
     __source: DataIO | None
     __destination: DataIO | None
     __support: SupportDataIO
@@ -141,7 +220,11 @@ class BaseDataIO:
         self.__data = value
 
     def load(self, **kwargs: ...):
-        """Carga el set de datos extrayendo la informacion del origen."""
+        """
+        Carga el set de datos extrayendo la informacion del origen.
+        Con `compact=True` el texto se guarda con tipos compactos, ver `compact_dataio`.
+        """
+        compact = bool(kwargs.pop("compact", False))
 
         default_kwargs = {
             "index_col": False     # Por lo general ningun archivo de datos contiene indices 🤷
@@ -155,6 +238,16 @@ class BaseDataIO:
         if not is_dataio(source):
             raise TypeError("el valor de 'source' debe ser de tipo DataIO.")
 
+        # Los mismos datos con los mismos parametros ya leidos no se vuelven a procesar. El
+        # DataFrame en cache se comparte por columnas (instantanea), nunca se escribe sobre el.
+        key_dataio = None
+        if self.support in ListCacheSupportDataIO:
+            key_dataio = hash_dataio(source, self.support, compact=compact, **kwargs)
+
+        if key_dataio is not None and key_dataio in DS_DATAIO:
+            self.__data = snapshot(DS_DATAIO[key_dataio])
+            return
+
         if self.support == "csv":
             self.__data = read_csv(source, **kwargs)
         elif self.support == "excel":
@@ -175,6 +268,17 @@ class BaseDataIO:
         else:
             self.__data = DataFrame(source, **kwargs)
 
+        if compact and isinstance(self.__data, DataFrame):
+            fields_category = self.field_type.categories() if self.field_type else None
+            self.__data = compact_dataio(self.__data, fields_category)
+
+        if key_dataio is not None and isinstance(self.__data, DataFrame):
+            try:
+                DS_DATAIO.set(key_dataio, self.__data, force=True)
+                self.__data = snapshot(self.__data)
+            except MemoryError:
+                pass
+
     def save(self,
              support: SupportDataIO = None,
              mode: ModeDataIO = None,
@@ -0,0 +1,233 @@
+"""
+Modulo para identificar filas por una clave hash de 64 bits y buscarlas de forma vectorizada.
+
+La clave de cada fila se calcula con `pandas.util.hash_pandas_object` sobre los valores de los
+campos, es estable entre ejecuciones y no depende del tipo compacto de las columnas. Un KeyIndex
+guarda las claves unicas y resuelve las busquedas (semi y anti join) con la tabla hash de pandas.
+Una KeyTable indexa una tabla de referencia por la clave de unos campos para unir y validar datos.
+Un KeyIndexStore guarda en disco las claves de cada archivo de origen ya procesado.
+"""
+
+from __future__ import annotations
+from typing import Hashable, Iterable, NamedTuple
+from os import PathLike, replace as os_replace
+from pathlib import Path
+from hashlib import sha1
+import json
+from numpy import (
+    ndarray,
+    arange,
+    argsort,
+    asarray,
+    bincount,
+    concatenate,
+    cumsum,
+    ones,
+    repeat,
+    where,
+    zeros,
+    intp,
+    uint64,
+    load as numpy_load,
+    save as numpy_save
+)
+from pandas import DataFrame, Index, factorize
+from pandas.util import hash_pandas_object
+from .snapshot import concat_fields
+
+def hash_keys(data: DataFrame, fields: Iterable[Hashable]) -> ndarray:
+    """Clave hash de 64 bits de cada fila segun los campos."""
+    fields = list(fields)
+    if data.empty:
+        return asarray([], dtype=uint64)
+
+    values = DataFrame(
+        {idx: data[field].astype(object) for idx, field in enumerate(fields)},
+        index=data.index
+    )
+    return hash_pandas_object(values, index=False).to_numpy(dtype=uint64)
+
+class KeyIndex:
+    """Conjunto de claves hash, se puede reutilizar y guardar en disco entre ejecuciones."""
+    __keys: Index
+
+    def __init__(self, keys: Iterable[int] = None):
+        self.__keys = Index(asarray([] if keys is None else keys, dtype=uint64)).unique()
+
+    def __len__(self):
+        return len(self.__keys)
+
+    @property
+    def keys(self) -> ndarray:
+        """Claves unicas del indice."""
+        return self.__keys.to_numpy()
+
+    def add(self, keys: Iterable[int]):
+        """Agrega las claves al indice."""
+        keys = Index(asarray(keys, dtype=uint64))
+        self.__keys = self.__keys.append(keys).unique()
+
+    def positions(self, keys: Iterable[int]) -> ndarray:
+        """Posicion de cada clave en `KeyIndex.keys`, -1 si no existe."""
+        keys = asarray(keys, dtype=uint64)
+        if len(self.__keys) == 0:
+            return -ones(len(keys), dtype=intp)
+        return self.__keys.get_indexer(keys)
+
+    def contains(self, keys: Iterable[int]) -> ndarray:
+        """Mascara de las claves que existen en el indice (semi join), negada es el anti join."""
+        keys = asarray(keys, dtype=uint64)
+        if len(self.__keys) == 0:
+            return zeros(len(keys), dtype=bool)
+        return self.__keys.get_indexer(keys) >= 0
+
+    def save(self, filepath: PathLike):
+        """Guarda las claves en disco en formato numpy."""
+        with open(filepath, "wb") as file:
+            numpy_save(file, self.keys, allow_pickle=False)
+
+    @classmethod
+    def load(cls, filepath: PathLike) -> KeyIndex:
+        """Lee las claves guardadas con `KeyIndex.save`."""
+        with open(filepath, "rb") as file:
+            return cls(numpy_load(file, allow_pickle=False))
+
+class KeyTable:
+    """
+    Tabla de referencia indexada por la clave hash de sus campos `fields`, se construye una vez y
+    se reutiliza para unir (left join) y validar las claves de otros datos sin volver a calcularlas.
+    """
+    data: DataFrame
+    fields: list[Hashable]
+    keys: ndarray
+    __index: KeyIndex
+    __rows: ndarray
+    __offsets: ndarray
+    __counts: ndarray
+
+    def __init__(self, data: DataFrame, fields: Iterable[Hashable]):
+        self.fields = list(fields)
+        self.build(data)
+
+    def build(self, data: DataFrame):
+        """Construye el indice de la tabla, se debe llamar cada vez que cambian los datos."""
+        self.data = data.reset_index(drop=True)
+        self.keys = hash_keys(self.data, self.fields)
+
+        # Filas de la tabla agrupadas por clave unica en el orden original (CSR).
+        codes, uniques = factorize(self.keys)
+        self.__index = KeyIndex(uniques)
+        self.__counts = bincount(codes, minlength=len(uniques)).astype(intp)
+        self.__rows = argsort(codes, kind="stable").astype(intp)
+        self.__offsets = cumsum(self.__counts) - self.__counts
+
+    def contains(self, data: DataFrame, fields: Iterable[Hashable]) -> ndarray:
+        """Mascara de las filas de `data` cuya clave en `fields` existe en la tabla."""
+        return self.__index.contains(hash_keys(data, fields))
+
+    def join(self, data: DataFrame, fields: Iterable[Hashable]) -> DataFrame:
+        """
+        Agrega las columnas de la tabla a `data` segun la clave de `fields`, igual que un merge
+        left: conserva el orden de `data`, repite las filas con varias coincidencias y deja nulos
+        las que no tienen. El resultado tiene un nuevo indice desde cero.
+        """
+        keys = hash_keys(data, fields)
+        position = self.__index.positions(keys)
+        found = position >= 0
+
+        counts = where(found, self.__counts[position], 1)
+        rows_left = repeat(arange(len(data), dtype=intp), counts)
+
+        # Posicion de cada coincidencia dentro del grupo de la clave en la tabla.
+        starts = repeat(where(found, self.__offsets[position], 0), counts)
+        shift = arange(len(rows_left), dtype=intp) - repeat(cumsum(counts) - counts, counts)
+        rows_right = where(repeat(found, counts), self.__rows[starts + shift], -1)
+
+        left = data.iloc[rows_left].reset_index(drop=True)
+        right = self.data.reindex(rows_right)    # La fila -1 no existe, queda con nulos.
+        right.index = left.index
+        return concat_fields(left, {field: right[field] for field in right})
+
+class SourceFile(NamedTuple):
+    """Version de un archivo de origen, cambia si se modifica el archivo."""
+    mtime: float
+    size: int
+
+class KeyIndexStore:
+    """
+    Claves de cada archivo de origen guardadas en disco, identificadas por el nombre del archivo,
+    la fecha de modificacion y el tamaño. Solo los archivos nuevos o modificados se deben procesar.
+    """
+    dirpath: Path
+    __files: dict[str, SourceFile] | None
+    __keys: dict[str, ndarray]
+
+    def __init__(self, dirpath: PathLike):
+        self.dirpath = Path(dirpath)
+        self.__files = None
+        self.__keys = {}
+
+    @property
+    def __manifest(self):
+        return self.dirpath / "index.json"
+
+    @staticmethod
+    def __filename(name: str):
+        return sha1(name.encode("utf-8")).hexdigest() + ".npy"
+
+    @property
+    def files(self) -> dict[str, SourceFile]:
+        """Archivos indexados con su version, se leen de disco la primera vez."""
+        if self.__files is None:
+            try:
+                with open(self.__manifest, "r", encoding="utf-8") as file:
+                    manifest: dict[str, list] = json.load(file)
+                self.__files = {name: SourceFile(*value) for name, value in manifest.items()}
+            except (OSError, ValueError, TypeError):
+                self.__files = {}
+        return self.__files
+
+    def pending(self, files: dict[str, SourceFile]) -> list[str]:
+        """Archivos que no estan indexados o cambiaron desde que se indexaron."""
+        return [name for name, source in files.items() if self.files.get(name) != source]
+
+    def set(self, name: str, source: SourceFile, index: KeyIndex):
+        """Guarda las claves del archivo en disco."""
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        index.save(self.dirpath / self.__filename(name))
+        self.files[name] = SourceFile(*source)
+        self.__keys[name] = index.keys
+
+    def prune(self, expire_before: float):
+        """
+        Elimina los archivos modificados antes de `expire_before` (timestamp), no se usa el listado
+        del origen porque uno vacio o de un periodo menor borraria las claves guardadas.
+        """
+        for name in [n for n, source in self.files.items() if source.mtime < expire_before]:
+            self.files.pop(name)
+            self.__keys.pop(name, None)
+            (self.dirpath / self.__filename(name)).unlink(missing_ok=True)
+
+    def save(self):
+        """Guarda en disco el listado de archivos indexados, reemplazando el anterior a la vez."""
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        manifest_tmp = self.__manifest.with_suffix(".tmp")
+        with open(manifest_tmp, "w", encoding="utf-8") as file:
+            json.dump({name: list(source) for name, source in self.files.items()}, file)
+        os_replace(manifest_tmp, self.__manifest)
+
+    def index(self, names: Iterable[str] = None) -> KeyIndex:
+        """Indice con las claves de los archivos, por defecto de todos los archivos indexados."""
+        names = list(self.files) if names is None else [n for n in names if n in self.files]
+        keys = []
+
+        for name in names:
+            if name not in self.__keys:
+                try:
+                    self.__keys[name] = KeyIndex.load(self.dirpath / self.__filename(name)).keys
+                except (OSError, ValueError):
+                    self.files.pop(name)    # Sin claves en disco, se debe procesar de nuevo.
+                    continue
+            keys.append(self.__keys[name])
+
+        return KeyIndex(concatenate(keys) if keys else None)
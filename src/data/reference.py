@@ -0,0 +1,375 @@
+"""
+Modulo para leer las tablas de referencia de Excel con un cache binario en disco.
+
+Leer un Excel con openpyxl es lo mas lento del inicio de la aplicacion. La tabla leida se guarda
+con pickle junto a la fecha de modificacion, el tamaño y el hash del archivo de origen, mientras
+el archivo no cambie las siguientes lecturas se hacen desde el cache.
+
+Las tablas y sus derivados (filtros, indices) se publican en versiones del registro de referencias.
+Cada tabla se construye la primera vez que se usa en una version y despues no cambia, cuando cambia
+el archivo de una tabla construida se construye otra version en segundo plano y se publica en una
+sola asignacion. Un proceso fija la version con la que empieza con `ReferenceRegistry.pin`.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Generic, Iterable, Iterator, Mapping, NamedTuple, TypeVar
+from types import MappingProxyType
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from asyncio import to_thread
+from os import PathLike, fspath, replace as os_replace
+from pathlib import Path
+from hashlib import blake2b, sha1
+import json
+import pickle
+from pandas import DataFrame, read_excel
+from utils.constants import PATH_DATA
+from .io import BaseDataIO, DataIO, SupportDataIO, ModeDataIO
+from utils.schedule import scheduler_app
+
+T = TypeVar("T")
+
+PATH_CACHE_REFERENCE = PATH_DATA / "cache" / "reference"
+CHUNK_SIZE_HASH_REFERENCE = 1 << 20    # 1 Megabyte por lectura.
+
+class ReferenceSource(NamedTuple):
+    """Version del archivo de origen de la tabla guardada en el cache."""
+    mtime: float
+    size: int
+    digest: str
+
+def hash_file(filepath: Path) -> str:
+    """Hash del contenido del archivo."""
+    hasher = blake2b(digest_size=16)
+    with open(filepath, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE_HASH_REFERENCE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _write_atomic(filepath: Path, content: bytes):
+    """Escribe el archivo completo o no lo escribe, se reemplaza en un solo paso."""
+    filepath_tmp = filepath.with_suffix(filepath.suffix + ".tmp")
+    with open(filepath_tmp, "wb") as file:
+        file.write(content)
+    os_replace(filepath_tmp, filepath)
+
+def read_reference(filepath: PathLike, cache_dir: PathLike = PATH_CACHE_REFERENCE) -> DataFrame:
+    """
+    Lee la tabla de referencia como `read_excel(filepath, dtype=str).fillna("")`.
+    Si la fecha de modificacion y el tamaño no cambian se lee el cache sin abrir el Excel,
+    si cambian pero el contenido es el mismo solo se actualiza la version del cache.
+    """
+    filepath = Path(fspath(filepath)).resolve()
+    cache_dir = Path(cache_dir)
+    name = sha1(str(filepath).encode("utf-8")).hexdigest()
+    filepath_data = cache_dir / (name + ".pkl")
+    filepath_source = cache_dir / (name + ".json")
+
+    stat = filepath.stat()
+    source = None
+
+    try:
+        with open(filepath_source, "r", encoding="utf-8") as file:
+            source = ReferenceSource(*json.load(file))
+    except (OSError, ValueError, TypeError):
+        pass
+
+    digest = None
+    if source is not None and (source.mtime, source.size) != (stat.st_mtime, stat.st_size):
+        digest = hash_file(filepath)
+        if digest != source.digest:
+            source = None
+
+    if source is not None:
+        try:
+            with open(filepath_data, "rb") as file:
+                data: DataFrame = pickle.load(file)
+            if digest is not None:
+                source = ReferenceSource(stat.st_mtime, stat.st_size, digest)
+                _write_atomic(filepath_source, json.dumps(list(source)).encode("utf-8"))
+            return data
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+
+    data = read_excel(filepath, dtype=str).fillna("")
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        source = ReferenceSource(stat.st_mtime, stat.st_size, digest or hash_file(filepath))
+        _write_atomic(filepath_data, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        _write_atomic(filepath_source, json.dumps(list(source)).encode("utf-8"))
+    except OSError:
+        pass    # Sin cache en disco la tabla se vuelve a leer del Excel en el siguiente inicio.
+
+    return data
+
+class ReferenceTable(NamedTuple):
+    """
+    Tabla de referencia registrada, se lee de `filename` en la carpeta del registro o de
+    `filepath_default` si no existe. `derive` construye los elementos que dependen de la tabla.
+    """
+    filename: str
+    filepath_default: Path
+    derive: Callable[[DataFrame], dict[str, Any]] | None
+
+class ReferenceFile(NamedTuple):
+    """Archivo del que se leyo una tabla y su version."""
+    filepath: Path
+    mtime: float
+    size: int
+
+class ReferenceBuilt(NamedTuple):
+    """Tabla construida, sus elementos (la tabla y sus derivados) y el archivo del que se leyo."""
+    items: MappingProxyType[str, Any]
+    file: ReferenceFile | None
+
+class ReferenceVersion:
+    """
+    Version publicada de las tablas de referencia y sus derivados. Cada tabla se construye la
+    primera vez que se pide uno de sus elementos en la version, una vez construida no cambia.
+    """
+    number: int
+    __owners: Mapping[str, str]
+    __build: Callable[[str], ReferenceBuilt]
+    __built: dict[str, ReferenceBuilt]
+    __lock: Lock
+
+    def __init__(self,
+                 number: int,
+                 owners: Mapping[str, str],
+                 build: Callable[[str], ReferenceBuilt],
+                 built: dict[str, ReferenceBuilt]):
+        self.number = number
+        self.__owners = owners
+        self.__build = build
+        self.__built = built
+        self.__lock = Lock()
+
+    @property
+    def built(self) -> MappingProxyType[str, ReferenceBuilt]:
+        """Copia de las tablas construidas hasta el momento en la version."""
+        return MappingProxyType(dict(self.__built))
+
+    def table(self, name: str) -> ReferenceBuilt:
+        """Tabla `name` de la version, se construye la primera vez."""
+        if name not in self.__built:
+            with self.__lock:
+                if name not in self.__built:
+                    self.__built[name] = self.__build(name)
+        return self.__built[name]
+
+    def get(self, name: str) -> Any:
+        """Elemento de la version, construye solo la tabla de la que depende."""
+        return self.table(self.__owners[name]).items[name]
+
+class ReferenceRegistry:
+    """
+    Registro versionado de las tablas de referencia. Cada tabla se lee la primera vez que se usa
+    y la version se reemplaza cuando cambian sus archivos, ver `ReferenceRegistry.reload`.
+    """
+    dirpath: Path
+    __tables: dict[str, ReferenceTable]
+    __owners: dict[str, str]
+    __version: ReferenceVersion | None
+    __lock: Lock
+    __pinned: ContextVar[ReferenceVersion | None]
+
+    def __init__(self, dirpath: PathLike):
+        self.dirpath = Path(dirpath)
+        self.__tables = {}
+        self.__owners = {}
+        self.__version = None
+        self.__lock = Lock()
+        self.__pinned = ContextVar(f"reference_pinned_{id(self)}", default=None)
+
+    def register(self,
+                 name: str,
+                 filename: str,
+                 filepath_default: PathLike,
+                 derive: Callable[[DataFrame], dict[str, Any]] = None,
+                 derived: Iterable[str] = ()):
+        """
+        Registra una tabla, `derive` devuelve los elementos derivados con los nombres `derived`.
+        Los nombres se declaran para construir solo la tabla de la que depende cada elemento.
+        """
+        if self.__version is not None:
+            raise RuntimeError("no se pueden registrar tablas despues de publicar una version.")
+        self.__tables[name] = ReferenceTable(filename, Path(filepath_default), derive)
+        self.__owners[name] = name
+        for derived_name in derived:
+            self.__owners[derived_name] = name
+
+    def __filepath(self, table: ReferenceTable) -> Path:
+        filepath = self.dirpath / table.filename
+        return filepath if filepath.is_file() else table.filepath_default
+
+    def __file(self, table: ReferenceTable) -> ReferenceFile | None:
+        filepath = self.__filepath(table)
+        try:
+            stat = filepath.stat()
+        except OSError:
+            return None
+        return ReferenceFile(filepath, stat.st_mtime, stat.st_size)
+
+    def __build(self, name: str, data: DataFrame = None) -> ReferenceBuilt:
+        """Lee la tabla (si no se da) y construye sus derivados."""
+        table = self.__tables[name]
+        file = self.__file(table)
+
+        if data is None:
+            try:
+                data = read_reference(file.filepath)
+            except Exception:
+                # Se mantiene la version del archivo con error, no se lee de nuevo hasta que cambie.
+                data = read_reference(table.filepath_default)
+
+        items = {name: data}
+        if table.derive is not None:
+            derived = table.derive(data)
+            undeclared = [n for n in derived if self.__owners.get(n) != name]
+            if undeclared:
+                raise KeyError(f"los elementos {undeclared} de '{name}' no estan registrados.")
+            items.update(derived)
+
+        return ReferenceBuilt(MappingProxyType(items), file)
+
+    def __publish(self, built: dict[str, ReferenceBuilt]):
+        """
+        Publica una nueva version con las tablas construidas y las ya construidas en la version
+        actual, las demas se construyen cuando se usen.
+        """
+        version = self.__version
+        tables = dict(version.built) if version else {}
+        tables.update(built)
+        number = version.number + 1 if version else 1
+        self.__version = ReferenceVersion(number, self.__owners, self.__build, tables)
+
+    def __publish_initial(self):
+        if self.__version is None:
+            self.__publish({})
+
+    @property
+    def current(self) -> ReferenceVersion:
+        """Ultima version publicada, la primera no construye ninguna tabla."""
+        if self.__version is None:
+            with self.__lock:
+                self.__publish_initial()
+        return self.__version
+
+    @property
+    def version(self) -> ReferenceVersion:
+        """Version fijada por el proceso en curso o la ultima publicada."""
+        return self.__pinned.get() or self.current
+
+    def get(self, name: str) -> Any:
+        """Elemento de la version en uso, la primera vez construye la tabla de la que depende."""
+        return self.version.get(name)
+
+    @contextmanager
+    def pin(self) -> Iterator[ReferenceVersion]:
+        """Fija la version en uso mientras dura el bloque, dentro de otro bloque se mantiene."""
+        pinned = self.__pinned.get()
+        if pinned is not None:
+            yield pinned
+            return
+
+        token = self.__pinned.set(self.current)
+        try:
+            yield self.__pinned.get()
+        finally:
+            self.__pinned.reset(token)
+
+    def changed(self) -> list[str]:
+        """Tablas construidas cuyo archivo cambio desde la version publicada."""
+        if self.__version is None:
+            return []
+        return [
+            name for name, built in self.__version.built.items()
+            if self.__file(self.__tables[name]) != built.file
+        ]
+
+    def reload(self, names: list[str] = None) -> bool:
+        """
+        Construye de nuevo las tablas `names`, por defecto las que cambiaron, y publica la nueva
+        version. Devuelve si se publico una version.
+        """
+        with self.__lock:
+            if self.__version is None:
+                return False
+            names = self.changed() if names is None else names
+            if not names:
+                return False
+            self.__publish({name: self.__build(name) for name in names})
+            return True
+
+    def update(self, name: str, data: DataFrame):
+        """Publica una version con los datos de la tabla `name` y sus derivados."""
+        if self.__owners.get(name) != name:
+            raise KeyError(f"'{name}' no es una tabla de referencia, se deriva de otra tabla.")
+        with self.__lock:
+            self.__publish_initial()
+            self.__publish({name: self.__build(name, data)})
+
+    async def watch(self):
+        """Revisa si cambiaron los archivos y construye la nueva version en segundo plano."""
+        if self.__version is not None and self.changed():
+            await to_thread(self.reload)
+
+class Reference(Generic[T]):
+    """Acceso a un elemento de las referencias, siempre el de la version en uso."""
+
+    def __init__(self, registry: ReferenceRegistry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def get(self) -> T:
+        """Elemento de la version en uso."""
+        return self.registry.get(self.name)
+
+class ReferenceDataIO(BaseDataIO):
+    """BaseDataIO de una tabla de referencia, los datos son los de la version en uso."""
+    __reference: Reference[DataFrame]
+
+    def __init__(self,
+                 reference: Reference[DataFrame],
+                 source: DataIO = None,
+                 destination: DataIO = None,
+                 support: SupportDataIO = "object",
+                 mode: ModeDataIO = "object"):
+        super().__init__(source, destination, support, mode)
+        self.__reference = reference
+
+    @property
+    def reference(self):
+        """Elemento de las referencias con los datos."""
+        return self.__reference
+
+    @property
+    def data(self):
+        """DataFrame de la version de las referencias en uso."""
+        return self.__reference.get()
+
+    @data.setter
+    def data(self, value):
+        if not isinstance(value, DataFrame):
+            raise TypeError("se espera un tipo DataFrame en BaseDataIO")
+        self.__reference.registry.update(self.__reference.name, value)
+
+    def load(self, **kwargs: ...):
+        """Lee los datos del origen y los publica como una nueva version de la tabla."""
+        super().load(**kwargs)
+        self.data = BaseDataIO.data.fget(self)
+
+REFERENCES = ReferenceRegistry(PATH_DATA)
+
+scheduler_app.add_job(
+    REFERENCES.watch,
+    "interval",
+    seconds=15,
+    id="data.reference.watch",
+    name="Recarga de las tablas de referencia modificadas",
+    coalesce=True,
+    max_instances=1,
+    replace_existing=True
+)
@@ -0,0 +1,99 @@
+"""
+Modulo para evaluar reglas de validacion sobre las columnas de un DataFrame.
+
+Un conjunto de reglas (RuleSet) evalua todas las reglas en un solo recorrido, cada columna se lee
+una sola vez y en las columnas categoricas las reglas se evaluan sobre las categorias. El resultado
+de cada regla es una mascara de las filas con error, que se guarda en el estado de la evaluacion
+para que la siguiente evaluacion incremental solo revise las filas de las columnas que cambiaron.
+"""
+
+from typing import Callable, Generic, Hashable, Mapping, NamedTuple, TypeVar
+from numpy import ndarray, nan
+from pandas import DataFrame, Series, Index, CategoricalDtype
+from .snapshot import changed_rows
+
+K = TypeVar("K", bound=Hashable)
+
+class Rule(NamedTuple):
+    """
+    Regla de validacion, `check` recibe las columnas de `fields` y devuelve la mascara de errores.
+    `reference` devuelve los datos externos que usa la regla, si cambian se evalua de nuevo.
+    """
+    fields: tuple[Hashable, ...]
+    check: Callable[..., Series]
+    reference: Callable[[], object] = None
+
+class RuleState(NamedTuple):
+    """Estado de la ultima evaluacion, las columnas evaluadas y la mascara de cada regla."""
+    index: Index
+    columns: dict[Hashable, Series]
+    masks: dict[Hashable, ndarray]
+    references: dict[Hashable, object]
+
+def _errors(mask: Series) -> ndarray:
+    """Mascara de errores como arreglo de numpy, los valores nulos no son errores."""
+    return Series(mask).to_numpy(dtype=bool, na_value=False)
+
+class RuleSet(Generic[K]):
+    """Conjunto de reglas que se evaluan juntas sobre un DataFrame."""
+    rules: dict[K, Rule]
+    fields: list[Hashable]
+
+    def __init__(self, rules: Mapping[K, Rule]):
+        self.rules = dict(rules)
+        self.fields = list(dict.fromkeys(f for rule in self.rules.values() for f in rule.fields))
+
+    @staticmethod
+    def __check(rule: Rule, columns: list[Series]) -> ndarray:
+        """Evalua la regla, en las columnas categoricas sobre las categorias y no cada fila."""
+        if len(columns) == 1 and isinstance(columns[0].dtype, CategoricalDtype):
+            column = columns[0]
+            categories = list(column.cat.categories) + [nan]   # El codigo -1 es el valor nulo.
+            errors = _errors(rule.check(Series(categories, dtype=object)))
+            return errors[column.cat.codes.to_numpy()]
+
+        return _errors(rule.check(*columns))
+
+    def evaluate(self, data: DataFrame, state: RuleState = None) -> tuple[dict[K, Index], RuleState]:
+        """
+        Devuelve los indices de las filas con error de cada regla y el estado de la evaluacion.
+        Con el `state` de una evaluacion anterior solo se revisan las filas que han cambiado,
+        si el indice de los datos es otro se evalua todo de nuevo.
+        """
+        columns = {field: data[field] for field in self.fields}
+
+        if state is not None and not (state.index is data.index or state.index.equals(data.index)):
+            state = None
+
+        changes: dict[Hashable, ndarray] = {}
+        if state is not None:
+            changes = {
+                field: changed_rows(state.columns[field], column)
+                for field, column in columns.items()
+            }
+
+        masks: dict[K, ndarray] = {}
+        references: dict[K, object] = {}
+
+        for key, rule in self.rules.items():
+            references[key] = rule.reference() if rule.reference else None
+            values = [columns[field] for field in rule.fields]
+
+            if state is None or references[key] is not state.references[key]:
+                masks[key] = self.__check(rule, values)
+                continue
+
+            rows = changes[rule.fields[0]]
+            for field in rule.fields[1:]:
+                rows = rows | changes[field]
+            rows = rows.nonzero()[0]
+
+            masks[key] = state.masks[key]
+            if len(rows) > len(data.index) // 2:
+                masks[key] = self.__check(rule, values)     # Cambio casi toda la columna.
+            elif len(rows) > 0:
+                masks[key] = masks[key].copy()
+                masks[key][rows] = self.__check(rule, [value.iloc[rows] for value in values])
+
+        analysis = {key: data.index[mask] for key, mask in masks.items()}
+        return analysis, RuleState(data.index, columns, masks, references)
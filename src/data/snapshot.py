@@ -0,0 +1,109 @@
+"""
+Modulo para manejar instantaneas (snapshots) de DataFrames con columnas compartidas.
+
+Una instantanea es una copia superficial del DataFrame, las columnas no se copian sino que se
+comparten con el original. Para no modificar los datos compartidos, los cambios se aplican
+reemplazando la columna completa (copy-on-write por columna) y nunca escribiendo en el arreglo,
+asi solo se materializan en memoria las columnas que realmente cambian.
+"""
+
+from typing import Hashable, Iterable, Mapping
+from numpy import ndarray, zeros
+from pandas import DataFrame, Series, Index, CategoricalDtype, StringDtype
+from pandas.api.extensions import ExtensionDtype
+
+def snapshot(data: DataFrame) -> DataFrame:
+    """Crea una instantanea del DataFrame que comparte las columnas con el original."""
+    return data.copy(deep=False)
+
+def update_frame(data: DataFrame, updates: Mapping[Hashable, Series]):
+    """
+    Equivalente a DataFrame.update, actualiza con los valores no nulos alineados por el indice,
+    pero reemplaza solo las columnas que cambian en vez de escribir sobre los arreglos que pueden
+    estar compartidos con una instantanea.
+    """
+    for field, values in updates.items():
+        if field not in data:
+            continue
+
+        values = Series(values).reindex(data.index)
+        mask = values.notna()
+
+        if not mask.any():
+            continue
+
+        column = data[field]
+
+        # Los tipos compactos no aceptan cualquier valor, se ajustan antes de actualizar.
+        if isinstance(values.dtype, CategoricalDtype):
+            values = values.astype(object)
+
+        if isinstance(column.dtype, CategoricalDtype):
+            categories = Index(values[mask].unique()).difference(column.cat.categories)
+            if len(categories) > 0:
+                column = column.cat.add_categories(categories)
+        elif isinstance(column.dtype, StringDtype):
+            values = values.astype(column.dtype)
+
+        column_updated = column.mask(mask, values)
+
+        if column_updated.equals(column):
+            continue    # Sin cambios, la columna se sigue compartiendo.
+
+        data[field] = column_updated
+
+def fill_frame(data: DataFrame, value: object):
+    """
+    Equivalente a DataFrame.fillna con inplace=True, pero reemplaza solo las columnas con nulos
+    en vez de escribir sobre los arreglos que pueden estar compartidos con una instantanea.
+    """
+    for field in data.columns[data.isna().any().to_numpy()]:
+        data[field] = data[field].fillna(value)
+
+def select_fields(data: DataFrame, fields: Iterable[Hashable]) -> DataFrame:
+    """Selecciona los campos del DataFrame sin copiar las columnas."""
+    return DataFrame({field: data[field] for field in fields}, index=data.index, copy=False)
+
+def concat_fields(data: DataFrame, other: Mapping[Hashable, Series]) -> DataFrame:
+    """Agrega los campos al final del DataFrame sin copiar las columnas existentes."""
+    fields = {field: data[field] for field in data}
+    fields.update(other)
+    return DataFrame(fields, index=data.index, copy=False)
+
+def column_id(column: Series) -> int:
+    """
+    Identificador de los datos de la columna, es el mismo mientras la columna se comparta.
+    Solo es unico mientras exista una referencia a la columna.
+    """
+    if isinstance(column.dtype, ExtensionDtype):
+        return id(column.array)     # Categoricas y arrow no tienen un arreglo numpy propio.
+    array = column.to_numpy(copy=False)
+    return array.__array_interface__["data"][0] if array.size else id(column)
+
+def changed_rows(column: Series, other: Series) -> ndarray:
+    """Mascara de las filas que cambian entre dos versiones de la columna con el mismo indice."""
+    if column_id(column) == column_id(other):
+        return zeros(len(column), dtype=bool)
+    if isinstance(column.dtype, CategoricalDtype) and isinstance(other.dtype, CategoricalDtype):
+        categories = column.cat.categories
+        if other.cat.categories[:len(categories)].equals(categories):   # Solo nuevas categorias.
+            return column.cat.codes.to_numpy() != other.cat.codes.to_numpy()
+    if column.dtype == other.dtype and isinstance(column.dtype, ExtensionDtype):
+        changes = column.array != other.array   # Sin convertir los tipos compactos a objetos.
+        return Series(changes).to_numpy(dtype=bool, na_value=True)
+    return column.to_numpy(dtype=object) != other.to_numpy(dtype=object)
+
+def memory_usage(*frames: DataFrame) -> int:
+    """Calcula el tamaño en bytes de los DataFrames contando una sola vez las columnas compartidas."""
+    columns: dict[int, int] = {}
+    size = 0
+
+    for df in frames:
+        size += int(df.index.memory_usage(deep=True))
+        for idx in range(df.shape[1]):
+            column = df.iloc[:, idx]
+            pointer = column_id(column)
+            if pointer not in columns:
+                columns[pointer] = int(column.memory_usage(deep=True, index=False))
+
+    return size + sum(columns.values())
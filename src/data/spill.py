@@ -0,0 +1,150 @@
+"""
+Modulo para el almacenamiento en disco de los datos que salen de memoria del DataStore.
+
+Los DataFrames de cada elemento se escriben en archivos columnares Arrow IPC (Feather) sin
+compresion, para luego leerlos con un mapeo de memoria (mmap) y no volver a procesar el origen.
+"""
+
+from __future__ import annotations
+from typing import Hashable, NamedTuple, TypeVar, Generic
+from pathlib import Path
+from tempfile import gettempdir, mkdtemp
+from shutil import rmtree
+from weakref import finalize
+from copy import copy
+from uuid import UUID
+from numpy import dtype
+from pandas import DataFrame, Series
+from pandas.api.extensions import ExtensionDtype
+from pyarrow import Table, ArrowException
+from pyarrow.feather import write_feather, read_table
+from .snapshot import column_id
+
+VT = TypeVar("VT")
+
+PATH_SPILL = Path(gettempdir()) / "maaji-integracion-pos" / "spill"
+
+class SpilledFrame(NamedTuple):
+    """DataFrame guardado en disco, el archivo con su indice y de donde se lee cada columna."""
+    path: Path
+    columns: dict[Hashable, tuple[Path, str, ExtensionDtype | dtype]]
+
+class SpilledItem(NamedTuple, Generic[VT]):
+    """Elemento guardado en disco, el objeto sin DataFrames ni origen y cada DataFrame."""
+    shell: VT
+    frames: dict[str, SpilledFrame]
+    size: int
+
+    @property
+    def paths(self) -> set[Path]:
+        """Archivos en disco del elemento."""
+        return {frame.path for frame in self.frames.values()}
+
+def _column_values(column: Series, column_dtype: ExtensionDtype | dtype):
+    """Arreglo de la columna sin copiar, para armar un DataFrame que la comparta."""
+    if column.dtype != column_dtype:
+        column = column.astype(column_dtype)    # Arrow no conserva el almacenamiento del texto.
+    if isinstance(column.dtype, ExtensionDtype):
+        return column.array
+    return column.to_numpy(copy=False)
+
+class SpillStore:
+    """
+    Segundo nivel del DataStore que guarda los elementos desalojados en disco. Las columnas
+    compartidas entre los DataFrames del elemento (instantaneas) se escriben una sola vez y al
+    leerlas se vuelven a compartir.
+    """
+    max_length: int
+    dirpath: Path
+
+    def __init__(self, max_length = 50, dirpath: Path = None):
+        if max_length <= 0:
+            max_length = 1
+
+        if dirpath is None:
+            PATH_SPILL.mkdir(parents=True, exist_ok=True)
+            dirpath = Path(mkdtemp(dir=PATH_SPILL))
+        else:
+            dirpath.mkdir(parents=True, exist_ok=True)
+
+        self.max_length = max_length
+        self.dirpath = dirpath
+        finalize(self, rmtree, dirpath, True)
+
+    def dump(self, key: UUID, value: VT) -> SpilledItem[VT]:
+        """Escribe los DataFrames del valor en disco, lanza ValueError si no es posible."""
+        frames = {name: df for name, df in vars(value).items() if isinstance(df, DataFrame)}
+
+        if not frames:
+            raise ValueError("el valor no contiene DataFrames para guardar en disco")
+
+        shell = copy(value)
+        if hasattr(shell, "source"):
+            shell.source = None     # El origen (archivo, buffer) no se debe mantener en memoria.
+
+        spilled: dict[str, SpilledFrame] = {}
+        written_frames: dict[int, SpilledFrame] = {}
+        written_columns: dict[int, tuple[Path, str, ExtensionDtype | dtype]] = {}
+        size = 0
+
+        try:
+            for idx, (name, df) in enumerate(frames.items()):
+                vars(shell).pop(name)
+                if id(df) in written_frames:      # Mismo DataFrame en varios atributos
+                    spilled[name] = written_frames[id(df)]
+                    continue
+
+                path = self.dirpath / f"{key}.{idx}.feather"
+                columns: dict[Hashable, tuple[Path, str, ExtensionDtype | dtype]] = {}
+                new_columns: dict[str, Series] = {}
+
+                for field, column in df.items():
+                    cid = column_id(column)
+                    if cid not in written_columns:  # Columna compartida con un DataFrame anterior
+                        name_column = f"c{len(new_columns)}"
+                        new_columns[name_column] = column
+                        written_columns[cid] = (path, name_column, column.dtype)
+                    columns[field] = written_columns[cid]
+
+                table = Table.from_pandas(
+                    DataFrame(new_columns, index=df.index, copy=False),
+                    preserve_index=True
+                )
+                write_feather(table, path, compression="uncompressed")
+                written_frames[id(df)] = spilled[name] = SpilledFrame(path, columns)
+                size += path.stat().st_size
+        except (ArrowException, OSError) as err:
+            self.discard(SpilledItem(shell, spilled, size))
+            raise ValueError("no se ha podido guardar en disco el valor: " + str(err)) from err
+
+        return SpilledItem(shell, spilled, size)
+
+    def load(self, item: SpilledItem[VT]) -> VT:
+        """Lee los DataFrames con mmap y devuelve una copia del valor original."""
+        value = copy(item.shell)
+        read: dict[Path, DataFrame] = {}
+        loaded: dict[int, DataFrame] = {}
+        values: dict[tuple[Path, str], object] = {}
+
+        for path in sorted(item.paths):
+            read[path] = read_table(path, memory_map=True).to_pandas()
+
+        for name, frame in item.frames.items():
+            if id(frame) not in loaded:
+                fields = {}
+                for field, (path, column, column_dtype) in frame.columns.items():
+                    if (path, column) not in values:    # Una sola vez por columna compartida
+                        values[path, column] = _column_values(read[path][column], column_dtype)
+                    fields[field] = values[path, column]
+                loaded[id(frame)] = DataFrame(fields, index=read[frame.path].index, copy=False)
+            vars(value)[name] = loaded[id(frame)]
+
+        return value
+
+    def discard(self, item: SpilledItem[VT]):
+        """Elimina los archivos del elemento guardado en disco."""
+        for path in item.paths:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass    # En Windows un archivo con mmap abierto no se puede eliminar.
@@ -1,30 +1,107 @@
 """Modulo para crear un gestionador de datos, como si fuera un cache."""
 
 from __future__ import annotations
-from typing import TypeVar, Generic, Callable, overload, Literal
-from collections import UserDict
+from typing import TypeVar, Generic, Callable, Iterable, Iterator, SupportsIndex, overload, Literal
+from collections import UserDict, OrderedDict
 from datetime import datetime, timedelta
+from time import monotonic
+from asyncio import sleep as asyncio_sleep
 from uuid import UUID, uuid4
+from utils.schedule import scheduler_app
+from .spill import SpillStore, SpilledItem
 
 VT = TypeVar("VT")
 
+class PersistentKeys(list[UUID]):
+    """
+    Listado de IDs que no se eliminan del DataStore, notifica al DataStore cada cambio
+    para sacar o regresar los IDs del indice de desalojo (LRU).
+    """
+
+    def __init__(self, datastore: DataStore, iterable: Iterable[UUID] = ()):
+        super().__init__()
+        self.__datastore = datastore
+        self.__keys: set[UUID] = set()
+        self.extend(iterable)
+
+    def __contains__(self, key: object):
+        return key in self.__keys
+
+    def append(self, key: UUID):
+        if key not in self:
+            super().append(key)
+            self.__keys.add(key)
+            self.__datastore._pin(key)
+
+    def extend(self, iterable: Iterable[UUID]):
+        for key in iterable:
+            self.append(key)
+
+    def insert(self, index: SupportsIndex, key: UUID):
+        if key not in self:
+            super().insert(index, key)
+            self.__keys.add(key)
+            self.__datastore._pin(key)
+
+    def remove(self, key: UUID):
+        super().remove(key)
+        self.__keys.discard(key)
+        self.__datastore._unpin(key)
+
+    def pop(self, index: SupportsIndex = -1):
+        key = super().pop(index)
+        self.__keys.discard(key)
+        self.__datastore._unpin(key)
+        return key
+
+    def clear(self):
+        keys = list(self)
+        super().clear()
+        self.__keys.clear()
+        for key in keys:
+            self.__datastore._unpin(key)
+
 class DataStore(Generic[VT], UserDict[UUID, VT]):
-    """Gestiona capacidad de espacio de los datos."""
+    """
+    Gestiona capacidad de espacio de los datos.
+
+    Cada elemento guarda su tamaño calculado al insertar o reemplazar, su fecha del ultimo
+    acceso y su tiempo de vida (TTL). Los elementos no persistentes se ordenan en un indice
+    LRU, de esta forma la admision y el desalojo son de costo O(1).
+
+    Con un `spill` asignado, los elementos desalojados se guardan en disco en vez de
+    eliminarse y se vuelven a cargar en memoria al obtenerlos.
+
+    Los elementos expirados se eliminan por `DataStore.sweep`, programado en `scheduler_app`.
+    """
     cache: dict[UUID, DataStore] = {}
     __id: UUID
     __create_at: datetime
     __init_at: datetime
-    __persistent: list[UUID]
+    __persistent: PersistentKeys
+    __lru: OrderedDict[UUID, None]
+    __sizes: dict[UUID, int]
+    __access_at: dict[UUID, datetime]
+    __ttl: dict[UUID, timedelta]
+    __total_size: int
+    __persistent_size: int
+    __spilled: OrderedDict[UUID, SpilledItem[VT]]
+    __stats: dict[str, int]
+    name: str
     max_length: int
     max_size: int
     max_duration: timedelta
     calc_size: Callable[[VT], int]
+    spill: SpillStore | None
 
     @overload
-    def __init__(self, /, max_length = 1, max_size = 1, max_duration: timedelta = None): ...
+    def __init__(self, /, max_length = 1, max_size = 1, max_duration: timedelta = None,
+                 name: str = None): ...
     @overload
-    def __init__(self, *args: VT, max_size = 1, max_duration: timedelta = None): ...
-    def __init__(self, *args: VT, max_length = 1, max_size = 1, max_duration: timedelta = None):
+    def __init__(self, *args: VT, max_size = 1, max_duration: timedelta = None,
+                 name: str = None): ...
+    def __init__(self, *args: VT, max_length = 1, max_size = 1, max_duration: timedelta = None,
+                 name: str = None):
         if max_length <= 0:
             max_length = 1
 
@@ -43,10 +120,27 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
         self.max_size = max_size
         self.max_duration = max_duration
         self.calc_size = lambda _: self.max_size
+        self.spill = None
         self.__create_at = datetime.now()
         self.__init_at = datetime.now()
         self.__id = uuid4()
-        self.__persistent = []
+        self.name = name or str(self.__id)
+        self.__lru = OrderedDict()
+        self.__sizes = {}
+        self.__access_at = {}
+        self.__ttl = {}
+        self.__total_size = 0
+        self.__persistent_size = 0
+        self.__spilled = OrderedDict()
+        self.__stats = {
+            "hits": 0,
+            "misses": 0,
+            "restores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "bytes_reclaimed": 0
+        }
+        self.__persistent = PersistentKeys(self)
 
         super().__init__()
         super().update({uuid4(): item for item in args})
@@ -74,33 +168,189 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
 
     @property
     def length(self):
-        """Cantidad permitida de elementos del DataStore."""
-        return len(self)
+        """Cantidad de elementos en memoria del DataStore."""
+        return len(self.data)
 
     @property
     def size(self):
-        """Tamaño actual del DataStore."""
-        return sum(self.calc_size(item) for item in self.values())
+        """Tamaño actual del DataStore, segun los tamaños calculados de cada elemento."""
+        return self.__total_size
+
+    @property
+    def size_persistent(self):
+        """Tamaño actual de los elementos persistentes del DataStore."""
+        return self.__persistent_size
+
+    @property
+    def size_spilled(self):
+        """Tamaño en disco de los elementos guardados por el `spill`."""
+        return sum(item.size for item in self.__spilled.values())
+
+    @property
+    def total_max_size(self):
+        """Tamaño maximo permitido para todos los elementos del DataStore."""
+        return self.max_size * self.max_length
 
     @property
     def time_elapsed(self):
         """Tiempo transcurrido desde el inicial al actual del DataStore."""
         return datetime.now() - self.init_at
 
-    def count_items_expired(self):
-        count_items = int(self.time_elapsed * self.max_length / self.max_duration)
-        if count_items >= self.max_length:
-            return self.max_length
-        return count_items
-
-    def popitems_expired(self):
-        """Elimina los ultimos elementos si ha expirado el tiempo."""
-        count_popitems = self.length - (self.max_length - self.count_items_expired())
-        if count_popitems > 0:
-            for _ in range(count_popitems):
-                key, value = self.popitem()
-                if key in self.persistent:
-                    self[key] = value
+    def _pin(self, key: UUID):
+        """Saca el ID del indice de desalojo, usado por `PersistentKeys`."""
+        if key in self.__lru:
+            del self.__lru[key]
+            self.__persistent_size += self.__sizes[key]
+
+    def spilled(self):
+        """IDs de los elementos guardados en disco, del mas antiguo al mas reciente."""
+        return list(self.__spilled)
+
+    def _unpin(self, key: UUID):
+        """Regresa el ID al indice de desalojo, usado por `PersistentKeys`."""
+        if key in self.data and key not in self.__lru:
+            self.__lru[key] = None
+            self.__persistent_size -= self.__sizes[key]
+
+    def __touch(self, key: UUID):
+        """Marca el elemento como el usado mas recientemente."""
+        self.__access_at[key] = datetime.now()
+        if key in self.__lru:
+            self.__lru.move_to_end(key)
+
+    def lru(self):
+        """IDs que se pueden desalojar, del usado menos recientemente al mas reciente."""
+        return list(self.__lru)
+
+    def ttl(self, key: UUID):
+        """Tiempo de vida del elemento desde su ultimo acceso."""
+        return self.__ttl[key]
+
+    def access_at(self, key: UUID):
+        """Fecha del ultimo acceso del elemento."""
+        return self.__access_at[key]
+
+    def size_of(self, key: UUID):
+        """Tamaño calculado del elemento al insertarlo o reemplazarlo."""
+        return self.__sizes[key]
+
+    def is_item_expired(self, key: UUID, now: datetime = None):
+        """Comprueba que el elemento haya expirado, los persistentes nunca expiran."""
+        if key in self.persistent or key not in self.__access_at:
+            return False
+        now = now or datetime.now()
+        return now > self.__access_at[key] + self.__ttl[key]
+
+    def resize(self, key: UUID):
+        """Recalcula el tamaño del elemento, cuando los datos se modifican en su lugar."""
+        size = int(self.calc_size(super().__getitem__(key)))
+        diff = size - self.__sizes[key]
+        self.__sizes[key] = size
+        self.__total_size += diff
+        if key in self.persistent:
+            self.__persistent_size += diff
+        return size
+
+    def evict(self):
+        """
+        Desaloja el elemento usado menos recientemente, devuelve el ID y su valor.
+        Si existe un `spill` el elemento se guarda en disco, sino se elimina.
+        """
+        if not self.__lru:
+            raise MemoryError("no hay elementos para desalojar en el DataStore")
+        key = next(iter(self.__lru))
+        value = self.data[key]
+        self.__stats["evictions"] += 1
+        self.__stats["bytes_reclaimed"] += self.__sizes[key]
+
+        if self.spill is None:
+            del self[key]
+            return key, value
+
+        self.__remove_memory(key)
+        try:
+            self.__spilled[key] = self.spill.dump(key, value)
+        except ValueError:
+            self.__access_at.pop(key, None)
+            self.__ttl.pop(key, None)
+            return key, value
+
+        while len(self.__spilled) > self.spill.max_length:
+            self.__discard_spilled(next(iter(self.__spilled)))
+        return key, value
+
+    def __make_room(self, size_item: int, err: MemoryError):
+        """Desaloja elementos hasta que el nuevo elemento tenga espacio, sino lanza el error."""
+        total_max_size = self.total_max_size
+        length_persistent = self.length - len(self.__lru)
+
+        if size_item > total_max_size - self.size_persistent:
+            raise err
+        if length_persistent + 1 > self.max_length:
+            raise err
+
+        while self.__lru and (self.length + 1 > self.max_length or
+                              self.size + size_item > total_max_size):
+            self.evict()
+
+    def __restore(self, key: UUID):
+        """Carga en memoria un elemento guardado en disco y lo vuelve a admitir."""
+        self.__spilled.move_to_end(key)
+        item = self.__spilled[key]
+        value = self.spill.load(item)
+        ttl = self.__ttl.get(key)
+
+        try:
+            self.set(key, value, ttl=ttl, force=True)
+        except MemoryError:
+            self.__touch(key)   # No cabe en memoria, se sigue leyendo desde disco.
+        return value
+
+    def __discard_spilled(self, key: UUID):
+        """Elimina el elemento guardado en disco."""
+        item = self.__spilled.pop(key)
+        self.__access_at.pop(key, None)
+        self.__ttl.pop(key, None)
+        self.spill.discard(item)
+
+    def __expire(self, key: UUID):
+        """Elimina el elemento expirado, en memoria o en disco."""
+        self.__stats["expirations"] += 1
+        if key in self.data:
+            self.__stats["bytes_reclaimed"] += self.__sizes[key]
+        del self[key]
+
+    def popitems_expired(self, deadline: float = None, keys: Iterator[UUID] = None):
+        """
+        Elimina los elementos que han expirado segun su ultimo acceso y tiempo de vida.
+        Con `deadline` (reloj `time.monotonic`) se detiene al agotar el tiempo y devuelve
+        False, devuelve True cuando se han revisado todos los elementos. Con `keys` se revisan
+        las claves del iterador, la siguiente llamada con el mismo iterador continua donde se
+        detuvo la anterior.
+        """
+        now = datetime.now()
+        keys = iter(list(self.__access_at)) if keys is None else keys
+        for key in keys:
+            if self.is_item_expired(key, now):
+                self.__expire(key)
+            if deadline is not None and monotonic() > deadline:
+                return False
+        return True
+
+    def stats(self):
+        """Metricas del uso del DataStore."""
+        return {
+            "id": str(self.id),
+            "name": self.name,
+            "length": self.length,
+            "max_length": self.max_length,
+            "spilled": len(self.__spilled),
+            **self.__stats,
+            "bytes_held": self.size,
+            "bytes_persistent": self.size_persistent,
+            "bytes_spilled": self.size_spilled,
+            "bytes_max": self.total_max_size
+        }
 
     def reset_init(self):
         """Reinicia la fecha de inicio a la actual para reutilizar el DataStore."""
@@ -111,11 +361,20 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
         return datetime.now() > self.init_at + self.max_duration
 
     def __getitem__(self, key):
+        if self.is_item_expired(key):
+            self.__expire(key)
+        if key in self.__spilled:
+            self.__stats["hits"] += 1
+            self.__stats["restores"] += 1
+            return self.__restore(key)
         try:
             data = super().__getitem__(key)
         except KeyError as err:
+            self.__stats["misses"] += 1
             msg = f"no se ha encontrado el elemento con el ID: '{key}'"
             raise MemoryError(msg) from err
+        self.__stats["hits"] += 1
+        self.__touch(key)
         return data
 
     def get(self, key: UUID, default: VT = None):
@@ -124,44 +383,109 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
         except MemoryError:
             return default
 
-    def __setitem__(self, key, item):
-        if key not in self and self.length + 1 > self.max_length:
-            raise MemoryError(f"fuera de capacidad maxima de elementos: {self.max_length}")
+    def __contains__(self, key: object):
+        return key in self.data or key in self.__spilled
+
+    def __iter__(self):
+        yield from list(self.data)
+        yield from list(self.__spilled)
+
+    def __len__(self):
+        return len(self.data) + len(self.__spilled)
+
+    def pop(self, key: UUID, *default: VT):
+        """Quita el elemento y devuelve su valor, aunque haya expirado."""
+        if key in self.data:
+            value = self.data[key]
+            del self[key]
+            return value
+        if key in self.__spilled:
+            value = self.spill.load(self.__spilled[key])
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def items(self):
+        """
+        Elementos del DataStore, sin modificar el orden de uso. Los elementos en disco se
+        devuelven sin sus DataFrames, para cargarlos se debe usar `DataStore[key]`.
+        """
+        spilled = [(key, item.shell) for key, item in self.__spilled.items()]
+        return list(self.data.items()) + spilled
+
+    def values(self):
+        """Valores del DataStore, sin modificar el orden de uso."""
+        return [value for _, value in self.items()]
+
+    def set(self, key: UUID, item: VT, *, ttl: timedelta = None, force: bool = False):
+        """
+        Agrega o reemplaza un elemento con un tiempo de vida propio,
+        con force activado o con `spill` despeja espacio para el nuevo item.
+        """
+        size_item = int(self.calc_size(item))
+        try:
+            self.__admit(key, item, size_item, ttl)
+        except MemoryError as err:
+            if not force and self.spill is None:
+                raise err
 
-        total_max_size = self.max_size * self.max_length
+            self.__make_room(size_item, err)
+            self.__admit(key, item, size_item, ttl)
 
-        if self.size + self.calc_size(item) > total_max_size:
-            raise MemoryError(f"fuera de capacidad maxima de tamaño: {total_max_size:.3f}")
+    def __admit(self, key: UUID, item: VT, size_item: int, ttl: timedelta = None):
+        """Guarda el elemento en memoria si hay capacidad, sino lanza MemoryError."""
+        is_new = key not in self.data
+        if is_new and self.length + 1 > self.max_length:
+            raise MemoryError(f"fuera de capacidad maxima de elementos: {self.max_length}")
 
-        super().__setitem__(key, item)
+        size_old = 0 if is_new else self.__sizes[key]
+        total_max_size = self.total_max_size
 
-    def append(self, item: VT, *, force: bool = False):
-        """Agrega un elemento Data, devuelve el UUID,
-        con force activado despeja espacio para el nuevo item."""
-        uuid = uuid4()
-        try:
-            self[uuid] = item
-        except MemoryError as err:
-            if not force:
-                raise err
+        if self.size - size_old + size_item > total_max_size:
+            raise MemoryError(f"fuera de capacidad maxima de tamaño: {total_max_size:.3f}")
 
-            total_max_size = self.max_size * self.max_length
-            size_item = self.calc_size(item)
-            size_p_items = sum(self.calc_size(v) for k, v in self.items() if k in self.persistent)
+        if key in self.__spilled:
+            self.spill.discard(self.__spilled.pop(key))
 
-            if size_item > total_max_size - size_p_items:
-                raise err
+        self.data[key] = item
+        self.__sizes[key] = size_item
+        self.__ttl[key] = ttl or self.max_duration
+        self.__total_size += size_item - size_old
 
-            dump_size = self.size - size_p_items - size_item
-            for _ in range(self.length):
-                key, value = self.popitem()
-                if key in self.persistent:
-                    self[key] = value
-                    continue
+        if key in self.persistent:
+            self.__persistent_size += size_item - size_old
+        else:
+            self.__lru[key] = None
+        self.__touch(key)
 
-                if self.size <= dump_size:
-                    break
-            self[uuid] = item
+    def __setitem__(self, key, item):
+        self.set(key, item)
+
+    def __delitem__(self, key):
+        if key in self.__spilled:
+            self.__discard_spilled(key)
+            return
+        self.__remove_memory(key)
+        self.__access_at.pop(key, None)
+        self.__ttl.pop(key, None)
+
+    def __remove_memory(self, key: UUID):
+        """Quita el elemento de memoria, conservando su fecha de acceso y tiempo de vida."""
+        del self.data[key]
+        size = self.__sizes.pop(key)
+        self.__total_size -= size
+        if key in self.__lru:
+            del self.__lru[key]
+        elif key in self.persistent:
+            self.__persistent_size -= size
+
+    def append(self, item: VT, *, force: bool = False, ttl: timedelta = None):
+        """Agrega un elemento Data, devuelve el UUID,
+        con force activado o con `spill` despeja espacio para el nuevo item."""
+        uuid = uuid4()
+        self.set(uuid, item, ttl=ttl, force=force)
         return uuid
 
     def update(self, other=None, /, **kwargs):
@@ -184,10 +508,26 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
 
     @classmethod
     def clear_cache(cls):
-        """Funcion en un main loop para ir limpiando la cache."""
-        for datastore in cls.cache.values():
-            if datastore:
-                datastore.popitems_expired()
+        """Limpia de la cache todos los elementos expirados de una sola vez."""
+        for datastore in list(cls.cache.values()):
+            datastore.popitems_expired()
+
+    @classmethod
+    async def sweep(cls, time_slice: float = 0.01):
+        """
+        Limpia de la cache los elementos expirados en fracciones de tiempo (segundos),
+        cediendo el control al event loop entre cada fraccion para no bloquearlo.
+        """
+        for datastore in list(cls.cache.values()):
+            keys = iter(list(datastore.__access_at))
+            while not datastore.popitems_expired(monotonic() + time_slice, keys):
+                await asyncio_sleep(0)
+            await asyncio_sleep(0)
+
+    @classmethod
+    def stats_cache(cls):
+        """Metricas de todos los DataStore en cache."""
+        return [datastore.stats() for datastore in cls.cache.values()]
 
     @overload
     @classmethod
@@ -202,3 +542,14 @@ class DataStore(Generic[VT], UserDict[UUID, VT]):
         if datastore is None and err == "raise":
             raise KeyError(f"no se ha encontrado el DataStore con el ID: '{idstore}'")
         return datastore
+
+scheduler_app.add_job(
+    DataStore.sweep,
+    "interval",
+    seconds=30,
+    id="data.store.sweep",
+    name="Limpieza de los DataStore expirados",
+    coalesce=True,
+    max_instances=1,
+    replace_existing=True
+)
@@ -0,0 +1,104 @@
+"""
+Modulo para guardar el estado de sincronizacion de las integraciones con archivos remotos.
+
+Un SyncLedger guarda por cada script los archivos remotos ya integrados con su version (fecha de
+modificacion y tamaño). La siguiente ejecucion solo considera los archivos nuevos o modificados
+desde la ultima integracion.
+"""
+
+from os import PathLike, replace as os_replace
+from pathlib import Path
+from hashlib import sha1
+from time import time
+import json
+from utils.constants import PATH_DATA
+from .keys import SourceFile
+
+PATH_SYNC = PATH_DATA / "sync"
+
+class SyncLedger:
+    """
+    Archivos remotos integrados por un script, identificados por la ruta, la fecha de modificacion
+    y el tamaño. Se guarda en disco solo cuando la integracion termina, ver `SyncLedger.commit`.
+    """
+    dirpath: Path
+    script_id: str
+    __files: dict[str, SourceFile] | None
+    __synced_at: float | None
+
+    def __init__(self, script_id: str, dirpath: PathLike = PATH_SYNC):
+        self.dirpath = Path(dirpath)
+        self.script_id = script_id
+        self.__files = None
+        self.__synced_at = None
+
+    @property
+    def filepath(self) -> Path:
+        """Archivo del estado del script."""
+        return self.dirpath / (sha1(self.script_id.encode("utf-8")).hexdigest() + ".json")
+
+    def __load(self):
+        if self.__files is not None:
+            return
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as file:
+                state: dict = json.load(file)
+            self.__files = {name: SourceFile(*value) for name, value in state["files"].items()}
+            self.__synced_at = state.get("synced_at")
+        except (OSError, ValueError, TypeError, KeyError):
+            self.__files = {}
+
+    @property
+    def files(self) -> dict[str, SourceFile]:
+        """Archivos integrados con su version, se leen de disco la primera vez."""
+        self.__load()
+        return self.__files
+
+    @property
+    def synced_at(self) -> float | None:
+        """Fecha (timestamp) de la ultima integracion guardada."""
+        self.__load()
+        return self.__synced_at
+
+    def pending(self, files: dict[str, SourceFile]) -> list[str]:
+        """Archivos que no se han integrado o cambiaron desde que se integraron."""
+        return [name for name, source in files.items() if self.files.get(name) != source]
+
+    def commit(self, files: dict[str, SourceFile], expire_before: float = None):
+        """
+        Agrega los archivos integrados y guarda el estado en disco, reemplazando el anterior a la
+        vez. Con `expire_before` (timestamp) se eliminan los archivos modificados antes de esa
+        fecha, no se usa el listado del origen porque uno vacio o parcial borraria el estado.
+        """
+        if expire_before is not None:
+            for name in [n for n, source in self.files.items() if source.mtime < expire_before]:
+                self.files.pop(name)
+
+        self.files.update({name: SourceFile(*source) for name, source in files.items()})
+        self.__synced_at = time()
+
+        state = {
+            "script_id": self.script_id,
+            "synced_at": self.__synced_at,
+            "files": {name: list(source) for name, source in self.files.items()}
+        }
+
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+        filepath_tmp = self.filepath.with_suffix(".tmp")
+        with open(filepath_tmp, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os_replace(filepath_tmp, self.filepath)
+
+    def reset(self):
+        """Olvida los archivos integrados, la siguiente ejecucion revisa todos los archivos."""
+        self.__files = {}
+        self.__synced_at = None
+        self.filepath.unlink(missing_ok=True)
+
+SYNC_LEDGERS: dict[str, SyncLedger] = {}
+
+def get_sync_ledger(script_id: str) -> SyncLedger:
+    """Estado de sincronizacion del script, se reutiliza entre ejecuciones."""
+    if script_id not in SYNC_LEDGERS:
+        SYNC_LEDGERS[script_id] = SyncLedger(script_id)
+    return SYNC_LEDGERS[script_id]
@@ -0,0 +1,39 @@
+"""
+Modulo para evaluar funciones sobre los valores unicos de una Serie y no sobre cada fila.
+
+Las columnas como codigos postales, fechas o tipos de documento tienen muchos menos valores
+distintos que filas. La Serie se factoriza, la funcion se evalua una sola vez por cada valor
+unico (incluido el nulo) y el resultado se expande a las filas con los codigos.
+"""
+
+from typing import Any, Callable
+from numpy import ndarray, asarray
+from pandas import Series, factorize
+
+def factorize_values(values: Series) -> tuple[ndarray, Series]:
+    """Codigos de cada fila y los valores unicos como objetos, el nulo es un valor mas."""
+    codes, uniques = factorize(values, use_na_sentinel=False)
+    return codes, Series(uniques, dtype=object)
+
+def transform_uniques(values: Series, func: Callable[[Series], Any]) -> Series:
+    """
+    Evalua `func` una sola vez sobre la Serie de valores unicos y expande el resultado a cada
+    fila, `func` debe devolver un valor por cada valor unico y en el mismo orden.
+    """
+    codes, uniques = factorize_values(values)
+    result = func(uniques)
+    result = result.to_numpy() if isinstance(result, Series) else asarray(result)
+    return Series(result[codes], index=values.index, name=values.name)
+
+def apply_uniques(values: Series, func: Callable[[Any], Any]) -> Series:
+    """
+    Igual a `Series.apply(func)` pero ejecuta `func` una sola vez por cada valor unico.
+    Los valores que no se pueden factorizar (listas, diccionarios) se evaluan fila por fila.
+    """
+    try:
+        codes, uniques = factorize_values(values)
+    except TypeError:
+        return values.apply(func)
+
+    result = Series([func(value) for value in uniques])
+    return Series(result.to_numpy()[codes], index=values.index, name=values.name)
@@ -1,16 +1,35 @@
 """Modulo de scripts para datos de la interfaz contable con el pos cegid."""
 
 from datetime import datetime, timedelta
-from io import StringIO
-from pandas import concat as pandas_concat, to_datetime as pandas_to_datetime
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from pandas import DataFrame, Series, concat as pandas_concat, to_datetime as pandas_to_datetime
 from app.logging import get_logger
 from core.afi import AFI, AFITransfers
 from core.afi.fields import AFIField
+from data.keys import KeyIndex, KeyIndexStore, SourceFile
+from data.reference import REFERENCES
+from utils.constants import PATH_DATA
 from service import services, common
 from scripts import cegid
+from .utils import get_maaji_ftp
 
 logger = get_logger("auto", "scripts.cegid.afi")
 
+# Claves de los movimientos de los archivos ya procesados, se reutiliza entre ejecuciones.
+PATH_INDEX_AFI_PROCESA = PATH_DATA / "index" / "afi_procesa"
+INDEX_AFI_PROCESA = KeyIndexStore(PATH_INDEX_AFI_PROCESA)
+
+# Escritura de los archivos por dia en paralelo, mientras se suben los que ya estan listos.
+WRITER_AFI_FILES = ThreadPoolExecutor(max_workers=4, thread_name_prefix="afi-writer")
+
+def write_afi_file(data: DataFrame) -> BytesIO:
+    """Escribe los movimientos de un dia en un buffer binario listo para subir."""
+    buffer = BytesIO()
+    data.to_csv(buffer, sep=";", index=False, header=False, encoding="utf-8")
+    buffer.seek(0)
+    return buffer
+
 @services.operation(
     common.returns.exitstatus,
     context=cegid.params.context,
@@ -18,7 +37,7 @@ logger = get_logger("auto", "scripts.cegid.afi")
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def get_afi_transfers(*,
+async def get_afi_transfers(*,
                       context: dict,
                       patter: str,
                       after_at: datetime = None,
@@ -27,9 +46,9 @@ def get_afi_transfers(*,
     Busca y descarga los archivos de las transferencias y agrupa en una instancia AFITransfers.
     """
     context["integration_state"] = "out"
-    cegid.operations.getfiles(patter, context, after_at, before_at)
+    await cegid.operations.getfiles(patter, context, after_at, before_at)
     context["files"] = context.get("files_by_out")
-    cegid.operations.downloadfiles(context)
+    await cegid.operations.downloadfiles(context)
 
     context_files_transfers_support = context.get("files_transfers_support") or "csv"
     context_files_transfers_header = context.get("files_transfers_header") or None
@@ -57,11 +76,16 @@ def get_afi_transfers(*,
     context["files"] = []
 
 def _get_afi_files(*, context: dict):
-    """Descarga los archivos y los agrupa en una instancia AFI."""
+    """
+    Descarga los archivos y los agrupa en una instancia AFI. Guarda las fechas de elaboracion de
+    cada archivo de origen leido, los que no se pueden leer no se integran.
+    """
+    context_files = context.get("files") or []
     context_download_files = context.get("download_files") or []
     all_afi_files: list[AFI] = []
+    afi_files_dates: dict[str, list[str]] = {}
 
-    for file_source in context_download_files:
+    for file_out, file_source in zip(context_files, context_download_files):
         try:
             afi_file = AFI(
                 source=file_source,
@@ -69,19 +93,23 @@ def _get_afi_files(*, context: dict):
                 mode="buffer",
                 sep=";",
                 index_col=False,
-                header=None
+                header=None,
+                compact=True
             )
             all_afi_files.append(afi_file)
+            afi_files_dates[file_out] = list(afi_file.data[AFIField.FECHA_ELABORACION].unique())
         except Exception:
             continue
 
     try:
         df_afi_files = pandas_concat([afi.data for afi in all_afi_files], ignore_index=True)
-        afi_files = AFI(source=df_afi_files)
+        afi_files = AFI(source=df_afi_files, compact=True)
     except Exception:
         afi_files = None
+        afi_files_dates = {}
 
     context["afi_files"] = afi_files
+    context["afi_files_dates"] = afi_files_dates
     context["files"] = []
 
 @services.operation(
@@ -91,22 +119,56 @@ def _get_afi_files(*, context: dict):
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def get_afi_duplicates(*,
+async def get_afi_duplicates(*,
                       context: dict,
                       patter: str,
                       after_at: datetime = None,
                       before_at: datetime = None):
     """
     Busca los archivos de con posibilidad de duplicados en la carpeta procesa de interfaz contable.
+    Solo se descargan los archivos que no estan en el indice de movimientos procesados.
     """
     context["integration_state"] = "procesa"
-    cegid.operations.getfiles(patter, context, after_at, before_at)
-    context["files"] = context.get("files_by_procesa")
-    cegid.operations.downloadfiles(context)
+    await cegid.operations.getfiles(patter, context, after_at, before_at)
 
-    _get_afi_files(context=context)
-    context["afi_duplicates"] = context["afi_files"]
-    context["afi_files"] = []
+    ftp = get_maaji_ftp(context.get("ftp_name"), context.get("ftp_host"))
+    files_by_procesa = context.get("files_by_procesa") or []
+    files_info_by_procesa: dict[str, SourceFile] = context.get("files_info_by_procesa") or {}
+    files_procesa = {f"{ftp.host}:{file}": file for file in files_by_procesa}
+    files_info = {name: files_info_by_procesa[file] for name, file in files_procesa.items()}
+
+    files_pending = INDEX_AFI_PROCESA.pending(files_info)
+    context["files"] = [files_procesa[name] for name in files_pending]
+    await cegid.operations.downloadfiles(context)
+
+    context_download_files = context.get("download_files") or []
+
+    for name, file_source in zip(files_pending, context_download_files):
+        try:
+            afi_file = AFI(
+                source=file_source,
+                support="csv",
+                mode="buffer",
+                sep=";",
+                index_col=False,
+                header=None
+            )
+            INDEX_AFI_PROCESA.set(name, files_info[name], afi_file.index_duplicates())
+        except Exception:
+            continue
+
+    # Solo se olvidan los archivos anteriores al periodo y si el listado no esta vacio.
+    if after_at is not None and files_procesa:
+        INDEX_AFI_PROCESA.prune(after_at.timestamp())
+    INDEX_AFI_PROCESA.save()
+
+    context["afi_duplicates"] = INDEX_AFI_PROCESA.index(files_procesa)
+    context["files"] = []
+    logger.info(
+        "se han indexado %d de %d archivos procesados de IC",
+        len(files_pending),
+        len(files_procesa)
+    )
 
 @services.operation(
     common.returns.exitstatus,
@@ -115,16 +177,17 @@ def get_afi_duplicates(*,
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def get_afi_files(*,
+async def get_afi_files(*,
                   context: dict,
                   patter: str,
                   after_at: datetime = None,
                   before_at: datetime = None):
     """Busca los archivos de en la carpeta por fuera de los planos de interfaz contable."""
     context["integration_state"] = "out"
-    cegid.operations.getfiles(patter, context, after_at, before_at)
-    context["files"] = context.get("files_by_out")
-    cegid.operations.downloadfiles(context)
+    await cegid.operations.getfiles(patter, context, after_at, before_at)
+    cegid.operations.syncfiles(context=context, after_at=after_at)
+    cegid.operations.flowintegration(context=context)
+    await cegid.operations.downloadfiles(context)
     _get_afi_files(context=context)
 
 @services.operation(
@@ -144,10 +207,12 @@ def fullfix(*, context: dict, after_at: datetime = None, before_at: datetime = N
     context_files_preffix = str(context.get("files_preffix") or "AIC")
     context_afi_files: AFI = context.get("afi_files") or None
     context_afi_transfers: AFITransfers = context.get("afi_transfers") or None
-    context_afi_duplicates: AFI = context.get("afi_duplicates") or None
+    context_afi_duplicates: KeyIndex = context.get("afi_duplicates") or None
+    context_afi_files_dates: dict[str, list[str]] = context.get("afi_files_dates") or {}
 
     context_files = []
     context_upload_files = []
+    context_files_integrated = []
 
     if context_afi_files:
         context_afi_files.fullfix(context_afi_transfers, context_afi_duplicates)
@@ -160,14 +225,21 @@ def fullfix(*, context: dict, after_at: datetime = None, before_at: datetime = N
             datefile = date.strftime("%Y%m%d")
             timefile = datetime.now().strftime("%H%M%S")
             filename = f"{context_files_preffix}_{datefile}{timefile}.xlsx"
-            buffer = StringIO()
-            afi_file.to_csv(buffer, sep=";", index=False, header=False)
             context_files.append(filename)
-            context_upload_files.append(buffer)
+            context_upload_files.append(WRITER_AFI_FILES.submit(write_afi_file, afi_file))
             logger.info("se ha reparado el archivo de interfaz contable '%s'", filename)
 
+        # Un archivo de origen se integra si todos sus movimientos estan dentro del periodo, los
+        # movimientos por fuera no se suben y el archivo se vuelve a revisar.
+        period = (pandas_to_datetime(after_at.date()), pandas_to_datetime(before_at.date()))
+        for file_out, dates in context_afi_files_dates.items():
+            dates = pandas_to_datetime(Series(dates), format="%Y/%m/%d", errors="coerce")
+            if dates.between(*period).all():
+                context_files_integrated.append(file_out)
+
     context["files"] = context_files
     context["upload_files"] = context_upload_files
+    context["files_integrated"] = context_files_integrated
 
 @services.operation(
     common.returns.exitstatus,
@@ -181,7 +253,7 @@ def fullfix(*, context: dict, after_at: datetime = None, before_at: datetime = N
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def integratedata(*,
+async def integratedata(*,
                   context: dict,
                   patter: str,
                   patter_by_input: str,
@@ -194,35 +266,44 @@ def integratedata(*,
     """Integra los archivos de la interfaz contable."""
 
     context["integration_state"] = "input"
-    cegid.operations.getfiles(patter_by_input, context, after_at, before_at)
+    await cegid.operations.getfiles(patter_by_input, context, after_at, before_at)
 
     context["integration_state"] = "error"
-    cegid.operations.getfiles(patter_by_error, context, after_at, before_at)
+    await cegid.operations.getfiles(patter_by_error, context, after_at, before_at)
+
+    # Los traslados y la reparacion usan la misma version de las referencias.
+    with REFERENCES.pin():
+        if patter_by_transfers:
+            await get_afi_transfers(
+                context=context,
+                patter=patter_by_transfers,
+                after_at=after_at,
+                before_at=before_at
+            )
 
-    if patter_by_transfers:
-        get_afi_transfers(
+        await get_afi_duplicates(
             context=context,
-            patter=patter_by_transfers,
+            patter=patter_by_procesa,
             after_at=after_at,
             before_at=before_at
         )
 
-    get_afi_duplicates(
-        context=context,
-        patter=patter_by_procesa,
-        after_at=after_at,
-        before_at=before_at
-    )
-
-    get_afi_files(context=context, patter=patter, after_at=after_at, before_at=before_at)
+        await get_afi_files(
+            context=context,
+            patter=patter,
+            after_at=after_at,
+            before_at=before_at
+        )
 
-    fullfix(context=context, after_at=after_at, before_at=before_at)
+        fullfix(context=context, after_at=after_at, before_at=before_at)
 
-    cegid.operations.flowintegration(context=context)
+    # Los archivos reparados por dia se suben a la carpeta de entrada.
     cegid.operations.dirpathinput(dirpath_input, context=context)
+    context["files"] = context.get("files_to_input") or []
 
+    await cegid.operations.uploadfiles(context)
     if not context.get("test"):
-        cegid.operations.uploadfiles(context)
+        cegid.operations.synccommit(context=context)
 
     context_files = len(context.get("files") or [])
     logger.info("se han integrado %d archivos de IC con exito", context_files)
@@ -239,7 +320,7 @@ def integratedata(*,
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def test(*,
+async def test(*,
          context: dict,
          patter: str,
          patter_by_input: str,
@@ -252,7 +333,7 @@ def test(*,
     """Prueba para integrar los archivos de la interfaz contable sin subirlos al FTP"""
     context["test"] = True
 
-    integratedata(
+    await integratedata(
         context=context,
         patter=patter,
         patter_by_transfers=patter_by_transfers,
@@ -1,8 +1,9 @@
 """Modulo de scripts para datos de los clientes con el pos cegid."""
 
 from datetime import datetime
-from io import IOBase, StringIO
+from io import IOBase
 from app.logging import get_logger
+from utils.ftp import spooled_buffer
 from core.clients import ClientsCegid, MAPFIELDS_CLIENTS_POS_CEGID
 from service import services, common
 from scripts import cegid
@@ -12,36 +13,40 @@ logger = get_logger("auto", "scripts.cegid.clients")
 @services.operation(common.returns.exitstatus, context=cegid.params.context)
 def fullfix(*, context: dict):
     """Repara los archivos de los clientes."""
+    context_files_out = context.get("files") or []
     context_files_to_input = context.get("files_to_input") or []
     context_download_files = context.get("download_files") or []
     context_files = []
     context_upload_files = []
+    context_files_integrated = []
 
-    for file_local, file_source in zip(context_files_to_input, context_download_files):
+    for file_out, file_local, file_source in zip(context_files_out,
+                                                 context_files_to_input,
+                                                 context_download_files):
         if not isinstance(file_source, IOBase):
             raise TypeError("el archivo debe ser un buffer")
 
-        file_destination = StringIO()
+        file_destination = spooled_buffer()
 
-        clients = ClientsCegid(
+        # Reparacion por partes, el archivo del POS puede tener muchos clientes.
+        ClientsCegid.fullfix_chunks(
             MAPFIELDS_CLIENTS_POS_CEGID,
             source=file_source,
             destination=file_destination,
-            support="csv",
             mode="buffer",
-            sep="|"
+            sep="|",
+            compact=True,
+            kwargs_save={"sep": "|", "index": False}
         )
-
-        file_destination.seek(0)
-        clients.fullfix()
-        clients.save("csv", "buffer", fixed=True, sep="|", index=False)
         file_destination.seek(0)
         context_files.append(file_local)
         context_upload_files.append(file_destination)
+        context_files_integrated.append(file_out)
         logger.info("se ha reparado el archivo de clientes '%s'", file_local)
 
     context["files"] = context_files
     context["upload_files"] = context_upload_files
+    context["files_integrated"] = context_files_integrated
 
 @services.operation(
     common.returns.exitstatus,
@@ -54,7 +59,7 @@ def fullfix(*, context: dict):
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def integratedata(*,
+async def integratedata(*,
                   context: dict,
                   patter: str,
                   patter_by_input: str,
@@ -65,21 +70,23 @@ def integratedata(*,
                   before_at: datetime = None):
     """Integra los archivos de los clientes."""
     context["integration_state"] = "out"
-    cegid.operations.getfiles(patter, context, after_at, before_at)
+    await cegid.operations.getfiles(patter, context, after_at, before_at)
+    cegid.operations.syncfiles(context=context, after_at=after_at)
     context["integration_state"] = "input"
-    cegid.operations.getfiles(patter_by_input, context, after_at, before_at)
+    await cegid.operations.getfiles(patter_by_input, context, after_at, before_at)
     context["integration_state"] = "procesa"
-    cegid.operations.getfiles(patter_by_procesa, context, after_at, before_at)
+    await cegid.operations.getfiles(patter_by_procesa, context, after_at, before_at)
     context["integration_state"] = "error"
-    cegid.operations.getfiles(patter_by_error, context, after_at, before_at)
+    await cegid.operations.getfiles(patter_by_error, context, after_at, before_at)
 
     cegid.operations.flowintegration(context=context)
     cegid.operations.dirpathinput(dirpath_input, context=context)
-    cegid.operations.downloadfiles(context)
+    await cegid.operations.downloadfiles(context)
     fullfix(context=context)
 
+    await cegid.operations.uploadfiles(context)
     if not context.get("test"):
-        cegid.operations.uploadfiles(context)
+        cegid.operations.synccommit(context=context)
 
     context_files = len(context.get("files") or [])
     logger.info("se han integrado %d archivos de clientes con exito", context_files)
@@ -95,7 +102,7 @@ def integratedata(*,
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def test(*,
+async def test(*,
          context: dict,
          patter: str,
          patter_by_input: str,
@@ -107,7 +114,7 @@ def test(*,
     """Prueba para integrar los archivos de los clientes sin subirlos al FTP"""
     context["test"] = True
 
-    integratedata(
+    await integratedata(
         context=context,
         patter=patter,
         patter_by_input=patter_by_input,
@@ -2,9 +2,15 @@
 
 from typing import Literal
 from pathlib import Path
-from io import StringIO
+from io import BufferedIOBase
+from time import monotonic
+from concurrent.futures import Future
+from asyncio import to_thread, wrap_future
 from datetime import datetime
 from app.logging import get_logger
+from utils.ftp import spooled_buffer
+from data.keys import SourceFile
+from data.sync import get_sync_ledger
 from service import services, common
 from scripts import cegid
 from .utils import get_maaji_ftp
@@ -20,34 +26,107 @@ list_context_integration_state: list[ContextIntegrationState] = ["out", "input",
     after_at=cegid.params.after_at,
     before_at=cegid.params.before_at
 )
-def getfiles(patter: str, context: dict, after_at: datetime = None, before_at: datetime = None):
+async def getfiles(patter: str,
+                   context: dict,
+                   after_at: datetime = None,
+                   before_at: datetime = None):
     """Busca los archivos en el FTP de Maaji."""
     ftp_name = context.get("ftp_name")
     ftp_host = context.get("ftp_host")
     ftp = get_maaji_ftp(ftp_name, ftp_host)
-    list_files = ftp.list_files_by_date(patter, after_at, before_at)
+    entries = await ftp.run(ftp.list_entries_by_date, patter, after_at, before_at)
+    list_files = [entry.path for entry in entries]
     context_integration_state = context.get("integration_state") or "out"
 
     if context_integration_state not in list_context_integration_state:
         context_integration_state = "out"
 
     key_files_by = f"files_by_{context_integration_state}"
+    key_files_info_by = f"files_info_by_{context_integration_state}"
     context[key_files_by] = list_files
+    context[key_files_info_by] = {
+        entry.path: SourceFile(entry.mtime, entry.size) for entry in entries
+    }
     return 0, f"se han encontrado un total de {len(list_files)} archivos"
 
+@services.operation(
+    common.returns.exitstatus,
+    context=cegid.params.context,
+    after_at=cegid.params.after_at
+)
+def syncfiles(*, context: dict, after_at: datetime = None):
+    """
+    Deja en los archivos de origen (out) solo los nuevos o modificados desde la ultima integracion
+    del script, se debe llamar despues de buscar los archivos de origen. Con `sync_full` en el
+    contexto se revisan todos los archivos y al guardar se olvidan los modificados antes de
+    `after_at`, ver `synccommit`.
+    """
+    script_id = context.get("script_id")
+    if not script_id:
+        return 0, "sin script, se revisan todos los archivos"
+
+    ledger = get_sync_ledger(script_id)
+    files_info: dict[str, SourceFile] = context.get("files_info_by_out") or {}
+    context_files_by_out = context.get("files_by_out") or []
+    files_out = {file: files_info[file] for file in context_files_by_out if file in files_info}
+
+    if context.get("sync_full"):
+        files_pending = list(files_out)
+        context["sync_expire_before"] = after_at.timestamp() if after_at else None
+    else:
+        files_pending = ledger.pending(files_out)
+
+    context["files_by_out"] = files_pending
+    context["sync_files"] = {file: files_out[file] for file in files_pending}
+    logger.info(
+        "se revisan %d de %d archivos de origen del script '%s'",
+        len(files_pending),
+        len(files_out),
+        script_id
+    )
+    return 0, f"se revisan un total de {len(files_pending)} archivos"
+
+@services.operation(common.returns.exitstatus, context=cegid.params.context)
+def synccommit(*, context: dict):
+    """
+    Guarda los archivos de origen integrados por el script, ver `syncfiles`. Solo se guardan los
+    que generaron archivos subidos (`files_integrated`) y los que ya estaban en el flujo de la
+    integracion (`files_in_flow`), los demas se revisan de nuevo. Solo una
+    ejecucion con `sync_full` olvida los archivos anteriores a su periodo.
+    """
+    script_id = context.get("script_id")
+    if not script_id or "sync_files" not in context:
+        return 0, "sin archivos para guardar"
+
+    context_sync_files: dict[str, SourceFile] = context.pop("sync_files") or {}
+    context_files_integrated = context.pop("files_integrated", None) or []
+    context_files_integrated += context.pop("files_in_flow", None) or []
+    files_integrated = {
+        file: context_sync_files[file]
+        for file in context_files_integrated
+        if file in context_sync_files
+    }
+    expire_before = context.pop("sync_expire_before", None)
+    get_sync_ledger(script_id).commit(files_integrated, expire_before)
+    return 0, f"se han guardado un total de {len(files_integrated)} archivos integrados"
+
 @services.operation(common.returns.exitstatus, context=cegid.params.context)
 def flowintegration(*, context: dict):
-    """Filtra los archivos que cumplen con el flujo de la integracion en cegid y2."""
+    """
+    Filtra los archivos que cumplen con el flujo de la integracion en cegid y2. Los que ya estan
+    en entrada, procesa o error quedan en `files_in_flow` y se guardan como integrados.
+    """
     context_files_by_out = context.get("files_by_out") or []
     context_files_by_input = context.get("files_by_input") or []
     context_files_by_procesa = context.get("files_by_procesa") or []
     context_files_by_error = context.get("files_by_error") or []
 
-    context_files_by_input = [Path(file).name for file in context_files_by_input]
-    context_files_by_procesa = [Path(file).name for file in context_files_by_procesa]
-    context_files_by_error = [Path(file).name for file in context_files_by_error]
+    context_files_by_input = {Path(file).name for file in context_files_by_input}
+    context_files_by_procesa = {Path(file).name for file in context_files_by_procesa}
+    context_files_by_error = {Path(file).name for file in context_files_by_error}
 
     context_download_files = []
+    context_files_in_flow = []
 
     for file_out in context_files_by_out:
         filename_out = Path(file_out).name
@@ -57,12 +136,19 @@ def flowintegration(*, context: dict):
 
         if not file_input and not file_precesa and not file_error:
             context_download_files.append(file_out)
+        else:
+            context_files_in_flow.append(file_out)
 
     context["files"] = context_download_files
+    context["files_in_flow"] = context_files_in_flow
     context["files_by_out"] = []
     context["files_by_input"] = []
     context["files_by_procesa"] = []
     context["files_by_error"] = []
+    context["files_info_by_out"] = {}
+    context["files_info_by_input"] = {}
+    context["files_info_by_procesa"] = {}
+    context["files_info_by_error"] = {}
 
 @services.operation(
     common.params.raw,
@@ -81,7 +167,7 @@ def dirpathinput(dirpath_input: str, *, context: dict):
     context["files_to_input"] = context_files_to_input
 
 @services.operation(common.returns.exitstatus, context=cegid.params.context)
-def downloadfiles(context: dict):
+async def downloadfiles(context: dict):
     """Descargar los archivos a una ruta especifica en el FTP Maaji"""
     ftp_name = context.get("ftp_name")
     ftp_host = context.get("ftp_host")
@@ -96,18 +182,28 @@ def downloadfiles(context: dict):
     for remote_file in context_files:
         if not isinstance(remote_file, str):
             raise TypeError("el valor no es una ruta de un archivo en el ftp.")
+        context_download_files.append(spooled_buffer())
 
-        buffer = StringIO()
-        ftp.download(remote_file, buffer)
-        context_download_files.append(buffer)
+    # Descarga simultanea con las conexiones del pool del FTP.
+    start = monotonic()
+    transfers = await to_thread(ftp.download_many, context_files, context_download_files)
+    seconds = monotonic() - start
 
     context["download_files"] = context_download_files
     count_download_files = len(context_download_files)
-    logger.info("se han descargado %d archivos desde FTP '%s'", count_download_files, ftp.host)
+    size = sum(transfer.size for transfer in transfers)
+    logger.info(
+        "se han descargado %d archivos desde FTP '%s', %d bytes en %.2f segundos (%.1f KB/s)",
+        count_download_files,
+        ftp.host,
+        size,
+        seconds,
+        size / seconds / 1024 if seconds > 0 else 0
+    )
     return 0, f"se han descargado un total de {count_download_files} archivos"
 
 @services.operation(common.returns.exitstatus, context=cegid.params.context)
-def uploadfiles(context: dict):
+async def uploadfiles(context: dict):
     """Subir los archivos a una ruta especifica en el FTP Maaji"""
     ftp_name = context.get("ftp_name")
     ftp_host = context.get("ftp_host")
@@ -119,17 +215,27 @@ def uploadfiles(context: dict):
     if not isinstance(context_upload_files, (list, tuple)):
         raise FileNotFoundError("no hay archivos para subir")
 
-    for remote_file, buffer in zip(context_files, context_upload_files):
+    for remote_file in context_files:
         if not isinstance(remote_file, str):
             raise TypeError("el valor no es una ruta de un archivo en el ftp.")
 
-        # ftp.upload(buffer, remote_file)
-        with open("../test/data/examples/data_clients/" + Path(remote_file).name, "w", encoding="utf-8") as file:
-            file.writelines(buffer.readlines())
-
+    if context.get("test"):
+        # En las pruebas no se sube al FTP, los archivos se escriben en los ejemplos locales.
+        for remote_file, buffer in zip(context_files, context_upload_files):
+            if isinstance(buffer, Future):
+                buffer = await wrap_future(buffer)
+            binary = isinstance(buffer, BufferedIOBase)
+            with open("../test/data/examples/data_clients/" + Path(remote_file).name,
+                      "wb" if binary else "w",
+                      encoding=None if binary else "utf-8") as file:
+                file.writelines(buffer.readlines())
+        return 0, f"se han escrito un total de {len(context_files)} archivos de prueba"
+
+    # Los buffers en preparacion (Future) se suben a medida que terminan.
+    await to_thread(ftp.upload_many, context_upload_files, context_files)
     count_upload_files = len(context_files)
     logger.info("se han subido %d archivos desde FTP '%s'", count_upload_files, ftp.host)
     return 0, f"se han subido un total de {count_upload_files} archivos"
 
-service = services.service("common", getfiles, flowintegration, dirpathinput,
-                           downloadfiles, uploadfiles)
+service = services.service("common", getfiles, syncfiles, flowintegration, dirpathinput,
+                           downloadfiles, uploadfiles, synccommit)
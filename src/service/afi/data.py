@@ -6,19 +6,22 @@ from quart import has_request_context, request
 from quart.datastructures import FileStorage
 from werkzeug.exceptions import BadRequestKeyError, InternalServerError
 from data.store import DataStore
+from data.spill import SpillStore
 from data.io import DataIO, SupportDataIO, ModeDataIO
 from core.afi import AFI, AFITransfers
 
 DS_AFI: DataStore[AFI] = DataStore(
     max_length=7,                         # 7 sitios disponibles para crear data AFI.
     max_size=35 * 1e6,                    # 35 Megabytes.
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="afi"
 )
 
 DS_AFI_TRANFERS: DataStore[AFITransfers] = DataStore(
     max_length=7,                         # 7 sitios disponibles para crear data AFI.
     max_size=35 * 1e6,                    # 35 Megabytes.
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="afi.transfers"
 )
 
 def ds_afi_calc_size(afi: AFI):
@@ -28,6 +31,8 @@ def ds_afi_calc_size(afi: AFI):
 
 DS_AFI.calc_size = ds_afi_calc_size
 DS_AFI_TRANFERS.calc_size = ds_afi_calc_size
+DS_AFI.spill = SpillStore(max_length=50)   # 50 sitios en disco.
+DS_AFI_TRANFERS.spill = SpillStore(max_length=50)   # 50 sitios en disco.
 
 async def source_from_request(source: DataIO, mode: ModeDataIO):
     """Obtiene un fileio desde un contexto de request."""
@@ -2,9 +2,9 @@
 
 __version__ = "1.0.0"
 
-__all__ = ["session"]
+__all__ = ["session", "commands", "cache"]
 
 from service.decorator import services
-from . import session, commands
+from . import session, commands, cache
 
-group = services.group("app", session.service, commands.service)
+group = services.group("app", session.service, commands.service, cache.service)
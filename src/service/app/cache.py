@@ -0,0 +1,18 @@
+"""Modulo de servicios para consultar y limpiar la cache de datos de la aplicacion."""
+
+from data.store import DataStore
+from service.decorator import services
+from service import common
+
+@services.operation(common.returns.default)
+def stats():
+    """Obtiene las metricas de uso de todos los DataStore en cache."""
+    return DataStore.stats_cache()
+
+@services.operation(common.returns.exitstatus)
+async def sweep():
+    """Limpia los elementos expirados de todos los DataStore en cache."""
+    await DataStore.sweep()
+    return 0, "se han limpiado los datos expirados de la cache"
+
+service = services.service("cache", stats, sweep)
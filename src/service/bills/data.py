@@ -8,6 +8,7 @@ from quart.datastructures import FileStorage
 from werkzeug.exceptions import BadRequestKeyError, InternalServerError
 from pandas import DataFrame
 from data.store import DataStore
+from data.spill import SpillStore
 from data.io import DataIO, SupportDataIO, ModeDataIO
 from core.bills import Bills
 from providers.microsoft.api.dynamics import DynamicsApi, DynamicsKeyEnv
@@ -15,7 +16,8 @@ from providers.microsoft.api.dynamics import DynamicsApi, DynamicsKeyEnv
 DS_BILLS: DataStore[Bills] = DataStore(
     max_length=7,                         # 7 sitios disponibles para crear data bills.
     max_size=35 * 1e6,                    # 35 Megabytes.
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="bills"
 )
 
 def ds_bills_calc_size(bills: Bills):
@@ -24,6 +26,7 @@ def ds_bills_calc_size(bills: Bills):
     return size
 
 DS_BILLS.calc_size = ds_bills_calc_size
+DS_BILLS.spill = SpillStore(max_length=50)   # 50 sitios en disco.
 
 async def source_from_request(source: DataIO, mode: ModeDataIO):
     """Obtiene un fileio desde un contexto de request."""
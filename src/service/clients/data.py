@@ -6,6 +6,8 @@ from quart import has_request_context, request
 from quart.datastructures import FileStorage
 from werkzeug.exceptions import BadRequestKeyError, InternalServerError
 from data.store import DataStore
+from data.spill import SpillStore
+from data.snapshot import memory_usage
 from data.io import DataIO, SupportDataIO, ModeDataIO
 from service import mapfields
 from core.clients import (
@@ -19,16 +21,16 @@ from core.clients import (
 DS_CLIENTS_POS: DataStore[_ClientsPOS[str]] = DataStore(
     max_length=7,                         # 7 sitios disponibles para crear data Clients.
     max_size=35 * 1e6,                    # 35 Megabytes.
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="clients"
 )
 
 def ds_clients_pos_calc_size(clients: _ClientsPOS[str]):
     """Callback para calcular el tamaño de los datos de los clientes."""
-    size = int(clients.data_pos.memory_usage(deep=True).sum())
-    size += int(clients.data.memory_usage(deep=True).sum())
-    return size
+    return memory_usage(clients.data_pos, clients.data)  # Columnas compartidas una sola vez.
 
 DS_CLIENTS_POS.calc_size = ds_clients_pos_calc_size
+DS_CLIENTS_POS.spill = SpillStore(max_length=50)   # 50 sitios en disco.
 
 async def source_from_request(source: DataIO, mode: ModeDataIO):
     """Obtiene un fileio desde un contexto de request."""
@@ -11,7 +11,8 @@ from service.mapfields import operations as opt
 DS_MAPFIELDS_CLIENTS: DataStore[MapFields] = DataStore(
     max_length=7,                         # 5 sitios disponibles y 2 por defecto.
     max_size=1,                           # 1 slot, sin calculos
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="mapfields.clients"
 )
 
 default_mapfields = DS_MAPFIELDS_CLIENTS.extend(
@@ -8,6 +8,7 @@ from quart.datastructures import FileStorage
 from werkzeug.exceptions import BadRequestKeyError, InternalServerError
 from pandas import DataFrame
 from data.store import DataStore
+from data.spill import SpillStore
 from data.io import DataIO, SupportDataIO, ModeDataIO
 from core.products import Products
 from providers.microsoft.api.dynamics import DynamicsApi, DynamicsKeyEnv
@@ -15,7 +16,8 @@ from providers.microsoft.api.dynamics import DynamicsApi, DynamicsKeyEnv
 DS_PRODUCTS: DataStore[Products] = DataStore(
     max_length=7,                         # 7 sitios disponibles para crear data Products.
     max_size=35 * 1e6,                    # 35 Megabytes.
-    max_duration=timedelta(minutes=70)    # 10 minutos cada item
+    max_duration=timedelta(minutes=70),   # 10 minutos cada item
+    name="products"
 )
 
 def ds_products_calc_size(products: Products):
@@ -24,6 +26,7 @@ def ds_products_calc_size(products: Products):
     return size
 
 DS_PRODUCTS.calc_size = ds_products_calc_size
+DS_PRODUCTS.spill = SpillStore(max_length=50)   # 50 sitios en disco.
 
 async def source_from_request(source: DataIO, mode: ModeDataIO):
     """Obtiene un fileio desde un contexto de request."""
@@ -0,0 +1,46 @@
+"""Pruebas de `KeyIndexStore`: claves por archivo, pendientes, limpieza y lectura desde disco."""
+
+from tempfile import TemporaryDirectory
+from data.keys import KeyIndex, KeyIndexStore, SourceFile
+
+with TemporaryDirectory() as dirpath:
+    store = KeyIndexStore(dirpath)
+    files = {
+        "ftp:procesa/a.txt": SourceFile(100.0, 10),
+        "ftp:procesa/b.txt": SourceFile(200.0, 20),
+        "ftp:procesa/c.txt": SourceFile(300.0, 30)
+    }
+
+    # Sin indice en disco todos los archivos estan pendientes.
+    assert store.pending(files) == list(files)
+
+    store.set("ftp:procesa/a.txt", files["ftp:procesa/a.txt"], KeyIndex([1, 2, 3]))
+    store.set("ftp:procesa/b.txt", files["ftp:procesa/b.txt"], KeyIndex([3, 4]))
+    store.save()
+    assert store.pending(files) == ["ftp:procesa/c.txt"]
+
+    # Un archivo modificado vuelve a estar pendiente.
+    modified = dict(files, **{"ftp:procesa/b.txt": SourceFile(200.0, 21)})
+    assert store.pending(modified) == ["ftp:procesa/b.txt", "ftp:procesa/c.txt"]
+
+    # Las claves se leen de disco en una nueva instancia, solo de los archivos pedidos.
+    store = KeyIndexStore(dirpath)
+    assert store.files == {name: files[name] for name in ("ftp:procesa/a.txt", "ftp:procesa/b.txt")}
+    assert sorted(store.index().keys.tolist()) == [1, 2, 3, 4]
+    assert sorted(store.index(["ftp:procesa/b.txt", "ftp:procesa/c.txt"]).keys.tolist()) == [3, 4]
+
+    # Solo se eliminan los archivos anteriores a la fecha, con sus claves en disco.
+    store.prune(expire_before=150.0)
+    store.save()
+    store = KeyIndexStore(dirpath)
+    assert list(store.files) == ["ftp:procesa/b.txt"]
+    assert sorted(store.index().keys.tolist()) == [3, 4]
+    assert len(list(store.dirpath.glob("*.npy"))) == 1
+
+    # Un archivo sin claves en disco se olvida y se debe indexar de nuevo.
+    next(store.dirpath.glob("*.npy")).unlink()
+    store = KeyIndexStore(dirpath)
+    assert len(store.index()) == 0
+    assert store.pending(files) == list(files)
+
+print("KeyIndexStore: ok")
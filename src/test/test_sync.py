@@ -0,0 +1,43 @@
+"""Pruebas de `SyncLedger`: archivos pendientes, guardado en disco y limpieza por antiguedad."""
+
+from tempfile import TemporaryDirectory
+from data.keys import SourceFile
+from data.sync import SyncLedger
+
+with TemporaryDirectory() as dirpath:
+    ledger = SyncLedger("clientes", dirpath)
+    files = {
+        "out/a.csv": SourceFile(100.0, 10),
+        "out/b.csv": SourceFile(200.0, 20),
+        "out/c.csv": SourceFile(300.0, 30)
+    }
+
+    # Sin estado en disco todos los archivos estan pendientes.
+    assert ledger.pending(files) == ["out/a.csv", "out/b.csv", "out/c.csv"]
+
+    # Solo se guardan los archivos integrados, los demas siguen pendientes.
+    ledger.commit({"out/a.csv": files["out/a.csv"], "out/b.csv": files["out/b.csv"]})
+    assert ledger.pending(files) == ["out/c.csv"]
+
+    # Un archivo modificado (fecha o tamaño) vuelve a estar pendiente.
+    modified = dict(files, **{"out/a.csv": SourceFile(150.0, 10)})
+    assert ledger.pending(modified) == ["out/a.csv", "out/c.csv"]
+
+    # El estado se lee de disco en una nueva instancia.
+    ledger = SyncLedger("clientes", dirpath)
+    assert ledger.files == {"out/a.csv": files["out/a.csv"], "out/b.csv": files["out/b.csv"]}
+    assert ledger.synced_at is not None
+
+    # Un listado vacio no borra el estado, solo se olvidan los archivos anteriores a la fecha.
+    ledger.commit({})
+    assert SyncLedger("clientes", dirpath).pending(files) == ["out/c.csv"]
+    ledger.commit({"out/c.csv": files["out/c.csv"]}, expire_before=150.0)
+    assert list(SyncLedger("clientes", dirpath).files) == ["out/b.csv", "out/c.csv"]
+
+    # Cada script tiene su propio estado.
+    assert SyncLedger("interfaz contable", dirpath).pending(files) == list(files)
+
+    ledger.reset()
+    assert ledger.files == {} and not ledger.filepath.exists()
+
+print("SyncLedger: ok")
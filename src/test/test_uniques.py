@@ -0,0 +1,31 @@
+"""Pruebas de `apply_uniques` y `transform_uniques` contra `Series.apply` fila por fila."""
+
+from numpy import nan
+from pandas import Series, isna
+from data.uniques import apply_uniques, transform_uniques
+
+# Nulos, None y NaN se factorizan como un solo valor unico y la funcion se evalua una vez.
+values = Series(["cc", None, "ni", nan, "cc", ""], name="tipo documento")
+func = lambda value: "NULO" if isna(value) else value.upper()
+assert apply_uniques(values, func).equals(values.apply(func))
+assert transform_uniques(values, lambda uniques: uniques.str.upper()).equals(values.str.upper())
+
+calls = []
+apply_uniques(values, lambda value: calls.append(value))
+assert len(calls) == 4    # 'cc', nulo, 'ni' y ''
+
+# Los valores que no se pueden factorizar (listas) se evaluan fila por fila.
+values = Series([[1, 2], [3], [1, 2], []], name="listas")
+assert apply_uniques(values, len).equals(values.apply(len))
+
+# El resultado conserva el indice y el nombre de la Serie original, sin reordenar las filas.
+values = Series(["b", "a", nan, "b"], index=[40, 10, 30, 20], name="campo")
+result = apply_uniques(values, func)
+assert result.index.equals(values.index) and result.name == values.name
+assert result.tolist() == ["B", "A", "NULO", "B"]
+
+result = transform_uniques(values, lambda uniques: uniques.fillna("").str.len())
+assert result.index.equals(values.index) and result.name == values.name
+assert result.tolist() == [1, 1, 0, 1]
+
+print("apply_uniques y transform_uniques: ok")
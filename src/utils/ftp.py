@@ -1,183 +1,555 @@
 """Modulo para controlar las conexiones FTP."""
 
-from typing import NamedTuple
-from io import IOBase
+from typing import Callable, Iterable, Iterator, NamedTuple, TypeVar
+from io import IOBase, BufferedIOBase, IncrementalNewlineDecoder
+from codecs import getincrementaldecoder, getincrementalencoder
 from os import PathLike, fspath
 from datetime import datetime, timedelta
-from time import sleep as time_sleep
+from time import sleep as time_sleep, monotonic
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+from threading import BoundedSemaphore, Lock
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from tempfile import SpooledTemporaryFile
+from asyncio import wrap_future
 from socket import error as SocketError
+from ftplib import error_perm, all_errors as FTPLibErrors
+from calendar import timegm
+from stat import S_ISDIR
 from fnmatch import fnmatch
 from ftputil import FTPHost
-from ftputil.error import FTPError
+from ftputil.error import FTPError, PermanentError, ParserError
 from app.logging import get_logger
 from .env import Environment
 
 logger = get_logger("app", "ftp")
 DS_FTP: dict["FTPID", "FTP"] = {}
+R = TypeVar("R")
+
+FTP_POOL_SIZE = 4           # Conexiones simultaneas por cada FTP.
+FTP_IDLE_CHECK = 30         # Segundos sin uso antes de validar una conexion.
+FTP_CHUNK_SIZE = 1 << 16    # 64 Kilobytes por lectura en las transferencias.
+FTP_SPOOL_MAX_SIZE = 1 << 24    # 16 Megabytes en memoria antes de pasar a disco.
+FTP_LISTING_TTL = 60        # Segundos que se reutiliza el contenido leido de una carpeta.
+FTP_UNSUPPORTED_CODES = ("500", "501", "502", "504")   # Respuestas de comando no soportado.
 
 class FTPID(NamedTuple):
     """Identificador de una conexion FTP."""
     name: str
     host: str
 
-class FTP:
-    """Clase para escalar y gestionar conexiones a servidores FTP."""
+class FTPFileInfo(NamedTuple):
+    """Fecha de modificacion (timestamp) y tamaño en bytes de un archivo en el FTP."""
+    mtime: float
+    size: int
+
+class FTPTransfer(NamedTuple):
+    """Archivo transferido, tamaño en bytes por la red y duracion en segundos."""
+    remote: str
+    size: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """Bytes transferidos por segundo."""
+        return self.size / self.seconds if self.seconds > 0 else float(self.size)
+
+class FTPEntry(NamedTuple):
+    """Contenido de una carpeta en el FTP, fecha de modificacion como timestamp."""
+    path: str
+    name: str
+    isdir: bool
+    size: int
+    mtime: float
+
+class FTPSnapshot(NamedTuple):
+    """Contenido de una carpeta y el momento (monotonic) en que se leyo."""
+    entries: tuple[FTPEntry, ...]
+    taken_at: float
+
+    def fresh(self, ttl: float) -> bool:
+        """Valida si la lectura tiene menos de `ttl` segundos."""
+        return monotonic() - self.taken_at < ttl
+
+def _join_path(dir_path: str, name: str) -> str:
+    return f"{dir_path}/{name}" if dir_path != "." else name
+
+def _parse_mlsd_time(value: str) -> float:
+    """Fecha `modify` de MLSD (YYYYMMDDHHMMSS[.sss] en UTC) como timestamp."""
+    try:
+        date = datetime.strptime(value[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return 0.0
+    fraction = value[15:] if value[14:15] == "." else ""
+    return timegm(date.timetuple()) + (float("0." + fraction) if fraction.isdigit() else 0.0)
+
+def _mlsd_session(conn: FTPHost):
+    """
+    Sesion de ftplib de la conexion para usar MLSD, ftputil no la expone en su API publica.
+    Lanza AttributeError si la version de ftputil no la tiene.
+    """
+    session = conn._session    # pylint: disable=protected-access
+    if not callable(getattr(session, "mlsd", None)):
+        raise AttributeError("la sesion de ftputil no soporta mlsd")
+    return session
+
+def spooled_buffer(max_size: int = FTP_SPOOL_MAX_SIZE) -> SpooledTemporaryFile:
+    """Buffer de texto en memoria que pasa a un archivo temporal al superar `max_size`."""
+    return SpooledTemporaryFile(max_size=max_size, mode="w+", encoding="utf-8", newline="")
+
+def _copy_chunks(source: IOBase, destination: IOBase) -> int:
+    """Copia por partes de un archivo a otro del mismo modo y devuelve el tamaño copiado."""
+    size = 0
+    while chunk := source.read(FTP_CHUNK_SIZE):
+        destination.write(chunk)
+        size += len(chunk)
+    return size
+
+def _decode_chunks(source: IOBase, destination: IOBase) -> int:
+    """
+    Copia por partes un archivo binario en UTF-8 a uno de texto, con la misma conversion de saltos
+    de linea que el modo texto, y devuelve los bytes leidos.
+    """
+    decoder = IncrementalNewlineDecoder(getincrementaldecoder("utf-8")(), translate=True)
+    size = 0
+    while chunk := source.read(FTP_CHUNK_SIZE):
+        destination.write(decoder.decode(chunk))
+        size += len(chunk)
+    destination.write(decoder.decode(b"", final=True))
+    return size
+
+def _encode_chunks(source: IOBase, destination: IOBase) -> int:
+    """Copia por partes un archivo de texto a uno binario en UTF-8 y devuelve los bytes escritos."""
+    encoder = getincrementalencoder("utf-8")()
+    size = 0
+    while chunk := source.read(FTP_CHUNK_SIZE):
+        data = encoder.encode(chunk)
+        destination.write(data)
+        size += len(data)
+    return size
+
+class FTPSession:
+    """Conexion del pool de un FTP y el momento en que se uso por ultima vez."""
+
+    def __init__(self, conn: FTPHost):
+        self.conn = conn
+        self.last_used = monotonic()
+
+    def idle(self) -> float:
+        """Segundos sin usar la conexion."""
+        return monotonic() - self.last_used
+
+    def is_alive(self) -> bool:
+        """Valida si la conexion sigue activa."""
+        try:
+            self.conn.getcwd()
+            return True
+        except (FTPError, OSError, SocketError):
+            return False
+
+    def close(self):
+        """Cierra la conexion sin lanzar errores."""
+        try:
+            self.conn.close()
+        except Exception:
+            pass
 
-    def __init__(self, host: str, user: str = "", password: str = ""):
+class FTP:
+    """
+    Clase para escalar y gestionar conexiones a servidores FTP.
+
+    Mantiene hasta `size` conexiones abiertas que se reutilizan entre operaciones, cada operacion
+    toma una conexion libre del pool. Solo se valida una conexion (`getcwd`) si estuvo sin usar
+    mas de `idle_check` segundos, las que fallan durante una operacion se descartan.
+    Las transferencias `*_many` y `FTP.run` se ejecutan en los hilos del pool, ahi tambien esperan
+    los reintentos con backoff al abrir una conexion, sin ocupar un cupo del pool. Los metodos son
+    bloqueantes, desde el bucle de eventos se llaman con `FTP.run` o `asyncio.to_thread`.
+    El contenido de cada carpeta se reutiliza durante `listing_ttl` segundos, ver `FTP.snapshot`.
+    """
+    __sessions: LifoQueue[FTPSession]
+    __slots: BoundedSemaphore
+    __executor: ThreadPoolExecutor | None
+    __lock: Lock
+    __mlsd: bool
+    __snapshots: dict[str, FTPSnapshot]
+
+    def __init__(self,
+                 host: str,
+                 user: str = "",
+                 password: str = "",
+                 size: int = FTP_POOL_SIZE,
+                 idle_check: float = FTP_IDLE_CHECK,
+                 listing_ttl: float = FTP_LISTING_TTL):
         self.host = host
         self.user = user
         self.password = password
-        self.conn: FTPHost | None = None
+        self.size = max(1, size)
+        self.idle_check = idle_check
+        self.listing_ttl = listing_ttl
 
         # configuracio de reintentos
         self.max_retries = 5
         self.initial_backoff = 1  # en segundos
 
-    def _is_connected(self) -> bool:
-        """Valida si la conexión sigue activa"""
-        if self.conn is None:
-            return False
-
-        try:
-            self.conn.getcwd()
-            return True
-        except (FTPError, OSError, SocketError):
-            return False
-
-    def connect(self):
-        """Conecta con reintentos y backoff."""
-        if self._is_connected():
-            return
-
-        self.disconnect()
-
+        self.__sessions = LifoQueue()
+        self.__slots = BoundedSemaphore(self.size)
+        self.__executor = None
+        self.__lock = Lock()
+        self.__mlsd = True
+        self.__snapshots = {}
+
+    def __open(self, attempt: int) -> FTPSession:
+        """Abre una conexion nueva, un solo intento."""
+        logger.info("Intentado conectar a '%s' (Intento %d)", self.host, attempt)
+        conn = FTPHost(self.host, self.user, self.password)
+        conn.getcwd()
+        logger.info("Conectado exitosamente a '%s'", self.host)
+        return FTPSession(conn)
+
+    def __checkout(self, attempt: int = 1) -> FTPSession:
+        """Toma una conexion libre, valida solo las que estuvieron inactivas."""
+        while True:
+            try:
+                session = self.__sessions.get_nowait()
+            except Empty:
+                return self.__open(attempt)
+            if session.idle() < self.idle_check or session.is_alive():
+                return session
+            session.close()
+
+    def __acquire(self) -> FTPSession:
+        """
+        Toma un cupo del pool y una conexion, con reintentos y backoff al abrirla. El cupo se
+        libera mientras se espera el backoff para que otras operaciones puedan usar el pool.
+        """
         retries = 0
         backoff = self.initial_backoff
 
-        while retries < self.max_retries:
+        while True:
+            self.__slots.acquire()
             try:
-                logger.info("Intentado conectar a '%s' (Intento %d)", self.host, retries + 1)
-                self.conn = FTPHost(self.host, self.user, self.password)
-                self.conn.getcwd()
-                logger.info("Conectado exitosamente a '%s'", self.host)
-                return
+                return self.__checkout(retries + 1)
             except (FTPError, OSError, SocketError) as err:
+                self.__slots.release()
                 logger.warning("Fallo al conectar a '%s', %s", self.host, str(err))
                 retries += 1
-                if retries < self.max_retries:
-                    logger.info("Reintentando en %d segundos", backoff)
-                    time_sleep(backoff)
-                    backoff *= 2  # backoff exponencial
-                else:
+                if retries >= self.max_retries:
                     logger.error("Maximo de reintentos alcanzado al conectar a '%s'", self.host)
                     msg = f"No se pudo conectar a {self.host} tras {self.max_retries} intentos"
                     raise ConnectionError(msg) from err
+            except BaseException:
+                self.__slots.release()
+                raise
+            logger.info("Reintentando en %d segundos", backoff)
+            time_sleep(backoff)
+            backoff *= 2  # backoff exponencial
+
+    @contextmanager
+    def session(self) -> Iterator[FTPHost]:
+        """Conexion del pool durante el bloque, se devuelve al pool si no hubo errores."""
+        session = self.__acquire()
+        try:
+            yield session.conn
+        except (FTPError, EOFError, *FTPLibErrors):
+            session.close()     # Respuesta o conexion en un estado desconocido.
+            raise
+        except BaseException:
+            session.last_used = monotonic()
+            self.__sessions.put(session)
+            raise
+        else:
+            session.last_used = monotonic()
+            self.__sessions.put(session)
+        finally:
+            self.__slots.release()
+
+    def connect(self):
+        """Abre una conexion en el pool si no hay ninguna disponible."""
+        with self.session():
+            pass
 
     def disconnect(self):
-        """Cierra la conexión."""
-        if self.conn:
-            logger.info("Desconectado de '%s'", self.host)
+        """Cierra las conexiones libres del pool."""
+        while True:
             try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = None
+                session = self.__sessions.get_nowait()
+            except Empty:
+                break
+            logger.info("Desconectado de '%s'", self.host)
+            session.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Hilos para las operaciones concurrentes, uno por cada conexion del pool."""
+        if self.__executor is None:
+            with self.__lock:
+                if self.__executor is None:
+                    self.__executor = ThreadPoolExecutor(
+                        max_workers=self.size,
+                        thread_name_prefix=f"ftp-{self.host}"
+                    )
+        return self.__executor
 
     def exists(self, path: str) -> bool:
         """Verifica si existe un archivo o carpeta"""
-        self.connect()
-        return self.conn.path.exists(path)
+        with self.session() as conn:
+            return conn.path.exists(path)
+
+    def getinfo(self, path: str) -> FTPFileInfo:
+        """Devuelve la fecha de modificacion y el tamaño de un archivo."""
+        with self.session() as conn:
+            stat = conn.stat(path)
+        return FTPFileInfo(stat.st_mtime, stat.st_size)
 
     def cwd(self) -> str:
         """Devuelve el directorio actual."""
-        self.connect()
-        return self.conn.getcwd()
-
-    def download(self, remote: str, local: str | PathLike | IOBase):
-        """Descarga un archivo"""
-        self.connect()
+        with self.session() as conn:
+            return conn.getcwd()
+
+    def download(self, remote: str, local: str | PathLike | IOBase) -> FTPTransfer:
+        """
+        Descarga un archivo por partes, se lee en binario para medir los bytes y se decodifica
+        en UTF-8 salvo que el destino sea un buffer binario.
+        """
+        start = monotonic()
         try:
-            with self.conn.open(remote, mode="r", encoding="utf-8") as remote_file:
-                if isinstance(local, (str, PathLike)):
-                    with open(fspath(local), "w", encoding="utf-8") as f_local:
-                        f_local.write(remote_file.read())
-                elif isinstance(local, IOBase):
-                    local.write(remote_file.read())
-                    local.seek(0)
-                else:
-                    msg = f"el argumento 'local' debe ser ruta o Buffer, no {type(local)}"
-                    raise TypeError(msg)
+            with self.session() as conn:
+                with conn.open(remote, mode="rb") as remote_file:
+                    if isinstance(local, (str, PathLike)):
+                        with open(fspath(local), "w", encoding="utf-8") as f_local:
+                            size = _decode_chunks(remote_file, f_local)
+                    elif isinstance(local, BufferedIOBase):
+                        size = _copy_chunks(remote_file, local)
+                        local.seek(0)
+                    elif isinstance(local, IOBase):
+                        size = _decode_chunks(remote_file, local)
+                        local.seek(0)
+                    else:
+                        msg = f"el argumento 'local' debe ser ruta o Buffer, no {type(local)}"
+                        raise TypeError(msg)
         except (FTPError, OSError, SocketError) as err:
             logger.error("Error descargando '%s': %s", remote, err)
             raise
-
-    def upload(self, local: str | PathLike | IOBase, remote: str):
-        """Sube un archivo"""
-        self.connect()
+        return FTPTransfer(remote, size, monotonic() - start)
+
+    def upload(self, local: str | PathLike | IOBase, remote: str) -> FTPTransfer:
+        """
+        Sube un archivo por partes en binario para medir los bytes, los buffers binarios se suben
+        sin codificar y los de texto se codifican en UTF-8.
+        """
+        start = monotonic()
         try:
-            with self.conn.open(remote, mode="w", encoding="utf-8") as remote_file:
-                if isinstance(local, (str, PathLike)):
-                    with open(fspath(local), "r", encoding="utf-8") as f_local:
-                        remote_file.write(f_local.read())
-                elif isinstance(local, IOBase):
-                    local.seek(0)
-                    remote_file.write(local.read())
-                else:
-                    msg = f"el argumento 'local' debe ser ruta o Buffer, no {type(local)}"
-                    raise TypeError(msg)
+            with self.session() as conn:
+                with conn.open(remote, mode="wb") as remote_file:
+                    if isinstance(local, (str, PathLike)):
+                        with open(fspath(local), "r", encoding="utf-8") as f_local:
+                            size = _encode_chunks(f_local, remote_file)
+                    elif isinstance(local, BufferedIOBase):
+                        local.seek(0)
+                        size = _copy_chunks(local, remote_file)
+                    elif isinstance(local, IOBase):
+                        local.seek(0)
+                        size = _encode_chunks(local, remote_file)
+                    else:
+                        msg = f"el argumento 'local' debe ser ruta o Buffer, no {type(local)}"
+                        raise TypeError(msg)
         except (FTPError, OSError, SocketError) as err:
             logger.error("Error subiendo a '%s': %s", remote, err)
             raise
+        self.invalidate(remote.rpartition("/")[0] or ".")    # Cambio el contenido de la carpeta.
+        return FTPTransfer(remote, size, monotonic() - start)
+
+    def __wait_transfers(self, futures: Iterable[Future], action: str) -> list[FTPTransfer]:
+        """
+        Espera las transferencias enviadas a los hilos del pool, como maximo `size` a la vez. Si
+        alguna falla se espera a las demas y luego se lanza el primer error.
+        """
+        transfers = []
+        errors: list[Exception] = []
+        for future in futures:
+            try:
+                transfer: FTPTransfer = future.result()
+            except Exception as err:
+                errors.append(err)
+                continue
+            logger.info(
+                "%s '%s', %d bytes en %.2f segundos (%.1f KB/s)",
+                action,
+                transfer.remote,
+                transfer.size,
+                transfer.seconds,
+                transfer.throughput / 1024
+            )
+            transfers.append(transfer)
+        if errors:
+            raise errors[0]
+        return transfers
+
+    def download_many(self,
+                      remotes: Iterable[str],
+                      locals_: Iterable[str | PathLike | IOBase]) -> list[FTPTransfer]:
+        """Descarga varios archivos a la vez, una conexion del pool por archivo."""
+        futures = [self.executor.submit(self.download, *arg) for arg in zip(remotes, locals_)]
+        return self.__wait_transfers(futures, "Descargado")
+
+    def upload_many(self,
+                    locals_: Iterable[str | PathLike | IOBase | Future],
+                    remotes: Iterable[str]) -> list[FTPTransfer]:
+        """
+        Sube varios archivos a la vez, una conexion del pool por archivo. Los buffers que aun se
+        estan preparando (Future) se suben a medida que terminan, sin esperar a los demas. Los que
+        fallan no se suben, el error se lanza despues de esperar las subidas ya enviadas.
+        """
+        futures: list[Future] = []
+        pending: dict[Future, str] = {}
+        errors: list[Exception] = []
+        for local, remote in zip(locals_, remotes):
+            if isinstance(local, Future):
+                pending[local] = remote
+            else:
+                futures.append(self.executor.submit(self.upload, local, remote))
+        for ready in as_completed(pending):
+            try:
+                local = ready.result()
+            except Exception as err:
+                logger.error("Error preparando '%s': %s", pending[ready], err)
+                errors.append(err)
+                continue
+            futures.append(self.executor.submit(self.upload, local, pending[ready]))
+        transfers = self.__wait_transfers(futures, "Subido")
+        if errors:
+            raise errors[0]
+        return transfers
+
+    async def run(self, func: Callable[..., R], *args: ...) -> R:
+        """Ejecuta una operacion del FTP en los hilos del pool sin bloquear el bucle de eventos."""
+        return await wrap_future(self.executor.submit(func, *args))
+
+    def __scan_mlsd(self, conn: FTPHost, dir_path: str) -> list[FTPEntry]:
+        entries = []
+        for name, facts in _mlsd_session(conn).mlsd(dir_path, facts=["type", "size", "modify"]):
+            kind = facts.get("type", "").lower()
+            if kind not in ("file", "dir"):
+                continue    # cdir, pdir y enlaces.
+            entries.append(FTPEntry(
+                _join_path(dir_path, name),
+                name,
+                kind == "dir",
+                int(facts.get("size") or 0),
+                _parse_mlsd_time(facts.get("modify", ""))
+            ))
+        return entries
+
+    def __scan_list(self, conn: FTPHost, dir_path: str) -> list[FTPEntry]:
+        entries = []
+        # El LIST de listdir llena el cache de ftputil, stat no vuelve a consultar el servidor.
+        for name in conn.listdir(dir_path):
+            path = _join_path(dir_path, name)
+            try:
+                stat = conn.stat(path)
+            except (FTPError, OSError, SocketError):
+                logger.warning("Error accediendo a '%s'", path)
+                continue
+            entries.append(FTPEntry(path, name, S_ISDIR(stat.st_mode), stat.st_size, stat.st_mtime))
+        return entries
+
+    def scandir(self, conn: FTPHost, dir_path: str) -> list[FTPEntry]:
+        """
+        Tipo, tamaño y fecha de modificacion de todo el contenido de una carpeta en un solo
+        comando, con `MLSD` o con `LIST` si el servidor no soporta `MLSD`.
+        """
+        if self.__mlsd:
+            try:
+                return self.__scan_mlsd(conn, dir_path)
+            except AttributeError:
+                logger.info("La conexion a '%s' no permite MLSD, se usa LIST", self.host)
+                self.__mlsd = False
+            except error_perm as err:
+                if not str(err).startswith(FTP_UNSUPPORTED_CODES):
+                    raise
+                logger.info("El FTP '%s' no soporta MLSD, se usa LIST", self.host)
+                self.__mlsd = False
+        return self.__scan_list(conn, dir_path)
+
+    def snapshot(self, dir_path: str, refresh: bool = False) -> FTPSnapshot:
+        """
+        Contenido de la carpeta desde el cache si tiene menos de `listing_ttl` segundos,
+        si no (o con `refresh`) se lee de nuevo del servidor.
+        """
+        snapshot = self.__snapshots.get(dir_path)
+        if refresh or snapshot is None or not snapshot.fresh(self.listing_ttl):
+            with self.session() as conn:
+                entries = tuple(self.scandir(conn, dir_path))
+            snapshot = FTPSnapshot(entries, monotonic())
+            self.__snapshots[dir_path] = snapshot
+        return snapshot
+
+    def invalidate(self, dir_path: str = None):
+        """Descarta el cache de la carpeta o de todas las carpetas."""
+        if dir_path is None:
+            self.__snapshots.clear()
+        else:
+            self.__snapshots.pop(dir_path, None)
+
+    @staticmethod
+    def __walk(pattern: str, scan: Callable[[str], Iterable[FTPEntry]]) -> list[FTPEntry]:
+        """Archivos que coinciden con el patron segun el contenido de cada carpeta de `scan`."""
+        if not pattern:
+            raise ValueError("Se requiere un patrón de búsqueda no vacío.")
+
+        if pattern.startswith("**/"):
+            dir_path, file_pattern, recursive = "/", pattern.removeprefix("**/"), True
+        else:
+            dir_path, _, file_pattern = pattern.rpartition('/')
+            dir_path, recursive = dir_path or ".", False
 
-    def _list_files_recursive(self, dir_path: str, pattern: str) -> list[str]:
         resultado = []
 
-        def _recursive_list(current_dir: str):
+        def _list(current_dir: str):
+            # Solo se omiten las carpetas sin permiso o que no se pueden leer, los errores de
+            # conexion se propagan para no confundir un FTP caido con una carpeta vacia.
             try:
-                items = self.conn.listdir(current_dir)
-            except FTPError:
+                entries = scan(current_dir)
+            except (error_perm, PermanentError, ParserError):
                 return
 
-            for item in items:
-                path = f"{current_dir}/{item}"
-                try:
-                    if self.conn.path.isdir(path):
-                        _recursive_list(path)
-                    elif self.conn.path.isfile(path):
-                        nombre_archivo = path.rsplit('/', 1)[-1]
-                        if fnmatch(nombre_archivo, pattern):
-                            resultado.append(path)
-                except (FTPError, OSError, SocketError):
-                    logger.warning("Error accediendo a '%s'", path)
-
-        _recursive_list(dir_path)
+            for entry in entries:
+                if entry.isdir:
+                    if recursive:
+                        _list(entry.path)
+                elif fnmatch(entry.name, file_pattern):
+                    resultado.append(entry)
+
+        _list(dir_path)
         return resultado
 
+    def list_entries(self, pattern: str, refresh: bool = False) -> list[FTPEntry]:
+        """Archivos que coinciden con el patron, soporta patrones glob simples o recursivos."""
+        return self.__walk(pattern, lambda dir_path: self.snapshot(dir_path, refresh).entries)
+
     def list_files(self, pattern: str) -> list[str]:
         """Lista files en el servidor, soporta patrones glob simples o recursvos"""
-        self.connect()
-
-        if not pattern:
-            raise ValueError("Se requiere un patrón de búsqueda no vacío.")
+        return [entry.path for entry in self.list_entries(pattern)]
 
-        if pattern.startswith("**/"):
-            file_pattern = pattern.removeprefix("**/")
-            return self._list_files_recursive("/", file_pattern)
+    def list_entries_by_date(self,
+                             pattern: str,
+                             after_at: datetime = None,
+                             before_at: datetime = None) -> list[FTPEntry]:
+        """Archivos que coincidan con el patrón y hayan sido modificados de la fecha."""
 
-        dir_path, _, file_pattern = pattern.rpartition('/')
+        datenow = datetime.now()
 
-        if not dir_path:
-            dir_path = "."
+        if before_at is None and after_at is None:
+            before_at = datenow - timedelta(days=1)
+            after_at = datenow
 
-        try:
-            files = self.conn.listdir(dir_path)
-        except FTPError:
-            return []
+        ts_after = after_at.timestamp() if after_at else None
+        ts_before = before_at.timestamp() if before_at else None
 
         return [
-            f"{dir_path}/{archivo}" if dir_path != "." else archivo
-            for archivo in files
-            if fnmatch(archivo, file_pattern) and self.conn.path.isfile(f"{dir_path}/{archivo}")
+            entry for entry in self.list_entries(pattern)
+            if not (ts_after and entry.mtime < ts_after)
+            and not (ts_before and entry.mtime > ts_before)
         ]
 
     def list_files_by_date(self,
@@ -185,37 +557,7 @@ class FTP:
                            after_at: datetime = None,
                            before_at: datetime = None) -> list[str]:
         """Lista archivos que coincidan con el patrón y hayan sido modificados de la fecha."""
-
-        self.connect()
-
-        datenow = datetime.now()
-
-        if before_at is None and after_at is None:
-            before_at = datenow - timedelta(days=1)
-            after_at = datenow
-
-        ts_after = after_at.timestamp() if after_at else None
-        ts_before = before_at.timestamp() if before_at else None
-
-        files = self.list_files(pattern)
-        resultado = []
-
-        for path in files:
-            try:
-                if self.conn.path.isfile(path):
-                    mod_time = self.conn.path.getmtime(path)
-
-                    if ts_after and mod_time < ts_after:
-                        continue
-                    if ts_before and mod_time > ts_before:
-                        continue
-
-                    resultado.append(path)
-
-            except (FTPError, OSError, SocketError):
-                logger.warning("Error accediendo a '%s'", path)
-
-        return resultado
+        return [entry.path for entry in self.list_entries_by_date(pattern, after_at, before_at)]
 
 def get_maaji_ftp():
     """Renueva el FTP de Maaji con las credenciales desde el entorno."""